@@ -4,5 +4,23 @@ __author__ = """Jeremy Gibson"""
 __email__ = "jmgibso3@ncsu.edu"
 __version__ = "0.1.0"
 
-from acslib.ccure import CcureAPI
-from .base.search import BooleanOperators, TermOperators
+import importlib
+
+# imported on first use, so `import acslib` doesn't load requests and pydantic
+_LAZY_ATTRIBUTES = {
+    "CcureAPI": "acslib.ccure",
+    "BooleanOperators": "acslib.base.search",
+    "TermOperators": "acslib.base.search",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
@@ -71,18 +71,16 @@ class ACSRequestData(BaseModel):
 
 
 class ACSConnection(ABC):
-    REQUEST_TYPE = {
-        ACSRequestMethod.GET: requests.get,
-        ACSRequestMethod.POST: requests.post,
-        ACSRequestMethod.PUT: requests.put,
-        ACSRequestMethod.DELETE: requests.delete,
-        ACSRequestMethod.PATCH: requests.patch,
-    }
-
     def __init__(self, **kwargs):
         self.config = kwargs.get("config")
         self.timeout = kwargs.get("timeout", self.config.timeout)
         self.response = None
+        # one pooled http session lets concurrent requests reuse open connections
+        self.http_session = requests.Session()
+        pool_size = kwargs.get("pool_size", 10)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.http_session.mount("http://", adapter)
+        self.http_session.mount("https://", adapter)
 
     @abstractmethod
     def login(self):
@@ -93,8 +91,8 @@ class ACSConnection(ABC):
         pass
 
     def _make_request(self, requests_method: ACSRequestMethod, request_data_map: dict):
-        if req := self.REQUEST_TYPE.get(requests_method):
-            return req(**request_data_map)
+        if isinstance(requests_method, ACSRequestMethod):
+            return self.http_session.request(requests_method.value, **request_data_map)
         raise ACSConnectionException(f"Invalid request method: {requests_method}")
 
     def request(
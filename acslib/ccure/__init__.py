@@ -1,35 +1,133 @@
-from typing import Optional
-
-from acslib.base import ACSRequestResponse
-from acslib.base.connection import ACSRequestData, ACSRequestMethod
-from acslib.ccure.actions import CcureAction
-from acslib.ccure.base import CcureACS
-from acslib.ccure.connection import CcureConnection
-from acslib.ccure.crud import (
-    CcurePersonnel,
-    CcureClearance,
-    CcureCredential,
-    CcureClearanceItem,
-    CcureGroup,
-    CcureGroupMember,
-)
-from acslib.ccure.filters import (
-    ClearanceFilter,
-    PersonnelFilter,
-    CredentialFilter,
-    GroupFilter,
-    GroupMemberFilter,
-)
+import importlib
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from acslib.ccure.actions import CcureAction
+    from acslib.ccure.base import CcureACS
+    from acslib.ccure.connection import CcureConnection
+    from acslib.ccure.crud import (
+        CcurePersonnel,
+        CcureClearance,
+        CcureCredential,
+        CcureClearanceItem,
+        CcureGroup,
+        CcureGroupMember,
+    )
+    from acslib.ccure.write_buffer import UpdateBuffer
+
+# names this package re-exports, and the modules they're imported from on first use
+_LAZY_ATTRIBUTES = {
+    "ACSRequestResponse": "acslib.base",
+    "ACSRequestData": "acslib.base.connection",
+    "ACSRequestMethod": "acslib.base.connection",
+    "CcureAction": "acslib.ccure.actions",
+    "CcureACS": "acslib.ccure.base",
+    "CcureConnection": "acslib.ccure.connection",
+    "CcurePersonnel": "acslib.ccure.crud",
+    "CcureClearance": "acslib.ccure.crud",
+    "CcureCredential": "acslib.ccure.crud",
+    "CcureClearanceItem": "acslib.ccure.crud",
+    "CcureGroup": "acslib.ccure.crud",
+    "CcureGroupMember": "acslib.ccure.crud",
+    "ClearanceFilter": "acslib.ccure.filters",
+    "PersonnelFilter": "acslib.ccure.filters",
+    "CredentialFilter": "acslib.ccure.filters",
+    "GroupFilter": "acslib.ccure.filters",
+    "GroupMemberFilter": "acslib.ccure.filters",
+    "UpdateBuffer": "acslib.ccure.write_buffer",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
 
 
 class CcureAPI:
-    def __init__(self, connection: Optional[CcureConnection] = None):
-        self.connection = connection or CcureConnection()
-        self.personnel = CcurePersonnel(self.connection)
-        self.clearance = CcureClearance(self.connection)
-        self.credential = CcureCredential(self.connection)
-        self.clearance_item = CcureClearanceItem(self.connection)
-        self.action = CcureAction(self.connection)
-        self.ccure_object = CcureACS(self.connection)
-        self.group = CcureGroup(self.connection)
-        self.group_member = CcureGroupMember(self.connection)
+    """
+    Every CCure client, sharing one connection
+
+    The connection and each client are created the first time they're used, so building a
+    CcureAPI doesn't read the config or import the modules behind unused clients.
+    """
+
+    def __init__(self, connection: Optional["CcureConnection"] = None):
+        if connection is not None:
+            self.connection = connection
+
+    @cached_property
+    def connection(self) -> "CcureConnection":
+        from acslib.ccure.connection import CcureConnection
+
+        return CcureConnection()
+
+    @cached_property
+    def personnel(self) -> "CcurePersonnel":
+        from acslib.ccure.crud import CcurePersonnel
+
+        return CcurePersonnel(self.connection)
+
+    @cached_property
+    def clearance(self) -> "CcureClearance":
+        from acslib.ccure.crud import CcureClearance
+
+        return CcureClearance(self.connection)
+
+    @cached_property
+    def credential(self) -> "CcureCredential":
+        from acslib.ccure.crud import CcureCredential
+
+        return CcureCredential(self.connection)
+
+    @cached_property
+    def clearance_item(self) -> "CcureClearanceItem":
+        from acslib.ccure.crud import CcureClearanceItem
+
+        return CcureClearanceItem(self.connection)
+
+    @cached_property
+    def action(self) -> "CcureAction":
+        from acslib.ccure.actions import CcureAction
+
+        return CcureAction(self.connection)
+
+    @cached_property
+    def ccure_object(self) -> "CcureACS":
+        from acslib.ccure.base import CcureACS
+
+        return CcureACS(self.connection)
+
+    @cached_property
+    def group(self) -> "CcureGroup":
+        from acslib.ccure.crud import CcureGroup
+
+        return CcureGroup(self.connection)
+
+    @cached_property
+    def group_member(self) -> "CcureGroupMember":
+        from acslib.ccure.crud import CcureGroupMember
+
+        return CcureGroupMember(self.connection)
+
+    def buffer_updates(
+        self, window: float = 1.0, max_pending: int = 100, max_workers: Optional[int] = None
+    ) -> "UpdateBuffer":
+        """
+        Merge repeated personnel, credential, and clearance item updates made within
+        `window` seconds into single requests. While the buffer is open, `update` calls
+        return Futures. Close the buffer, or use it as a context manager, to send
+        everything that's waiting and go back to unbuffered updates.
+        """
+        from acslib.ccure.write_buffer import UpdateBuffer
+
+        return UpdateBuffer(self.connection, window, max_pending, max_workers).attach(
+            self.personnel, self.credential, self.clearance_item, self.ccure_object
+        )
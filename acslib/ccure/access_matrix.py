@@ -0,0 +1,196 @@
+"""Who can open which door, computed locally from bulk-loaded clearance relations"""
+
+from typing import Iterable, Optional
+
+from acslib.ccure.base import CcureACS
+from acslib.ccure.connection import CcureConnection
+from acslib.ccure.filters import CcureFilter
+from acslib.ccure.types import ObjectType
+
+#: The object type relating clearances to the doors (clearance items) they open
+CLEARANCE_DOOR_TYPE = "SoftwareHouse.NextGen.Common.SecurityObjects.ClearanceDoor"
+
+
+def _bits(bitset: int) -> list[int]:
+    """Positions of the set bits in a bitset"""
+    positions = []
+    digits = bin(bitset)[:1:-1]  # least significant bit first
+    position = digits.find("1")
+    while position != -1:
+        positions.append(position)
+        position = digits.find("1", position + 1)
+    return positions
+
+
+def _bitset(positions: Iterable[int], size: int) -> int:
+    """A bitset with the given bits set"""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+class _Index:
+    """Assigns each object ID a bit position"""
+
+    def __init__(self):
+        self.positions: dict[int, int] = {}
+        self.ids: list[int] = []
+
+    def add(self, object_id: int) -> int:
+        position = self.positions.get(object_id)
+        if position is None:
+            position = self.positions[object_id] = len(self.ids)
+            self.ids.append(object_id)
+        return position
+
+    def decode(self, bitset: int) -> set[int]:
+        return {self.ids[position] for position in _bits(bitset)}
+
+
+class AccessMatrix:
+    """
+    Personnel clearance assignments and clearance door relations, held as bitsets
+
+    Each person has a bitset of their clearances, each door a bitset of the clearances
+    that open it, and each clearance bitsets of its people and its doors. Bitsets are
+    Python ints, so unions and intersections run over packed machine words.
+
+    :param assignments: (personnel_id, clearance_id) pairs
+    :param clearance_doors: (clearance_id, door_id) pairs. Doors are any clearance items.
+    """
+
+    def __init__(
+        self,
+        assignments: Iterable[tuple[int, int]],
+        clearance_doors: Iterable[tuple[int, int]],
+    ):
+        self._people = _Index()
+        self._clearances = _Index()
+        self._doors = _Index()
+        person_clearances: dict[int, list[int]] = {}
+        clearance_people: dict[int, list[int]] = {}
+        door_clearances: dict[int, list[int]] = {}
+        clearance_doors_positions: dict[int, list[int]] = {}
+        for personnel_id, clearance_id in assignments:
+            person = self._people.add(personnel_id)
+            clearance = self._clearances.add(clearance_id)
+            person_clearances.setdefault(person, []).append(clearance)
+            clearance_people.setdefault(clearance, []).append(person)
+        for clearance_id, door_id in clearance_doors:
+            clearance = self._clearances.add(clearance_id)
+            door = self._doors.add(door_id)
+            door_clearances.setdefault(door, []).append(clearance)
+            clearance_doors_positions.setdefault(clearance, []).append(door)
+
+        people, clearances, doors = map(
+            len, (self._people.ids, self._clearances.ids, self._doors.ids)
+        )
+        self._person_clearances = {
+            person: _bitset(positions, clearances)
+            for person, positions in person_clearances.items()
+        }
+        self._door_clearances = {
+            door: _bitset(positions, clearances) for door, positions in door_clearances.items()
+        }
+        self._clearance_people = [
+            _bitset(clearance_people.get(clearance, ()), people) for clearance in range(clearances)
+        ]
+        self._clearance_doors = [
+            _bitset(clearance_doors_positions.get(clearance, ()), doors)
+            for clearance in range(clearances)
+        ]
+
+    @classmethod
+    def load(
+        cls,
+        connection: Optional[CcureConnection] = None,
+        relation_type: str = CLEARANCE_DOOR_TYPE,
+        door_property: str = "DoorID",
+        page_size: int = 5000,
+    ) -> "AccessMatrix":
+        """
+        Build an AccessMatrix from every PersonnelClearancePair and clearance door relation
+
+        :param connection: used to pull the relations from CCure
+        :param relation_type: the object type relating clearances to doors
+        :param door_property: the property of `relation_type` holding the door's ObjectID
+        :param page_size: objects per search page
+        """
+        ccure = CcureACS(connection)
+
+        def pairs(object_type: str, first: str, second: str):
+            for page in CcureACS.search_pages(
+                ccure,
+                object_type=object_type,
+                search_filter=CcureFilter(display_properties=[first, second]),
+                page_size=page_size,
+                where_clause="",
+            ):
+                yield from ((item[first], item[second]) for item in page)
+
+        return cls(
+            pairs(ObjectType.CLEARANCE_ASSIGNMENT.complete, "PersonnelID", "ClearanceID"),
+            pairs(relation_type, "ClearanceID", door_property),
+        )
+
+    def clearances_for(self, personnel_id: int) -> set[int]:
+        """ObjectIDs of the person's clearances"""
+        person = self._people.positions.get(personnel_id)
+        return self._clearances.decode(self._person_clearances.get(person, 0))
+
+    def doors_for(self, personnel_id: int) -> set[int]:
+        """ObjectIDs of the doors the person's clearances open"""
+        return self._doors.decode(self._door_bits(personnel_id))
+
+    def people_for(self, door_id: int) -> set[int]:
+        """ObjectIDs of the people with a clearance that opens the door"""
+        door = self._doors.positions.get(door_id)
+        people = 0
+        for clearance in _bits(self._door_clearances.get(door, 0)):
+            people |= self._clearance_people[clearance]
+        return self._people.decode(people)
+
+    def can_open(self, personnel_id: int, door_id: int) -> bool:
+        person = self._people.positions.get(personnel_id)
+        door = self._doors.positions.get(door_id)
+        return bool(self._person_clearances.get(person, 0) & self._door_clearances.get(door, 0))
+
+    def diff(self, newer: "AccessMatrix") -> dict[int, tuple[set[int], set[int]]]:
+        """
+        Compare this matrix with a newer one, person by person
+
+        Only people whose clearances changed, or who hold a clearance whose doors changed,
+        are expanded to doors.
+
+        :return: maps each person whose access changed to (doors gained, doors lost)
+        """
+        changed_clearances = {
+            clearance_id
+            for clearance_id in set(self._clearances.ids) | set(newer._clearances.ids)
+            if self._clearance_door_ids(clearance_id) != newer._clearance_door_ids(clearance_id)
+        }
+        changes = {}
+        for personnel_id in set(self._people.ids) | set(newer._people.ids):
+            old_clearances = self.clearances_for(personnel_id)
+            new_clearances = newer.clearances_for(personnel_id)
+            if old_clearances == new_clearances and not old_clearances & changed_clearances:
+                continue
+            old_doors = self.doors_for(personnel_id)
+            new_doors = newer.doors_for(personnel_id)
+            if old_doors != new_doors:
+                changes[personnel_id] = (new_doors - old_doors, old_doors - new_doors)
+        return changes
+
+    def _door_bits(self, personnel_id: int) -> int:
+        person = self._people.positions.get(personnel_id)
+        doors = 0
+        for clearance in _bits(self._person_clearances.get(person, 0)):
+            doors |= self._clearance_doors[clearance]
+        return doors
+
+    def _clearance_door_ids(self, clearance_id: int) -> set[int]:
+        clearance = self._clearances.positions.get(clearance_id)
+        if clearance is None:
+            return set()
+        return self._doors.decode(self._clearance_doors[clearance])
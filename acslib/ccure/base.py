@@ -1,9 +1,12 @@
+from concurrent.futures import Future
 from numbers import Number
-from typing import Optional, Any
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 from acslib.base import AccessControlSystem, ACSRequestData, ACSRequestResponse, ACSRequestException
+from acslib.ccure.bulk import BulkResult, run_concurrently
 from acslib.ccure.connection import CcureConnection, ACSRequestMethod
 from acslib.ccure.filters import CcureFilter, NFUZZ
+from acslib.ccure.relations import get_relations, include_related
 
 
 class CcureACS(AccessControlSystem):
@@ -15,6 +18,8 @@ class CcureACS(AccessControlSystem):
             self.connection = CcureConnection()
         self.logger = self.connection.logger
         self.request_options = {}
+        #: an UpdateBuffer that `update` calls are sent through, if buffering is enabled
+        self.update_buffer = None
 
     @property
     def config(self):
@@ -31,6 +36,7 @@ class CcureACS(AccessControlSystem):
         timeout: Number = 0,
         search_options: Optional[dict] = None,
         where_clause: Optional[str] = None,
+        include: Optional[list[str]] = None,
     ) -> int | list:
         """
         Return CCure objects meeting the given criteria
@@ -43,16 +49,23 @@ class CcureACS(AccessControlSystem):
         page_number: the page of search results to display. The first page is page 1.
         search_options: other options to include in the request_json. eg. "CountOnly"
         where_clause: sql-style WHERE clause to search objects. overrides `terms` if included.
+        include: names of related objects to add to each result, from relations.RELATIONS
         """
         if search_filter is None and not where_clause:
             raise ACSRequestException(400, "A search filter or where clause is required.")
         if page_size is None:
             page_size = self.config.page_size
+        display_properties = search_filter.display_properties
+        if include and display_properties:
+            local_keys = [
+                relation.local_key for relation in get_relations(object_type, include).values()
+            ]
+            display_properties = list(dict.fromkeys([*display_properties, *local_keys]))
         request_json = {
             "TypeFullName": object_type,
             "pageSize": page_size,
             "pageNumber": page_number,
-            "DisplayProperties": search_filter.display_properties,
+            "DisplayProperties": display_properties,
             "WhereClause": where_clause or search_filter.filter(terms or []),
         } | (search_options or {})
         response = self.connection.request(
@@ -65,8 +78,46 @@ class CcureACS(AccessControlSystem):
             ),
             timeout=timeout,
         )
+        if include and isinstance(response.json, list):
+            return include_related(self, object_type, response.json, include)
         return response.json
 
+    def search_pages(
+        self,
+        object_type: str,
+        terms: Optional[list] = None,
+        search_filter: Optional[CcureFilter] = None,
+        page_size: Optional[int] = None,
+        timeout: Number = 0,
+        where_clause: Optional[str] = None,
+    ) -> Iterator[list]:
+        """
+        Yield every page of CCure objects meeting the given criteria, one page at a time,
+        stopping after the first page with fewer than `page_size` results.
+        A `page_size` of 0 or less sends a single unpaged search.
+
+        Parameters are the same as in `search`.
+        """
+        if page_size is None:
+            page_size = self.config.page_size
+        page_number = 1
+        while True:
+            page = CcureACS.search(
+                self,
+                object_type=object_type,
+                terms=terms,
+                search_filter=search_filter,
+                page_size=page_size,
+                page_number=page_number,
+                timeout=timeout,
+                where_clause=where_clause,
+            )
+            if page:
+                yield page
+            if page_size <= 0 or len(page or []) < page_size:
+                return
+            page_number += 1
+
     def get_property(self, object_type: str, object_id: int, property_name: str) -> Any:
         """Return the value of one property from one CCure object"""
         search_filter = CcureFilter(lookups={"ObjectID": NFUZZ}, display_properties=[property_name])
@@ -85,12 +136,24 @@ class CcureACS(AccessControlSystem):
             return search_result[property_name]
         raise ACSRequestException(400, f"CCure object has no `{property_name}` property.")
 
-    def update(self, object_type: str, object_id: int, update_data: dict) -> ACSRequestResponse:
+    def update(
+        self, object_type: str, object_id: int, update_data: dict
+    ) -> ACSRequestResponse | Future:
         """
         Edit the properties of one CCure object
 
         update_data: maps property names to their new values
+
+        If an update buffer is attached, the change is queued and a Future for the
+        eventual response is returned instead.
         """
+        if self.update_buffer is not None:
+            return self.update_buffer.submit(object_type, object_id, update_data)
+        return self._send_update(object_type, object_id, update_data)
+
+    def _send_update(
+        self, object_type: str, object_id: int, update_data: dict
+    ) -> ACSRequestResponse:
         return self.connection.request(
             ACSRequestMethod.PUT,
             request_data=ACSRequestData(
@@ -109,6 +172,54 @@ class CcureACS(AccessControlSystem):
             ),
         )
 
+    def update_many(
+        self,
+        object_type: str,
+        updates: dict[int, dict],
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        progress: Optional[Callable[[int, BulkResult], None]] = None,
+    ) -> list[BulkResult]:
+        """
+        Edit the properties of many CCure objects concurrently
+
+        updates: maps object IDs to their {property name: new value} changes
+        max_workers: number of worker threads. Defaults to `config.max_workers`.
+        max_in_flight: maximum number of unfinished requests. Defaults to `max_workers`.
+        progress: called with the number of finished updates and the latest result
+        Returns one BulkResult per object ID, in order. Updates are never buffered.
+        """
+        self.logger.info(f"Updating {len(updates)} objects")
+        return run_concurrently(
+            lambda object_id: self._send_update(object_type, object_id, updates[object_id]),
+            ((object_id, object_id) for object_id in updates),
+            max_workers or self.config.max_workers,
+            max_in_flight,
+            progress,
+        )
+
+    def delete_many(
+        self,
+        object_type: str,
+        object_ids: Iterable[int],
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        progress: Optional[Callable[[int, BulkResult], None]] = None,
+    ) -> list[BulkResult]:
+        """
+        Delete many CCure objects concurrently
+
+        Options are the same as in `update_many`.
+        Returns one BulkResult per object ID, in order.
+        """
+        return run_concurrently(
+            lambda object_id: CcureACS.delete(self, object_type, object_id),
+            ((object_id, object_id) for object_id in object_ids),
+            max_workers or self.config.max_workers,
+            max_in_flight,
+            progress,
+        )
+
     def create(self, request_data: dict) -> ACSRequestResponse:
         """Persist a new CCure object"""
         return self.connection.request(
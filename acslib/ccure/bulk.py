@@ -0,0 +1,201 @@
+"""Run many CCure requests concurrently and collect their outcomes"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional
+
+from acslib.base import ACSRequestException, ACSRequestResponse, status
+
+#: Status codes for failures that may succeed if the request is sent again
+TRANSIENT_STATUS_CODES = {
+    status.HTTP_408_REQUEST_TIMEOUT,
+    status.HTTP_429_TOO_MANY_REQUESTS,
+    status.HTTP_502_BAD_GATEWAY,
+    status.HTTP_503_SERVICE_UNAVAILABLE,
+    status.HTTP_504_GATEWAY_TIMEOUT,
+}
+
+
+class BulkResult:
+    """
+    The outcome of one operation in a bulk request
+
+    :param key: identifies the record, ID, or pair this result belongs to
+    :param response: the response from CCure if the operation succeeded
+    :param error: the exception raised by the operation if it failed
+    :param elapsed: seconds spent on the operation
+    :param object_id: CCure ID of the object created or changed by the operation, if known
+    """
+
+    def __init__(
+        self,
+        key: Hashable,
+        response: Optional[ACSRequestResponse] = None,
+        error: Optional[Exception] = None,
+        elapsed: float = 0.0,
+        object_id: Optional[int] = None,
+    ):
+        self.key = key
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+        self.object_id = object_id
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.ok else f"error={self.error!r}"
+        return f"BulkResult(key={self.key!r}, {outcome}, elapsed={self.elapsed:.3f})"
+
+
+class BulkReport(list):
+    """A list of BulkResults, plus the time the whole bulk request took"""
+
+    def __init__(self, results: Iterable[BulkResult], elapsed: float):
+        super().__init__(results)
+        self.elapsed = elapsed
+
+    @property
+    def failures(self) -> list[BulkResult]:
+        return [result for result in self if not result.ok]
+
+
+class RateLimiter:
+    """
+    Spaces calls to `wait` at least 1 / `rate` seconds apart, across threads
+
+    :param rate: maximum calls per second
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(self._next, now)
+            self._next = scheduled + self.interval
+        if scheduled > now:
+            time.sleep(scheduled - now)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def get_object_id(response: Optional[ACSRequestResponse]) -> Optional[int]:
+    """Find the ObjectID of a newly persisted object in a CCure response, if there is one"""
+    if response is None:
+        return None
+    data = response.json
+    if isinstance(data, list) and data:
+        data = data[0]
+    if isinstance(data, dict):
+        data = data.get("ObjectID", data.get("ID"))
+    if isinstance(data, int):
+        return data
+    if isinstance(data, str) and data.isdigit():
+        return int(data)
+    return None
+
+
+def retrying(operation: Callable, attempts: int = 3, backoff: float = 0.1) -> Callable:
+    """
+    Wrap an operation so requests failing with a transient status code are sent again,
+    waiting `backoff` seconds before the first retry and twice as long before each next one
+    """
+
+    def _operation(item: Any) -> Any:
+        for attempt in range(1, attempts + 1):
+            try:
+                return operation(item)
+            except ACSRequestException as e:
+                if e.status_code not in TRANSIENT_STATUS_CODES or attempt == attempts:
+                    raise
+                time.sleep(backoff * 2 ** (attempt - 1))
+
+    return _operation
+
+
+def _timed_call(operation: Callable, key: Hashable, item: Any) -> BulkResult:
+    start = time.perf_counter()
+    try:
+        response = operation(item)
+    except Exception as e:  # one failure must not stop the rest of the batch
+        return BulkResult(key=key, error=e, elapsed=time.perf_counter() - start)
+    return BulkResult(key=key, response=response, elapsed=time.perf_counter() - start)
+
+
+def iter_concurrently(
+    operation: Callable[[Any], Any],
+    items: Iterable[tuple[Hashable, Any]],
+    max_workers: int,
+    max_in_flight: Optional[int] = None,
+) -> Iterator[BulkResult]:
+    """
+    Call `operation` on every item using a bounded pool of worker threads,
+    yielding a BulkResult for each item as soon as it completes.
+
+    `items` is consumed lazily, so no more than `max_in_flight` items
+    (default: `max_workers`) are held by the pool at once.
+
+    :param operation: called with each item. Its return value becomes the result's response.
+    :param items: (key, item) pairs. The key identifies the item in its BulkResult.
+    :param max_workers: number of worker threads
+    :param max_in_flight: maximum number of submitted operations that haven't finished
+    """
+    max_in_flight = max(1, max_in_flight or max_workers)
+    max_workers = max(1, min(max_workers, max_in_flight))
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {
+            executor.submit(_timed_call, operation, key, item)
+            for key, item in islice(items, max_in_flight)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for key, item in islice(items, len(done)):
+                pending.add(executor.submit(_timed_call, operation, key, item))
+            for future in done:
+                yield future.result()
+
+
+def run_concurrently(
+    operation: Callable[[Any], Any],
+    items: Iterable[tuple[Hashable, Any]],
+    max_workers: int,
+    max_in_flight: Optional[int] = None,
+    progress: Optional[Callable[[int, BulkResult], None]] = None,
+) -> list[BulkResult]:
+    """
+    Call `operation` on every item using a bounded pool of worker threads.
+
+    :param progress: called with the number of finished items and the latest result
+    :return: one BulkResult per item, in the same order as `items`
+    """
+    keys = {}
+    results = {}
+
+    def _indexed_items():
+        for index, (key, item) in enumerate(items):
+            keys[index] = key
+            yield index, item
+
+    for count, result in enumerate(
+        iter_concurrently(operation, _indexed_items(), max_workers, max_in_flight), start=1
+    ):
+        index = result.key
+        result.key = keys.pop(index)
+        results[index] = result
+        if progress:
+            progress(count, result)
+    return [results[index] for index in sorted(results)]
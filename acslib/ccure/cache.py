@@ -0,0 +1,72 @@
+"""Small in-memory caches for looked-up CCure data"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    A thread-safe cache whose entries expire `ttl` seconds after they're stored.
+    Once the total size of the stored values passes `max_size`, the least recently
+    used entries are dropped. Storing an entry also drops expired entries that haven't
+    been used since a newer one was.
+
+    :param ttl: seconds each entry is kept
+    :param max_size: maximum total size of the stored values
+    :param size: gives the size of a value. By default each value has size 1.
+    """
+
+    def __init__(self, ttl: float, max_size: int, size: Callable[[Any], int] = lambda value: 1):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.size = size
+        self.total_size = 0
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                return default
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: Hashable, value: Any):
+        size = self.size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_size:
+                return
+            now = time.monotonic()
+            while self._entries and next(iter(self._entries.values()))[0] < now:
+                self._remove(next(iter(self._entries)))
+            self._entries[key] = (now + self.ttl, size, value)
+            self.total_size += size
+            while self.total_size > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_size = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        self.total_size -= self._entries.pop(key)[1]
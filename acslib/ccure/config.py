@@ -17,6 +17,10 @@ class CcureConfig(ACSConfig):
     :param PAGE_SIZE: default 100
     :param CLEARANCE_LIMIT: default 40
     :param TIMEOUT: default 3
+    :param MAX_WORKERS: default 8, number of concurrent requests made by bulk operations
+    :param RATE_LIMIT: default None, maximum requests per second sent by one connection
+    :param CCURE_SESSION_FILE: default None, file where connections on this host share a session
+    :param CCURE_SESSION_MAX_AGE: default None, seconds before a shared session is replaced
     :param kwargs:
     :return: CcureConfig
     """
@@ -26,6 +30,8 @@ class CcureConfig(ACSConfig):
         self.current_page = 1
         self.clearance_limit = kwargs.get("clearance_limit", 40)
         self.timeout = kwargs.get("timeout", 3)
+        self.max_workers = kwargs.get("max_workers", 8)
+        self.rate_limit = kwargs.get("rate_limit")
         self.endpoints = None
         self.username = kwargs.get("CCURE_USERNAME", os.getenv("CCURE_USERNAME"))
         self.password = kwargs.get("CCURE_PASSWORD", os.getenv("CCURE_PASSWORD"))
@@ -33,6 +39,12 @@ class CcureConfig(ACSConfig):
         self.client_name = kwargs.get("CCURE_CLIENT_NAME", os.getenv("CCURE_CLIENT_NAME"))
         self.client_version = kwargs.get("CCURE_CLIENT_VERSION", os.getenv("CCURE_CLIENT_VERSION"))
         self.client_id = kwargs.get("CCURE_CLIENT_ID", os.getenv("CCURE_CLIENT_ID"))
+        self.session_file = kwargs.get("CCURE_SESSION_FILE", os.getenv("CCURE_SESSION_FILE"))
+        session_max_age = kwargs.get("CCURE_SESSION_MAX_AGE", os.getenv("CCURE_SESSION_MAX_AGE"))
+        try:
+            self.session_max_age = float(session_max_age) if session_max_age else None
+        except ValueError as e:
+            raise ACSConfigException(f"Invalid CCURE_SESSION_MAX_AGE: {session_max_age}") from e
         if not all(
             [
                 self.username,
@@ -1,8 +1,10 @@
 import logging
+import threading
 from numbers import Number
 from typing import Optional
 
 from acslib.base import (
+    ACSConfigException,
     ACSConnection,
     ACSRequestData,
     ACSRequestException,
@@ -10,7 +12,10 @@ from acslib.base import (
     status,
 )
 from acslib.base.connection import ACSRequestMethod
+from acslib.ccure.bulk import RateLimiter
 from acslib.ccure.config import CcureConfigFactory
+from acslib.ccure.session_pool import SessionPool
+from acslib.ccure.session_store import FileSessionStore
 
 
 class CcureConnection(ACSConnection):
@@ -19,8 +24,17 @@ class CcureConnection(ACSConnection):
         A connection object to the CCure Server.
         Parameters:
         :param kwargs:
+        :param session_store: a SessionStore shared with other connections, so they all use
+            one CCure session. Defaults to a FileSessionStore at `config.session_file`, if set,
+            replacing sessions older than `config.session_max_age`.
+        :param session_pool_size: number of CCure sessions to spread requests across
+        :param session_selection: how pooled sessions are handed out, "least_busy" or
+            "round_robin"
         """
         self._session_id = None
+        self._rejected_session_id = None
+        # bulk operations share one connection across threads; only one of them should log in
+        self._session_lock = threading.RLock()
         if conn_logger := kwargs.get("logger"):
             self.logger = conn_logger
         else:
@@ -28,14 +42,38 @@ class CcureConnection(ACSConnection):
 
         if not kwargs.get("config"):
             kwargs["config"] = CcureConfigFactory()
+        kwargs.setdefault("pool_size", kwargs["config"].max_workers)
         self.logger.info("Initializing CCure connection")
         super().__init__(**kwargs)
+        #: shares the session ID with other connections, such as those in other processes
+        self.session_store = kwargs.get("session_store")
+        if self.session_store is None and self.config.session_file:
+            self.session_store = FileSessionStore(
+                self.config.session_file, self.config.session_max_age
+            )
+        #: spreads requests over several sessions, if `session_pool_size` is over 1
+        self.session_pool = None
+        pool_size = kwargs.get("session_pool_size", 1)
+        if pool_size > 1:
+            if self.session_store:
+                raise ACSConfigException("A connection can't use a session store and pool")
+            self.session_pool = SessionPool(
+                pool_size,
+                self._authenticate,
+                self._send_logout,
+                kwargs.get("session_selection", "least_busy"),
+            )
+        rate_limit = self.config.rate_limit
+        self.rate_limiter = RateLimiter(rate_limit) if rate_limit else None
 
     @property
     def session_id(self) -> str:
+        if self.session_pool:
+            return self.session_pool.any_session_id()
         if self._session_id:
             return self._session_id
-        return self.login()
+        with self._session_lock:
+            return self._session_id or self.login()
 
     @property
     def base_headers(self):
@@ -50,7 +88,23 @@ class CcureConnection(ACSConnection):
         return {"Content-Type": "application/x-www-form-urlencoded"}
 
     def login(self):
-        """Open a new CCure session and generate a new session ID"""
+        """
+        Open a new CCure session and generate a new session ID
+
+        With a session store, the shared session is used instead if no request has been
+        refused with it, and only one of the connections sharing it logs in.
+        """
+        if self.session_store:
+            self._session_id = self.session_store.refresh(
+                self._rejected_session_id, self._authenticate
+            )
+            self._rejected_session_id = None
+        else:
+            self._session_id = self._authenticate()
+        return self._session_id
+
+    def _authenticate(self) -> str:
+        """Log in to CCure and return the new session ID"""
         try:
             response = self.request(
                 ACSRequestMethod.POST,
@@ -59,36 +113,80 @@ class CcureConnection(ACSConnection):
                     data=self.config.connection_data,
                 ),
             )
-            self._session_id = response.headers["session-id"]
-            self.logger.debug(f"Fetched new Session ID: {self._session_id}")
+            session_id = response.headers["session-id"]
+            self.logger.debug(f"Fetched new Session ID: {session_id}")
         except ACSRequestException as e:
             self.logger.error(f"Error Fetching Session ID: {e}")
             self.log_session_details()
             self.logger.debug(f"Connection data: {self.config.connection_data}")
             raise e
-        return self._session_id
+        return session_id
 
     def logout(self):
-        """Log out of the CCure session"""
+        """
+        Log out of the CCure session
+
+        With a session store, the shared session stays open for the other connections using
+        it, and only this connection stops using it. Use `revoke` to end the shared session.
+        With a session pool, every session in the pool is logged out.
+        """
+        if self.session_pool:
+            self.session_pool.close()
+            return
+        if self.session_store:
+            self._session_id = None
+            return
+        self._end_session()
+
+    def revoke(self):
+        """End the CCure session, including for every connection sharing it through a store"""
+        if self.session_store:
+            self._session_id = self._session_id or self.session_store.get()
+            if self._session_id:
+                self.session_store.clear(self._session_id)
+        self._end_session()
+
+    def _end_session(self):
         if self._session_id:
-            self.logger.debug(f"Logging out of CCure session: {self._session_id}")
             try:
-                self.request(
-                    ACSRequestMethod.POST,
-                    request_data=ACSRequestData(
-                        url=self.config.base_url + self.config.endpoints.LOGOUT,
-                        headers={"session-id": self._session_id},
-                    ),
-                )
-            except ACSRequestException as e:
-                self.logger.error(f"Error logging out of CCure session: {e}")
-                self.log_session_details()
+                self._send_logout(self._session_id)
             finally:
                 self.logger.debug(f"Removing Session ID: {self._session_id}")
                 self._session_id = None
 
+    def _send_logout(self, session_id: str):
+        self.logger.debug(f"Logging out of CCure session: {session_id}")
+        try:
+            # skip the retry on 401, which would log in again only to log out
+            ACSConnection.request(
+                self,
+                ACSRequestMethod.POST,
+                request_data=ACSRequestData(
+                    url=self.config.base_url + self.config.endpoints.LOGOUT,
+                    headers={"session-id": session_id},
+                ),
+                timeout=self.config.timeout,
+            )
+        except ACSRequestException as e:
+            self.logger.error(f"Error logging out of CCure session: {e}")
+            self.log_session_details()
+
     def keepalive(self):
-        """Prevent the CCure api session from expiring from inactivity"""
+        """
+        Prevent the CCure api session from expiring from inactivity
+
+        With a session pool, every open session is kept alive, and only a session that
+        can't be is dropped from the pool, to log in again when next used.
+        """
+        if self.session_pool:
+            for pooled in self.session_pool.sessions:
+                if session_id := pooled.session_id:
+                    try:
+                        self._send_keepalive(session_id)
+                    except ACSRequestException as e:
+                        self.logger.error(f"Error keeping CCure session alive: {e}")
+                        self.session_pool.invalidate(pooled, session_id)
+            return
         self.logger.debug(f"Keeeping CCure session alive: {self.session_id}")
         try:
             self.request(
@@ -107,6 +205,19 @@ class CcureConnection(ACSConnection):
             self.log_session_details()
             self.logout()
 
+    def _send_keepalive(self, session_id: str):
+        self.logger.debug(f"Keeping CCure session alive: {session_id}")
+        # a pooled session is kept alive itself, rather than whichever session the pool picks
+        ACSConnection.request(
+            self,
+            ACSRequestMethod.POST,
+            request_data=ACSRequestData(
+                url=self.config.base_url + self.config.endpoints.KEEPALIVE,
+                headers={"session-id": session_id},
+            ),
+            timeout=self.config.timeout,
+        )
+
     def request(
         self,
         requests_method: ACSRequestMethod,
@@ -126,19 +237,51 @@ class CcureConnection(ACSConnection):
 
         Returns: An object with status_code, json, and headers attributes
         """
-        while request_attempts > 0:
-            try:
-                return super().request(
-                    requests_method,
-                    request_data,
-                    timeout or self.config.timeout,
-                )
-            except ACSRequestException as e:
-                if e.status_code != status.HTTP_401_UNAUTHORIZED or request_attempts == 1:
-                    raise e
-                request_attempts -= 1
-                self.logout()
-                request_data.headers["session-id"] = self.session_id
+        pooled = None
+        try:
+            while request_attempts > 0:
+                if self.rate_limiter:
+                    self.rate_limiter.wait()
+                if (
+                    pooled is None
+                    and self.session_pool
+                    and "session-id" in (request_data.headers or {})
+                ):
+                    # the pool picks the session when the request is sent, so it knows what's busy
+                    pooled, request_data.headers["session-id"] = self.session_pool.acquire()
+                try:
+                    return super().request(
+                        requests_method,
+                        request_data,
+                        timeout or self.config.timeout,
+                    )
+                except ACSRequestException as e:
+                    if (
+                        e.status_code != status.HTTP_401_UNAUTHORIZED
+                        or request_attempts == 1
+                        or "session-id" not in (request_data.headers or {})
+                    ):
+                        raise e
+                    request_attempts -= 1
+                    if pooled:
+                        # log the refused session in again, and retry on it
+                        request_data.headers["session-id"] = self.session_pool.renew(
+                            pooled, request_data.headers["session-id"]
+                        )
+                        continue
+                    with self._session_lock:
+                        # another thread may have already replaced the expired session
+                        if self._session_id == request_data.headers.get("session-id"):
+                            if self.session_store:
+                                # let the store decide whether this connection logs in
+                                self._rejected_session_id = self._session_id
+                                self._session_id = None
+                            else:
+                                self.logout()
+                        request_data.headers["session-id"] = self.session_id
+        finally:
+            if pooled:
+                self.session_pool.release(pooled)
 
     def log_session_details(self):
         """Log session ID and the api version number"""
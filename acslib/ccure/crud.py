@@ -1,17 +1,25 @@
+from array import array
+from concurrent.futures import Future
 from numbers import Number
-from typing import Any, Optional, Literal
+from typing import Any, Callable, Iterable, Optional, Literal
+
+from pydantic import ValidationError
 
 from acslib.base import ACSRequestResponse
 from acslib.base.connection import ACSNotImplementedException
 from acslib.ccure.base import CcureACS
+from acslib.ccure.bulk import BulkResult, chunked, get_object_id, run_concurrently
+from acslib.ccure.cache import TTLCache
 from acslib.ccure.connection import CcureConnection
 from acslib.ccure.filters import (
+    CcureFilter,
     ClearanceFilter,
     ClearanceItemFilter,
     CredentialFilter,
     PersonnelFilter,
     GroupFilter,
     GroupMemberFilter,
+    in_clause,
 )
 from acslib.ccure.data_models import (
     ClearanceItemCreateData,
@@ -19,9 +27,55 @@ from acslib.ccure.data_models import (
     PersonnelCreateData,
 )
 from acslib.ccure.types import ObjectType
+from acslib.ccure.typeahead import Typeahead
+
+#: Door ModeStatus values
+LOCK_STATES = {
+    0: "Unknown",
+    1: "Unlocked",
+    2: "Locked",
+    3: "No Access",
+    4: "Momentary Unlock",
+}
+
+
+class _TypedBulkWrites:
+    """
+    `update_many` and `delete_many` for CCure API classes that set `self.type`
+    to the object type they work with
+    """
+
+    type: str
+
+    def update_many(
+        self,
+        updates: dict[int, dict],
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        progress: Optional[Callable[[int, BulkResult], None]] = None,
+    ) -> list[BulkResult]:
+        """
+        Edit properties of many objects of this type concurrently
+
+        :param updates: maps object IDs to their property changes
+        :param max_workers: number of worker threads. Defaults to `config.max_workers`.
+        :param max_in_flight: maximum number of unfinished requests
+        :param progress: called with the number of finished updates and the latest result
+        """
+        return super().update_many(self.type, updates, max_workers, max_in_flight, progress)
+
+    def delete_many(
+        self,
+        object_ids: Iterable[int],
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        progress: Optional[Callable[[int, BulkResult], None]] = None,
+    ) -> list[BulkResult]:
+        """Delete many objects of this type concurrently. Options are the same as in `update_many`."""
+        return super().delete_many(self.type, object_ids, max_workers, max_in_flight, progress)
 
 
-class CcurePersonnel(CcureACS):
+class CcurePersonnel(_TypedBulkWrites, CcureACS):
     def __init__(self, connection: CcureConnection):
         super().__init__(connection)
         self.search_filter = PersonnelFilter()
@@ -36,12 +90,14 @@ class CcurePersonnel(CcureACS):
         timeout: Number = 0,
         search_options: Optional[dict] = None,
         where_clause: Optional[str] = None,
+        include: Optional[list[str]] = None,
     ) -> list:
         """
         Get a list of Personnel objects matching given search terms
 
         :param terms: list of search terms
         :param search filter: specifies how and in what fields to look for the search terms
+        :param include: related objects to add to each result, from relations.RELATIONS
         """
         self.logger.info("Searching for personnel")
         search_filter = search_filter or self.search_filter
@@ -55,11 +111,21 @@ class CcurePersonnel(CcureACS):
             timeout=timeout,
             search_options=search_options,
             where_clause=where_clause,
+            include=include,
         )
 
     def get_property(self, object_id: int, property_name: str) -> Any:
         return super().get_property(self.type, object_id, property_name)
 
+    def typeahead(self, limit: int = 25, debounce: float = 0.15) -> Typeahead:
+        """
+        Prefix search of personnel first and last names for search-as-you-type pickers
+
+        :param limit: maximum number of results per query
+        :param debounce: seconds `Typeahead.submit` waits for a newer query before searching
+        """
+        return Typeahead(self, ["FirstName", "LastName"], limit=limit, debounce=debounce)
+
     def count(
         self, terms: Optional[list] = None, search_filter: Optional[PersonnelFilter] = None
     ) -> int:
@@ -71,7 +137,7 @@ class CcurePersonnel(CcureACS):
             search_options={"CountOnly": True},
         )
 
-    def update(self, object_id: int, update_data: dict) -> ACSRequestResponse:
+    def update(self, object_id: int, update_data: dict) -> ACSRequestResponse | Future:
         """
         Edit properties of a personnel object
 
@@ -96,6 +162,38 @@ class CcurePersonnel(CcureACS):
         }
         return super().create(request_data=request_data)
 
+    def create_many(
+        self,
+        records: Iterable[PersonnelCreateData | dict],
+        max_workers: Optional[int] = None,
+    ) -> list[BulkResult]:
+        """
+        Create many personnel objects concurrently
+
+        Every record is validated before any request is sent. Records that fail validation
+        and records CCure rejects get a failed result; the rest of the batch is still created.
+
+        :param records: PersonnelCreateData objects or dicts of Personnel properties
+        :param max_workers: number of concurrent requests. Defaults to `config.max_workers`.
+        :return: one BulkResult per record, in order, keyed by the record's index.
+            `object_id` is set to the new Personnel ObjectID when CCure reports it.
+        """
+        results = {}
+        valid_records = []
+        for index, record in enumerate(records):
+            try:
+                valid_records.append((index, PersonnelCreateData.model_validate(record)))
+            except ValidationError as e:
+                results[index] = BulkResult(key=index, error=e)
+
+        self.logger.info(f"Creating {len(valid_records)} personnel objects")
+        for result in run_concurrently(
+            self.create, valid_records, max_workers or self.config.max_workers
+        ):
+            result.object_id = get_object_id(result.response)
+            results[result.key] = result
+        return [results[index] for index in sorted(results)]
+
     def delete(self, personnel_id: int) -> ACSRequestResponse:
         """Delete a personnel object by its CCure ID"""
         return super().delete(object_type=self.type, object_id=personnel_id)
@@ -139,6 +237,15 @@ class CcureClearance(CcureACS):
     def get_property(self, object_id: int, property_name: str) -> Any:
         return super().get_property(self.type, object_id, property_name)
 
+    def typeahead(self, limit: int = 25, debounce: float = 0.15) -> Typeahead:
+        """
+        Prefix search of clearance names for search-as-you-type pickers
+
+        :param limit: maximum number of results per query
+        :param debounce: seconds `Typeahead.submit` waits for a newer query before searching
+        """
+        return Typeahead(self, ["Name"], limit=limit, debounce=debounce)
+
     def count(
         self, terms: Optional[list] = None, search_filter: Optional[ClearanceFilter] = None
     ) -> int:
@@ -160,7 +267,7 @@ class CcureClearance(CcureACS):
         raise ACSNotImplementedException("Deleting clearances is not currently supported.")
 
 
-class CcureCredential(CcureACS):
+class CcureCredential(_TypedBulkWrites, CcureACS):
     def __init__(self, connection: Optional[CcureConnection] = None):
         super().__init__(connection)
         self.search_filter = CredentialFilter()
@@ -175,12 +282,14 @@ class CcureCredential(CcureACS):
         timeout: int = 0,
         search_options: Optional[dict] = None,
         where_clause: Optional[str] = None,
+        include: Optional[list[str]] = None,
     ) -> list:
         """
         Get a list of Credential objects matching given search terms
 
         :param terms: list of search terms
         :param search filter: specifies how and in what fields to look for the search terms
+        :param include: related objects to add to each result, from relations.RELATIONS
         """
         self.logger.info("Searching for credentials")
         search_filter = search_filter or self.search_filter
@@ -193,6 +302,7 @@ class CcureCredential(CcureACS):
             timeout=timeout,
             search_options=search_options,
             where_clause=where_clause,
+            include=include,
         )
 
     def get_property(self, object_id: int, property_name: str) -> Any:
@@ -209,7 +319,7 @@ class CcureCredential(CcureACS):
             search_options={"CountOnly": True},
         )
 
-    def update(self, record_id: int, update_data: dict) -> ACSRequestResponse:
+    def update(self, record_id: int, update_data: dict) -> ACSRequestResponse | Future:
         """
         Edit properties of a Credential object
 
@@ -242,7 +352,7 @@ class CcureCredential(CcureACS):
         return super().delete(object_type=self.type, object_id=record_id)
 
 
-class CcureClearanceItem(CcureACS):
+class CcureClearanceItem(_TypedBulkWrites, CcureACS):
     """API interactions for doors and elevators"""
 
     def __init__(self, connection: Optional[CcureConnection] = None):
@@ -284,13 +394,55 @@ class CcureClearanceItem(CcureACS):
 
     def get_lock_state(self, door_id: int):
         mode_status = self.get_property(ObjectType.DOOR.complete, door_id, "ModeStatus")
-        return {
-            0: "Unknown",
-            1: "Unlocked",
-            2: "Locked",
-            3: "No Access",
-            4: "Momentary Unlock",
-        }.get(mode_status, "Unknown")
+        return LOCK_STATES.get(mode_status, "Unknown")
+
+    def get_lock_states(
+        self,
+        door_ids: Optional[Iterable[int]] = None,
+        page_size: Optional[int] = None,
+        chunk_size: int = 500,
+    ) -> dict[int, str]:
+        """
+        Get the lock states of many doors with a few paged searches
+
+        :param door_ids: the doors to check. Leave empty to get every door.
+        :param page_size: number of doors in each page of results
+        :param chunk_size: maximum number of door IDs in each search
+        :return: maps door IDs to lock states, eg. "Unlocked", "Locked", etc
+        """
+        search_filter = CcureFilter(display_properties=["ObjectID", "ModeStatus"])
+        if door_ids is None:
+            where_clauses = [""]
+            lock_states = {}
+        else:
+            door_ids = list(door_ids)
+            where_clauses = [
+                in_clause("ObjectID", chunk) for chunk in chunked(door_ids, chunk_size)
+            ]
+            lock_states = dict.fromkeys(door_ids, "Unknown")
+
+        def get_mode_statuses(where_clause: str) -> list[dict]:
+            return [
+                door
+                for page in self.search_pages(
+                    object_type=ObjectType.DOOR.complete,
+                    search_filter=search_filter,
+                    page_size=page_size,
+                    where_clause=where_clause,
+                )
+                for door in page
+            ]
+
+        for result in run_concurrently(
+            get_mode_statuses,
+            ((where_clause, where_clause) for where_clause in where_clauses),
+            self.config.max_workers,
+        ):
+            if not result.ok:
+                raise result.error
+            for door in result.response:
+                lock_states[door["ObjectID"]] = LOCK_STATES.get(door.get("ModeStatus"), "Unknown")
+        return lock_states
 
     def count(
         self,
@@ -305,7 +457,7 @@ class CcureClearanceItem(CcureACS):
             search_options={"CountOnly": True},
         )
 
-    def update(self, item_id: int, update_data: dict) -> ACSRequestResponse:
+    def update(self, item_id: int, update_data: dict) -> ACSRequestResponse | Future:
         """
         Edit properties of a ClearanceItem object
 
@@ -346,6 +498,13 @@ class CcureGroup(CcureACS):
         super().__init__(connection)
         self.search_filter = GroupFilter()
         self.type = ObjectType.GROUP.complete
+        #: each group's direct members, as arrays of ObjectIDs by type, sized by member count.
+        #: Each group counts as one more, so groups without members can't fill it unbounded.
+        self.member_cache = TTLCache(
+            ttl=300,
+            max_size=1_000_000,
+            size=lambda members: 1 + sum(len(ids) for ids in members.values()),
+        )
 
     def search(
         self,
@@ -386,6 +545,100 @@ class CcureGroup(CcureACS):
             search_options={"CountOnly": True},
         )
 
+    def get_member_ids(
+        self, group_ids: int | Iterable[int], nested: bool = True
+    ) -> dict[str, set[int]]:
+        """
+        Get the ObjectIDs of the members of one or more groups, by member type
+
+        Each member's type is its GroupMember row's `GroupType`. Direct memberships are
+        cached for `member_cache.ttl` seconds.
+
+        :param group_ids: a group's ObjectID, or many groups' ObjectIDs
+        :param nested: include the members of groups that are members, instead of the groups
+        """
+        pending = {group_ids} if isinstance(group_ids, int) else set(group_ids)
+        seen = set()
+        member_ids = {}
+        while pending:
+            seen |= pending
+            next_pending = set()
+            for members in self._direct_members(pending).values():
+                for type_name, ids in members.items():
+                    if nested and type_name == self.type:
+                        next_pending.update(ids)
+                    else:
+                        member_ids.setdefault(type_name, set()).update(ids)
+            pending = next_pending - seen
+        return member_ids
+
+    def resolve_members(
+        self,
+        group_ids: int | Iterable[int],
+        display_properties: Optional[list[str]] = None,
+        nested: bool = True,
+        batch_size: int = 500,
+        max_workers: Optional[int] = None,
+    ) -> list[dict]:
+        """
+        Get the objects that are members of one or more groups
+
+        Member IDs come from `get_member_ids`. The objects are fetched with concurrent
+        `ObjectID IN (...)` searches of `batch_size` members each, and aren't cached.
+
+        :param display_properties: properties to include for each member
+        :param max_workers: number of concurrent searches. Defaults to `config.max_workers`.
+        """
+        search_filter = CcureFilter(display_properties=list(display_properties or []))
+        batches = [
+            (type_name, batch)
+            for type_name, ids in self.get_member_ids(group_ids, nested).items()
+            for batch in chunked(sorted(ids), batch_size)
+        ]
+        results = run_concurrently(
+            lambda batch: CcureACS.search(
+                self,
+                object_type=batch[0],
+                search_filter=search_filter,
+                page_size=len(batch[1]),
+                where_clause=in_clause("ObjectID", batch[1]),
+            ),
+            ((batch[0], batch) for batch in batches),
+            max_workers or self.config.max_workers,
+        )
+        members = []
+        for result in results:
+            if not result.ok:
+                raise result.error
+            members.extend(result.response)
+        return members
+
+    def _direct_members(self, group_ids: set[int]) -> dict[int, dict[str, array]]:
+        """Each group's direct members as arrays of ObjectIDs by type, from the cache or CCure"""
+        members = {group_id: self.member_cache.get(group_id) for group_id in group_ids}
+        missing = sorted(group_id for group_id, cached in members.items() if cached is None)
+        if not missing:
+            return members
+        self.logger.info(f"Looking up members of {len(missing)} groups")
+        search_filter = CcureFilter(display_properties=["GroupID", "TargetObjectID", "GroupType"])
+        for group_id in missing:
+            members[group_id] = {}
+        for chunk in chunked(missing, self.config.page_size):
+            for page in CcureACS.search_pages(
+                self,
+                object_type=ObjectType.GROUP_MEMBER.complete,
+                search_filter=search_filter,
+                page_size=self.config.page_size,
+                where_clause=in_clause("GroupID", chunk),
+            ):
+                for row in page:
+                    members[row["GroupID"]].setdefault(row["GroupType"], array("q")).append(
+                        row["TargetObjectID"]
+                    )
+        for group_id in missing:
+            self.member_cache.set(group_id, members[group_id])
+        return members
+
     def update(self, *args, **kwargs) -> ACSRequestResponse:
         raise ACSNotImplementedException("Updating groups is not currently supported.")
 
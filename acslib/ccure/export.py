@@ -0,0 +1,252 @@
+"""Stream CCure objects into JSONL, CSV, or Parquet files"""
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+from acslib.base import ACSRequestException
+from acslib.ccure.base import CcureACS
+from acslib.ccure.connection import CcureConnection
+from acslib.ccure.filters import CcureFilter
+from acslib.ccure.types import ObjectType
+
+FORMATS = ("jsonl", "csv", "parquet")
+COMPRESSION = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+_OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+
+
+def object_type_name(object_type: ObjectType | str) -> str:
+    """
+    The full type name for an ObjectType, an ObjectType value such as "clearance assignment"
+    (underscores and hyphens may replace spaces), or a full type name
+    """
+    if isinstance(object_type, ObjectType):
+        return object_type.complete
+    try:
+        return ObjectType(object_type.lower().replace("_", " ").replace("-", " ")).complete
+    except ValueError:
+        return object_type
+
+
+def iter_pages(
+    ccure: CcureACS,
+    object_type: str,
+    search_filter: CcureFilter,
+    page_size: int,
+    where_clause: str = "",
+    max_workers: int = 1,
+) -> Iterator[list]:
+    """
+    Yield every page of a search in order, fetching up to `max_workers` pages at once.
+    At most `max_workers` pages are held in memory, and fetching stops after the first
+    page with fewer than `page_size` results. A `page_size` of 0 or less sends a single
+    unpaged search.
+    """
+
+    def fetch(page_number: int) -> list:
+        return CcureACS.search(
+            ccure,
+            object_type=object_type,
+            search_filter=search_filter,
+            page_size=page_size,
+            page_number=page_number,
+            where_clause=where_clause,
+        )
+
+    if page_size <= 0:
+        page = fetch(1)
+        if page:
+            yield page
+        return
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = [executor.submit(fetch, page_number) for page_number in range(1, max_workers + 1)]
+        next_page = max_workers + 1
+        while pending:
+            page = pending.pop(0).result() or []
+            if page:
+                yield page
+            if len(page) < page_size:
+                for future in pending:
+                    future.cancel()
+                return
+            pending.append(executor.submit(fetch, next_page))
+            next_page += 1
+
+
+class _JsonlWriter:
+    def __init__(self, stream: BinaryIO, properties: Optional[list[str]]):
+        self.stream = io.TextIOWrapper(stream, encoding="utf-8", newline="\n")
+
+    def write(self, rows: list[dict]):
+        self.stream.write("".join(json.dumps(row, default=str) + "\n" for row in rows))
+
+    def close(self):
+        self.stream.flush()
+        self.stream.detach()
+
+
+class _CsvWriter:
+    def __init__(self, stream: BinaryIO, properties: Optional[list[str]]):
+        self.stream = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        self.properties = properties
+        self.writer = None
+
+    def write(self, rows: list[dict]):
+        if self.writer is None:
+            # without a property list, the columns are the first page's properties
+            fieldnames = self.properties or list(dict.fromkeys(key for row in rows for key in row))
+            self.writer = csv.DictWriter(self.stream, fieldnames, extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.stream.flush()
+        self.stream.detach()
+
+
+class _ParquetWriter:
+    def __init__(self, stream: BinaryIO, properties: Optional[list[str]], compression: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Exporting to Parquet requires pyarrow") from e
+        self.pyarrow = pyarrow
+        self.parquet = pyarrow.parquet
+        self.stream = stream
+        self.properties = properties
+        self.compression = compression
+        self.writer = None
+
+    def write(self, rows: list[dict]):
+        if self.properties:
+            rows = [{name: row.get(name) for name in self.properties} for row in rows]
+        if self.writer is None:
+            # a column with no values on the first page is written as strings, rather than
+            # with a null type that no later value could be stored in
+            schema = self.pyarrow.schema(
+                [
+                    field.with_type(self.pyarrow.string())
+                    if self.pyarrow.types.is_null(field.type)
+                    else field
+                    for field in self.pyarrow.Table.from_pylist(rows).schema
+                ]
+            )
+            self.writer = self.parquet.ParquetWriter(
+                self.stream, schema, compression=self.compression
+            )
+        schema = self.writer.schema
+        columns = [self._column([row.get(field.name) for row in rows], field) for field in schema]
+        self.writer.write_table(self.pyarrow.Table.from_arrays(columns, schema=schema))
+
+    def _column(self, values: list, field):
+        """Build a column of the file's type for one field, converting values that don't fit"""
+        pyarrow = self.pyarrow
+        try:
+            return pyarrow.array(values, type=field.type)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+            if pyarrow.types.is_string(field.type):
+                return pyarrow.array(
+                    [None if value is None else str(value) for value in values], type=field.type
+                )
+            # such as floats in a column of integers, which fails if any value would change
+            return pyarrow.array(values).cast(field.type)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def export_objects(
+    object_type: ObjectType | str,
+    destination: str | os.PathLike | BinaryIO,
+    format: Optional[str] = None,
+    properties: Optional[list[str]] = None,
+    where_clause: str = "",
+    connection: Optional[CcureConnection] = None,
+    page_size: int = 1000,
+    max_workers: int = 1,
+    compression: Optional[str] = None,
+    progress: Optional[Callable[[int], Any]] = None,
+) -> int:
+    """
+    Write every CCure object of one type to a file, one page at a time
+
+    Pages are written as they arrive, so memory use depends on `page_size` and
+    `max_workers`, not on the number of objects.
+
+    :param object_type: an ObjectType, an ObjectType value such as "personnel", or a full
+        type name
+    :param destination: a file path, or a writable binary stream, which is left open.
+        A file path only appears once the export has finished.
+    :param format: "jsonl", "csv", or "parquet" (requires pyarrow). Defaults to the file
+        extension, then "jsonl".
+    :param properties: properties to export. Leave empty to export CCure's default
+        properties for the type.
+    :param where_clause: only export objects matching this WHERE clause
+    :param connection: used to search CCure
+    :param page_size: objects per search page
+    :param max_workers: number of pages fetched at once
+    :param compression: "gzip", "bz2", or "xz". For paths, defaults to the file extension.
+        For Parquet, any codec pyarrow supports, applied inside the file.
+    :param progress: called with the number of objects written after each page
+    :return: the number of objects written
+    """
+    path = None if hasattr(destination, "write") else os.fspath(destination)
+    name = path or ""
+    if path and compression is None:
+        compression = COMPRESSION.get(os.path.splitext(name)[1])
+    if compression in _OPENERS:
+        name = os.path.splitext(name)[0] if name.endswith(tuple(COMPRESSION)) else name
+    format = format or os.path.splitext(name)[1].lstrip(".") or "jsonl"
+    if format not in FORMATS:
+        raise ACSRequestException(400, f"Unknown export format: {format}")
+
+    ccure = CcureACS(connection)
+    type_name = object_type_name(object_type)
+    search_filter = CcureFilter(display_properties=list(properties or []))
+    # a path is written under a temporary name, then renamed, so a failed export leaves
+    # no partial file behind
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part" if path else None
+    file = open(temp_path, "wb") if path else destination
+    stream = file
+    written = 0
+    try:
+        if format == "parquet":
+            writer = _ParquetWriter(stream, properties, compression or "snappy")
+        else:
+            if compression in _OPENERS:
+                stream = _OPENERS[compression](file, "wb")
+            elif compression:
+                raise ACSRequestException(400, f"Unknown compression: {compression}")
+            writer = (_JsonlWriter if format == "jsonl" else _CsvWriter)(stream, properties)
+        for page in iter_pages(
+            ccure, type_name, search_filter, page_size, where_clause, max_workers
+        ):
+            writer.write(page)
+            written += len(page)
+            if progress:
+                progress(written)
+        writer.close()
+    except BaseException:
+        if path:
+            stream.close()
+            file.close()
+            os.remove(temp_path)
+        raise
+    # a compressed stream wraps the file without closing it
+    if stream is not file:
+        stream.close()
+    if path:
+        file.close()
+        os.replace(temp_path, path)
+    ccure.logger.info(f"Exported {written} {type_name} objects")
+    return written
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Iterable, Optional
 
 from acslib.base.search import ACSFilter, BooleanOperators, TermOperators
 
@@ -24,6 +24,19 @@ RFUZZ = right_fuzz
 FUZZ = full_fuzz
 NFUZZ = no_fuzz
 
+
+def in_clause(field_name: str, values: Iterable) -> str:
+    """Build a `field IN (...)` query matching any of the given numbers or strings"""
+
+    def literal(value) -> str:
+        if isinstance(value, (int, float)):
+            return str(value)
+        escaped = str(value).replace("'", "''")
+        return f"'{escaped}'"
+
+    return f"{field_name} IN ({', '.join(literal(value) for value in values)})"
+
+
 PERSONNEL_LOOKUP_FIELDS = {"FirstName": FUZZ, "LastName": FUZZ}
 CLEARANCE_LOOKUP_FIELDS = {"Name": FUZZ}
 CREDENTIAL_LOOKUP_FIELDS = {"Name": FUZZ}
@@ -0,0 +1,246 @@
+"""On-disk cache of decoded personnel portraits"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import BinaryIO, Optional
+
+from acslib.ccure.actions import PersonnelAction, _decode_base64
+from acslib.ccure.base import CcureACS
+from acslib.ccure.filters import CcureFilter
+from acslib.ccure.types import ImageType, ObjectType
+
+
+class _HashingFile:
+    """Write to a file while computing the SHA-256 digest of everything written"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+
+class PortraitCache:
+    """
+    Cache decoded `PrimaryPortrait` images on disk
+
+    Images are stored once per SHA-256 digest of their content, with a SQLite index mapping
+    each person to the CCure Images object and digest of their primary portrait.
+    A cached portrait is served without contacting CCure for `revalidate_after` seconds.
+    After that, only the ObjectID of the person's primary portrait Images object is looked up,
+    and the full image is fetched again only if that ObjectID has changed.
+    When the stored images exceed `max_bytes`, the least recently used are evicted.
+
+    :param personnel_action: used to look up and fetch portraits
+    :param directory: where images and the index are stored
+    :param max_bytes: maximum total size of stored images
+    :param revalidate_after: seconds a cached portrait is trusted without checking CCure
+    """
+
+    def __init__(
+        self,
+        personnel_action: PersonnelAction,
+        directory: str,
+        max_bytes: int = 256 * 1024 * 1024,
+        revalidate_after: float = 60.0,
+    ):
+        self.personnel_action = personnel_action
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.hits = 0
+        self.revalidations = 0
+        self.fetches = 0
+        self._lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.db"), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS portraits (
+                personnel_id INTEGER PRIMARY KEY,
+                image_id INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                checked_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS portraits_digest ON portraits (digest)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS portraits_accessed_at ON portraits (accessed_at)"
+        )
+        # total size of stored images, kept up to date as images are stored and removed
+        (self._size,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM portraits)"
+        ).fetchone()
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, personnel_id: int) -> Optional[bytes]:
+        """The person's portrait, or None if they don't have one"""
+        for _ in range(2):
+            path = self.get_path(personnel_id)
+            if path is None:
+                return None
+            try:
+                with open(path, "rb") as image_file:
+                    return image_file.read()
+            except FileNotFoundError:
+                # evicted since get_path returned it, or removed outside the cache
+                self.invalidate(personnel_id)
+        return None
+
+    def get_path(self, personnel_id: int) -> Optional[str]:
+        """Path of the cached file for the person's portrait, or None if they don't have one"""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT image_id, digest, checked_at FROM portraits WHERE personnel_id = ?",
+                (personnel_id,),
+            ).fetchone()
+            if row and not os.path.exists(self._path(row[1])):
+                # a file removed outside the cache is a miss
+                self._forget(personnel_id)
+                row = None
+        if row and now - row[2] < self.revalidate_after:
+            return self._hit(personnel_id, row[1], now)
+
+        self.revalidations += 1
+        image_id = self._current_image_id(personnel_id)
+        if image_id is None:
+            self.invalidate(personnel_id)
+            return None
+        if row and row[0] == image_id:
+            with self._lock:
+                self._db.execute(
+                    "UPDATE portraits SET checked_at = ? WHERE personnel_id = ?",
+                    (now, personnel_id),
+                )
+            return self._hit(personnel_id, row[1], now)
+        return self._fetch(personnel_id, image_id)
+
+    def invalidate(self, personnel_id: int):
+        """Forget the person's cached portrait"""
+        with self._lock:
+            self._forget(personnel_id)
+
+    @property
+    def size(self) -> int:
+        """Total bytes of stored images"""
+        return self._size
+
+    def _hit(self, personnel_id: int, digest: str, now: float) -> str:
+        self.hits += 1
+        with self._lock:
+            self._db.execute(
+                "UPDATE portraits SET accessed_at = ? WHERE personnel_id = ?", (now, personnel_id)
+            )
+        return self._path(digest)
+
+    def _current_image_id(self, personnel_id: int) -> Optional[int]:
+        """ObjectID of the person's primary portrait Images object"""
+        images = CcureACS.search(
+            self.personnel_action,
+            object_type=ObjectType.IMAGE.complete,
+            search_filter=CcureFilter(display_properties=["ObjectID"]),
+            page_size=1,
+            where_clause=(
+                f"ParentId = {int(personnel_id)} AND ImageType = {ImageType.PORTRAIT.value} "
+                "AND Primary = 1"
+            ),
+        )
+        return images[0].get("ObjectID") if images else None
+
+    def _fetch(self, personnel_id: int, image_id: int) -> Optional[str]:
+        self.fetches += 1
+        portrait = self.personnel_action.get_image(personnel_id)
+        if not portrait:
+            self.invalidate(personnel_id)
+            return None
+        temp_path = os.path.join(self.directory, f".{personnel_id}.{threading.get_ident()}.part")
+        try:
+            with open(temp_path, "wb") as temp_file:
+                sink = _HashingFile(temp_file)
+                _decode_base64(portrait, sink)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        del portrait
+        digest = sink.digest.hexdigest()
+        path = self._path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT digest, size FROM portraits WHERE personnel_id = ?", (personnel_id,)
+            ).fetchone()
+            stored = self._db.execute(
+                "SELECT 1 FROM portraits WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+            # swapped in under the lock, so no other thread can remove it before it's indexed
+            os.replace(temp_path, path)
+            self._db.execute(
+                "INSERT OR REPLACE INTO portraits VALUES (?, ?, ?, ?, ?, ?)",
+                (personnel_id, image_id, digest, sink.size, now, now),
+            )
+            if not stored:
+                self._size += sink.size
+            if previous:
+                self._remove_if_unreferenced(*previous)
+            self._evict(keep=personnel_id)
+        return path
+
+    def _evict(self, keep: int):
+        """
+        Drop least recently used portraits, other than the person `keep`'s, until the stored
+        images fit in max_bytes
+        """
+        while self._size > self.max_bytes:
+            oldest = self._db.execute(
+                "SELECT personnel_id FROM portraits WHERE personnel_id != ? "
+                "ORDER BY accessed_at LIMIT 1",
+                (keep,),
+            ).fetchone()
+            if oldest is None:
+                return
+            self._forget(oldest[0])
+
+    def _forget(self, personnel_id: int):
+        row = self._db.execute(
+            "SELECT digest, size FROM portraits WHERE personnel_id = ?", (personnel_id,)
+        ).fetchone()
+        if row:
+            self._db.execute("DELETE FROM portraits WHERE personnel_id = ?", (personnel_id,))
+            self._remove_if_unreferenced(*row)
+
+    def _remove_if_unreferenced(self, digest: str, size: int):
+        """Delete an image file once no person's portrait uses it"""
+        if self._db.execute(
+            "SELECT 1 FROM portraits WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone():
+            return
+        self._size -= size
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
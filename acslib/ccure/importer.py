@@ -0,0 +1,234 @@
+"""Load personnel and credentials into CCure from CSV or JSONL files"""
+
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from acslib.base import ACSRequestException
+from acslib.ccure.bulk import BulkResult, chunked, retrying, run_concurrently
+from acslib.ccure.crud import CcureCredential, CcurePersonnel
+from acslib.ccure.data_models import CredentialCreateData, PersonnelCreateData
+from acslib.ccure.export import COMPRESSION, _OPENERS
+from acslib.ccure.filters import CcureFilter, in_clause
+
+#: Property of credential rows holding the ObjectID of the credential's owner
+PERSONNEL_ID_FIELD = "PersonnelId"
+
+
+def read_rows(source: str | os.PathLike | BinaryIO, format: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yield each row of a CSV or JSONL file as a dict, reading one line at a time.
+    Empty CSV cells are left out of their rows.
+
+    :param source: a file path, or a readable binary stream
+    :param format: "csv" or "jsonl". Defaults to the file extension, then "jsonl".
+        Paths ending in .gz, .bz2, or .xz are decompressed.
+    """
+    path = None if hasattr(source, "read") else os.fspath(source)
+    name, extension = os.path.splitext(path or "")
+    stream = open(path, "rb") if path else source
+    try:
+        if extension in COMPRESSION:
+            stream = _OPENERS[COMPRESSION[extension]](stream, "rb")
+            extension = os.path.splitext(name)[1]
+        format = format or extension.lstrip(".") or "jsonl"
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        if format == "csv":
+            for row in csv.DictReader(text):
+                yield {name: value for name, value in row.items() if value not in ("", None)}
+        elif format == "jsonl":
+            for line in text:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ACSRequestException(400, f"Unknown import format: {format}")
+        text.detach()
+    finally:
+        if stream is not source:
+            stream.close()
+
+
+class ImportReport:
+    """
+    Counts of the rows an import has handled so far. Only failed rows are kept.
+    Every row read is counted once as created, updated, failed, or merged.
+
+    :param rows: rows read, including rows skipped because an earlier run handled them
+    :param merged: rows merged into an earlier row in their batch with the same key
+    """
+
+    def __init__(
+        self, rows: int = 0, created: int = 0, updated: int = 0, failed: int = 0, merged: int = 0
+    ):
+        self.rows = rows
+        self.created = created
+        self.updated = updated
+        self.failed = failed
+        self.merged = merged
+        self.elapsed = 0.0
+        #: a BulkResult for each failed row in this run, keyed by row number
+        self.failures: list[BulkResult] = []
+
+    def counts(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "merged": self.merged,
+        }
+
+    def __repr__(self):
+        counts = ", ".join(f"{name}={count}" for name, count in self.counts().items())
+        return f"ImportReport({counts}, elapsed={self.elapsed:.3f})"
+
+
+class CcureImporter:
+    """
+    Create or update personnel or credentials from a stream of rows
+
+    Rows are handled in batches. Each batch is validated, its rows' `key_field` values are
+    looked up in CCure with one `IN (...)` search, and then existing objects are updated
+    and the rest created, concurrently. Only one batch is held in memory at a time.
+
+    With a checkpoint file, the number of rows finished is saved after every batch, and a
+    rerun of the same import skips those rows.
+
+    :param crud: the CcurePersonnel or CcureCredential object to import with
+    :param key_field: property that identifies existing objects, such as "Text1" for
+        personnel or "CHUID" for credentials
+    :param batch_size: rows validated and looked up together
+    :param max_workers: number of concurrent writes. Defaults to `config.max_workers`.
+    :param checkpoint: path of a JSON file recording the import's progress
+    :param progress: called with the ImportReport after each batch
+    """
+
+    def __init__(
+        self,
+        crud: CcurePersonnel | CcureCredential,
+        key_field: str,
+        batch_size: int = 500,
+        max_workers: Optional[int] = None,
+        checkpoint: Optional[str | os.PathLike] = None,
+        progress: Optional[Callable[[ImportReport], Any]] = None,
+    ):
+        if isinstance(crud, CcureCredential):
+            self.model: type[BaseModel] = CredentialCreateData
+        elif isinstance(crud, CcurePersonnel):
+            self.model = PersonnelCreateData
+        else:
+            raise ACSRequestException(400, "Only personnel and credentials can be imported")
+        self.crud = crud
+        self.key_field = key_field
+        self.batch_size = batch_size
+        self.max_workers = max_workers or crud.config.max_workers
+        self.checkpoint = checkpoint
+        self.progress = progress
+
+    def run(self, rows: Iterator[dict]) -> ImportReport:
+        """Import rows, such as those from `read_rows`, resuming from the checkpoint"""
+        start = time.perf_counter()
+        report = self._load_checkpoint()
+        rows = islice(rows, report.rows, None)
+        for batch in chunked(enumerate(rows, start=report.rows + 1), self.batch_size):
+            self._import_batch(batch, report)
+            report.rows += len(batch)
+            self._save_checkpoint(report)
+            if self.progress:
+                self.progress(report)
+        report.elapsed = time.perf_counter() - start
+        self.crud.logger.info(f"Import finished: {report}")
+        return report
+
+    def _import_batch(self, batch: list[tuple[int, dict]], report: ImportReport):
+        # later rows with the same key are merged into earlier ones, so each key is written once
+        valid: dict[Any, tuple[int, dict]] = {}
+        for row_number, row in batch:
+            try:
+                key = row[self.key_field]
+                # send the model's converted values, such as ints for CSV number columns
+                row = self.model.model_validate(row).model_dump(exclude_unset=True)
+            except (ValidationError, KeyError) as e:
+                report.failed += 1
+                report.failures.append(BulkResult(key=row_number, error=e))
+                continue
+            if key in valid:
+                valid[key] = (row_number, valid[key][1] | row)
+                report.merged += 1
+            else:
+                valid[key] = (row_number, row)
+
+        existing = self._find_existing(list(valid))
+        writes = [(row_number, (key, row)) for key, (row_number, row) in valid.items()]
+        updates = {valid[key][0] for key in existing}
+
+        update = retrying(lambda item: self._update(*item))
+
+        def write(item: tuple[Any, dict]):
+            key, row = item
+            if key in existing:
+                return update((existing[key], row))
+            # a create that timed out may still have been applied, so it isn't sent again
+            return self._create(row)
+
+        for result in run_concurrently(write, writes, self.max_workers):
+            if not result.ok:
+                report.failed += 1
+                report.failures.append(result)
+            elif result.key in updates:
+                report.updated += 1
+            else:
+                report.created += 1
+
+    def _find_existing(self, keys: list) -> dict[Any, int]:
+        """Map each key that a CCure object already has to that object's ID"""
+        if not keys:
+            return {}
+        existing = {}
+        for page in self.crud.search_pages(
+            object_type=self.crud.type,
+            search_filter=CcureFilter(display_properties=["ObjectID", self.key_field]),
+            where_clause=in_clause(self.key_field, keys),
+        ):
+            for item in page:
+                existing[str(item[self.key_field])] = item["ObjectID"]
+        # CSV values are strings, while CCure may return numbers
+        return {key: existing[str(key)] for key in keys if str(key) in existing}
+
+    def _create(self, row: dict):
+        if self.model is CredentialCreateData:
+            properties = dict(row)
+            personnel_id = properties.pop(PERSONNEL_ID_FIELD, None)
+            if personnel_id is None:
+                raise ACSRequestException(400, f"New credentials need a {PERSONNEL_ID_FIELD}")
+            return self.crud.create(int(personnel_id), CredentialCreateData(**properties))
+        return self.crud.create(PersonnelCreateData(**row))
+
+    def _update(self, object_id: int, row: dict):
+        changes = {
+            name: value
+            for name, value in row.items()
+            if name not in (self.key_field, PERSONNEL_ID_FIELD)
+        }
+        return self.crud.update(object_id, changes)
+
+    def _load_checkpoint(self) -> ImportReport:
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            with open(self.checkpoint) as file:
+                return ImportReport(**json.load(file))
+        return ImportReport()
+
+    def _save_checkpoint(self, report: ImportReport):
+        if not self.checkpoint:
+            return
+        # write a new file and swap it in, so a crash mid-write can't corrupt the checkpoint
+        temporary = f"{os.fspath(self.checkpoint)}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(report.counts(), file)
+        os.replace(temporary, self.checkpoint)
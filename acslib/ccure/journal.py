@@ -0,0 +1,316 @@
+"""Durable write-ahead journal for resumable CCure bulk jobs"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, Optional
+
+import requests
+from pydantic import BaseModel
+
+from acslib.base import ACSRequestException, ACSRequestResponse, status
+from acslib.ccure import CcureAPI
+from acslib.ccure.bulk import BulkResult, get_object_id, run_concurrently
+from acslib.ccure.data_models import CredentialCreateData, PersonnelCreateData
+
+#: Journaled operations, by name. Each is called with the CcureAPI and the entry's payload.
+OPERATIONS: dict[str, Callable[..., ACSRequestResponse]] = {
+    "personnel.create": lambda api, create_data: api.personnel.create(
+        PersonnelCreateData.model_validate(create_data)
+    ),
+    "personnel.update": lambda api, object_id, update_data: api.personnel.update(
+        object_id, update_data
+    ),
+    "personnel.delete": lambda api, object_id: api.personnel.delete(object_id),
+    "credential.create": lambda api, personnel_id, create_data: api.credential.create(
+        personnel_id, CredentialCreateData.model_validate(create_data)
+    ),
+    "credential.update": lambda api, object_id, update_data: api.credential.update(
+        object_id, update_data
+    ),
+    "credential.delete": lambda api, object_id: api.credential.delete(object_id),
+    "clearance_item.update": lambda api, object_id, update_data: api.clearance_item.update(
+        object_id, update_data
+    ),
+    "personnel.assign_clearances": lambda api, personnel_id, clearance_ids: (
+        api.action.personnel.assign_clearances(personnel_id, clearance_ids)
+    ),
+    "personnel.revoke_clearances": lambda api, personnel_id, clearance_ids: (
+        api.action.personnel.revoke_clearances(personnel_id, clearance_ids)
+    ),
+}
+
+#: Operations that are safe to send twice
+IDEMPOTENT_OPERATIONS = {
+    "personnel.update",
+    "credential.update",
+    "clearance_item.update",
+    "personnel.revoke_clearances",
+}
+
+
+class JournalEntry:
+    """One journaled CCure mutation"""
+
+    PENDING = "pending"  # recorded, not sent yet
+    SENT = "sent"  # the request was started, but its outcome wasn't recorded
+    APPLIED = "applied"
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        key: str,
+        operation: str,
+        payload: dict,
+        status: str,
+        result: Any = None,
+        object_id: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        self.key = key
+        self.operation = operation
+        self.payload = payload
+        self.status = status
+        self.result = result
+        self.object_id = object_id
+        self.error = error
+
+    def __repr__(self):
+        return f"JournalEntry(key={self.key!r}, operation={self.operation!r}, status={self.status})"
+
+
+def _uncertain(error: Exception) -> bool:
+    """Whether a failed request may still have been applied by CCure"""
+    if not isinstance(error, ACSRequestException):
+        return False
+    if isinstance(error.__context__, requests.ConnectionError):
+        return True
+    # any other 4xx means CCure rejected the request
+    return error.status_code == status.HTTP_408_REQUEST_TIMEOUT or not (
+        400 <= error.status_code < 500
+    )
+
+
+class WriteJournal:
+    """
+    Record each intended CCure mutation in a local SQLite database before sending it,
+    and its outcome after.
+
+    Every entry has an idempotency key. Executing a key that's already applied returns
+    the recorded entry without calling CCure again, so a job that died halfway through
+    can simply be run again, or its unapplied entries replayed with `resume`.
+
+    :param path: SQLite database file
+    :param api: the CcureAPI used to send journaled operations
+    """
+
+    def __init__(self, path: str, api: CcureAPI):
+        self.api = api
+        self.logger = api.connection.logger
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                operation TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                object_id INTEGER,
+                error TEXT,
+                updated REAL NOT NULL
+            )
+            """
+        )
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, key: str) -> Optional[JournalEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT key, operation, payload, status, result, object_id, error "
+                "FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def entries(self, *statuses: str) -> list[JournalEntry]:
+        """All entries in the order they were recorded, optionally filtered by status"""
+        query = "SELECT key, operation, payload, status, result, object_id, error FROM entries"
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY seq", statuses).fetchall()
+        return [self._entry(row) for row in rows]
+
+    def record(self, key: str, operation: str, **payload) -> JournalEntry:
+        """Record an intended mutation without sending it. Existing keys are left unchanged."""
+        if operation not in OPERATIONS:
+            raise ACSRequestException(400, f"Unknown journal operation: {operation}")
+        payload = {
+            name: value.model_dump() if isinstance(value, BaseModel) else value
+            for name, value in payload.items()
+        }
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO entries (key, operation, payload, status, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, operation, json.dumps(payload), JournalEntry.PENDING, time.time()),
+            )
+        return self.get(key)
+
+    def execute(
+        self, key: str, operation: str, retry_uncertain: bool = False, **payload
+    ) -> JournalEntry:
+        """
+        Record a mutation, send it to CCure, and record its outcome.
+        If the key was already applied, nothing is sent.
+
+        A key that was sent without a recorded outcome, by a run that crashed or by another
+        thread that is still sending it, may have reached CCure. It's only sent again if
+        its operation is idempotent or `retry_uncertain` is True. Otherwise an
+        ACSRequestException with status 409 is raised.
+        """
+        entry = self.record(key, operation, **payload)
+        if entry.status == JournalEntry.APPLIED:
+            self.logger.debug(f"Skipping applied journal entry {key}")
+            return entry
+        return self._apply(entry, retry_uncertain)
+
+    def execute_many(
+        self,
+        operations: Iterable[tuple[str, str, dict]],
+        max_workers: Optional[int] = None,
+    ) -> list[BulkResult]:
+        """
+        Execute many journaled mutations concurrently
+
+        :param operations: (key, operation, payload) tuples
+        :return: one BulkResult per operation, keyed by its journal key
+        """
+
+        def execute(item: tuple[str, str, dict]) -> JournalEntry:
+            key, operation, payload = item
+            return self.execute(key, operation, **payload)
+
+        return self._results(
+            run_concurrently(
+                execute,
+                ((item[0], item) for item in operations),
+                max_workers or self.api.connection.config.max_workers,
+            )
+        )
+
+    def resume(
+        self, max_workers: Optional[int] = 1, retry_uncertain: bool = False
+    ) -> list[BulkResult]:
+        """
+        Replay every entry that hasn't been applied, in the order they were recorded.
+
+        Entries that were sent without a recorded outcome, or whose request timed out or
+        lost its connection, may have reached CCure. They're only replayed if their
+        operation is idempotent or `retry_uncertain` is True. Entries CCure rejected are
+        replayed.
+
+        :param max_workers: number of concurrent requests. Defaults to 1 so dependent
+            entries are replayed in order. None uses `config.max_workers`.
+        """
+        entries = [
+            entry
+            for entry in self.entries(JournalEntry.PENDING, JournalEntry.SENT, JournalEntry.FAILED)
+            if entry.status != JournalEntry.SENT
+            or retry_uncertain
+            or entry.operation in IDEMPOTENT_OPERATIONS
+        ]
+        self.logger.info(f"Replaying {len(entries)} journal entries")
+        return self._results(
+            run_concurrently(
+                lambda entry: self._apply(entry, retry_uncertain),
+                ((entry.key, entry) for entry in entries),
+                max_workers or self.api.connection.config.max_workers,
+            )
+        )
+
+    def _apply(self, entry: JournalEntry, retry_uncertain: bool = False) -> JournalEntry:
+        if entry.status == JournalEntry.SENT and not (
+            retry_uncertain or entry.operation in IDEMPOTENT_OPERATIONS
+        ):
+            raise ACSRequestException(
+                409, f"Journal entry {entry.key} may already be applied; not sending it again"
+            )
+        if not self._claim(entry):
+            current = self.get(entry.key)
+            if current.status == JournalEntry.APPLIED:
+                return current
+            raise ACSRequestException(409, f"Journal entry {entry.key} is already being sent")
+        try:
+            response = OPERATIONS[entry.operation](self.api, **entry.payload)
+            if isinstance(response, Future):
+                # an attached UpdateBuffer queued the change; wait for its outcome
+                response = response.result()
+        except Exception as e:
+            # a request that may have reached CCure stays SENT, so it's only replayed when
+            # that's safe or asked for
+            outcome = JournalEntry.SENT if _uncertain(e) else JournalEntry.FAILED
+            self._set_status(entry.key, outcome, error=str(e))
+            raise
+        self._set_status(
+            entry.key,
+            JournalEntry.APPLIED,
+            result=json.dumps(getattr(response, "json", None), default=str),
+            object_id=get_object_id(response),
+        )
+        return self.get(entry.key)
+
+    def _claim(self, entry: JournalEntry) -> bool:
+        """
+        Mark an entry SENT if its status is still the one it was read with, in one UPDATE,
+        so only one caller sends a pending entry
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE entries SET status = ?, updated = ?, error = NULL "
+                "WHERE key = ? AND status = ?",
+                (JournalEntry.SENT, time.time(), entry.key, entry.status),
+            )
+        return cursor.rowcount == 1
+
+    def _set_status(self, key: str, status: str, **columns):
+        columns = {"status": status, "updated": time.time(), "error": None} | columns
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE entries SET {assignments} WHERE key = ?", (*columns.values(), key)
+            )
+
+    @staticmethod
+    def _entry(row: tuple) -> JournalEntry:
+        key, operation, payload, status, result, object_id, error = row
+        return JournalEntry(
+            key=key,
+            operation=operation,
+            payload=json.loads(payload),
+            status=status,
+            result=json.loads(result) if result else None,
+            object_id=object_id,
+            error=error,
+        )
+
+    @staticmethod
+    def _results(results: list[BulkResult]) -> list[BulkResult]:
+        for result in results:
+            if result.ok:
+                result.object_id = result.response.object_id
+        return results
@@ -0,0 +1,374 @@
+"""Local SQLite mirror of CCure objects, searchable without contacting CCure"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from numbers import Number
+from typing import Any, Iterable, Optional
+
+from acslib.base import ACSRequestException
+from acslib.ccure.base import CcureACS
+from acslib.ccure.bulk import chunked
+from acslib.ccure.connection import CcureConnection
+from acslib.ccure.filters import (
+    NFUZZ,
+    CcureFilter,
+    ClearanceFilter,
+    ClearanceItemFilter,
+    CredentialFilter,
+    GroupFilter,
+    GroupMemberFilter,
+    PersonnelFilter,
+    in_clause,
+)
+from acslib.ccure.snapshots import PollingSnapshot
+from acslib.ccure.types import ObjectType
+
+#: Properties copied into the mirror for each object type
+MIRROR_PROPERTIES = {
+    ObjectType.PERSONNEL: ["ObjectID", "FirstName", "MiddleName", "LastName", "Disabled"],
+    ObjectType.CREDENTIAL: [
+        "ObjectID",
+        "Name",
+        "PersonnelId",
+        "CHUID",
+        "CardNumber",
+        "FacilityCode",
+        "Disabled",
+    ],
+    ObjectType.CLEARANCE: ["ObjectID", "Name", "Description"],
+    ObjectType.CLEARANCE_ASSIGNMENT: ["ObjectID", "PersonnelID", "ClearanceID"],
+    ObjectType.CLEARANCE_ITEM: ["ObjectID", "Name", "Description", "ParentID"],
+    ObjectType.GROUP: ["ObjectID", "Name", "Description", "GroupType"],
+    ObjectType.GROUP_MEMBER: ["ObjectID", "GroupID", "TargetObjectID", "GroupType"],
+}
+
+_WHERE_TOKENS = re.compile(r"'(?:[^']|'')*'|[A-Za-z_]\w*|\d+(?:\.\d+)?|[<>!]=|<>|\S")
+_SQL_KEYWORDS = {"AND", "OR", "NOT", "IN", "LIKE", "IS", "NULL", "BETWEEN"}
+
+
+def _local_where_clause(where_clause: str) -> str:
+    """Rewrite a CCure WHERE clause so property names read from the mirrored JSON"""
+    tokens = []
+    for token in _WHERE_TOKENS.findall(where_clause):
+        if token[0].isalpha() or token[0] == "_":
+            if token.upper() not in _SQL_KEYWORDS:
+                token = f"json_extract(data, '$.{token}')"
+        tokens.append(token)
+    return " ".join(tokens)
+
+
+class MirroredObjects:
+    """
+    Search one mirrored object type locally, the same way the CRUD classes search CCure
+
+    :param mirror: the mirror holding the objects
+    :param object_type: the mirrored object type
+    :param search_filter: the default filter, as used by the matching CRUD class
+    """
+
+    def __init__(self, mirror: "CcureMirror", object_type: ObjectType, search_filter: CcureFilter):
+        self.mirror = mirror
+        self.type = object_type.complete
+        self.search_filter = search_filter
+
+    def search(
+        self,
+        terms: Optional[list] = None,
+        search_filter: Optional[CcureFilter] = None,
+        page_size: Optional[int] = None,
+        page_number: int = 1,
+        timeout: Number = 0,
+        search_options: Optional[dict] = None,
+        where_clause: Optional[str] = None,
+    ) -> int | list:
+        """
+        Get a list of mirrored objects matching the given search terms or where clause.
+        Parameters are the same as in the CRUD classes' `search`. `timeout` is ignored.
+        Where clauses may use comparisons, LIKE, IN, IS NULL, AND, OR, and NOT.
+        """
+        search_filter = search_filter or self.search_filter
+        if where_clause:
+            condition, parameters = _local_where_clause(where_clause), []
+        else:
+            condition, parameters = self._filter_condition(search_filter, terms or [])
+        if (search_options or {}).get("CountOnly"):
+            return self.mirror.query(
+                f"SELECT COUNT(*) FROM objects WHERE type = ? AND ({condition})",
+                [self.type, *parameters],
+            )[0][0]
+
+        page_size = self.mirror.page_size if page_size is None else page_size
+        query = f"SELECT data FROM objects WHERE type = ? AND ({condition}) ORDER BY object_id"
+        if page_size:
+            query += f" LIMIT {int(page_size)} OFFSET {int(page_size) * (page_number - 1)}"
+        display_properties = search_filter.display_properties
+        results = []
+        for (data,) in self.mirror.query(query, [self.type, *parameters]):
+            data = json.loads(data)
+            if display_properties:
+                data = {name: data[name] for name in display_properties if name in data}
+            results.append(data)
+        return results
+
+    def count(
+        self, terms: Optional[list] = None, search_filter: Optional[CcureFilter] = None
+    ) -> int:
+        """Get the number of mirrored objects matching the given search terms"""
+        return self.search(
+            terms=terms, search_filter=search_filter, search_options={"CountOnly": True}
+        )
+
+    def get(self, object_id: int) -> Optional[dict]:
+        """All mirrored properties of one object"""
+        rows = self.mirror.query(
+            "SELECT data FROM objects WHERE type = ? AND object_id = ?", [self.type, object_id]
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_property(self, object_id: int, property_name: str) -> Any:
+        """Return the value of one mirrored property from one object"""
+        data = self.get(object_id)
+        if data is None:
+            return
+        if property_name in data:
+            return data[property_name]
+        raise ACSRequestException(400, f"Mirrored object has no `{property_name}` property.")
+
+    @staticmethod
+    def _filter_condition(search_filter: CcureFilter, terms: list) -> tuple[str, list]:
+        if not isinstance(terms, list):
+            raise TypeError("Search must be a list of strings")
+        if not terms:
+            return "1", []
+        parameters = []
+        term_conditions = []
+        for term in terms:
+            field_conditions = []
+            for field_name, lookup in (search_filter.filter_fields or {}).items():
+                field_conditions.append(
+                    f"json_extract(data, '$.{field_name}') {search_filter.term_operator} ?"
+                )
+                parameters.append(lookup(term))
+            term_conditions.append(f"({search_filter.inner_bool.join(field_conditions) or '1'})")
+        return search_filter.outer_bool.join(term_conditions), parameters
+
+
+def _later(watermark: Optional[str], modified: str) -> str:
+    """The later of two modification times, compared as datetimes when both can be parsed"""
+    if watermark is None:
+        return modified
+    try:
+        later = datetime.fromisoformat(modified) > datetime.fromisoformat(watermark)
+    except (ValueError, TypeError):  # not ISO 8601, or mixing naive and aware times
+        later = modified > watermark
+    return modified if later else watermark
+
+
+class CcureMirror(PollingSnapshot):
+    """
+    Copy CCure personnel, credentials, clearances, clearance assignments, clearance items,
+    groups, and group members into a local SQLite database, and search them there.
+
+    Each sync pulls every object with paged searches and only writes objects whose content
+    hash changed, then removes objects that are gone from CCure. If `modified_property`
+    is given, syncs between full syncs only pull objects modified since the last sync.
+    Incremental syncs can't see deleted objects, so a full sync still runs every
+    `full_sync_interval` seconds.
+
+    Use `start` to keep the mirror in sync in a background thread, or call `sync` directly.
+    Search mirrored objects through `personnel`, `credential`, `clearance`,
+    `clearance_assignment`, `clearance_item`, `group`, and `group_member`.
+
+    :param path: SQLite database file
+    :param connection: used to pull objects from CCure
+    :param object_types: the object types to mirror. Defaults to every type in MIRROR_PROPERTIES.
+    :param properties: properties to mirror for each object type. Defaults to MIRROR_PROPERTIES.
+    :param modified_property: a property holding each object's last modification time
+    :param full_sync_interval: seconds between full syncs when syncing incrementally
+    :param interval: seconds between background syncs
+    :param page_size: objects per search page. Defaults to `config.page_size`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        connection: Optional[CcureConnection] = None,
+        object_types: Optional[Iterable[ObjectType]] = None,
+        properties: Optional[dict[ObjectType, list[str]]] = None,
+        modified_property: Optional[str] = None,
+        full_sync_interval: float = 3600.0,
+        interval: float = 60.0,
+        page_size: Optional[int] = None,
+    ):
+        self.source = CcureACS(connection)
+        super().__init__(interval, self.source.logger)
+        self.properties = MIRROR_PROPERTIES | (properties or {})
+        self.object_types = list(object_types or self.properties)
+        self.modified_property = modified_property
+        self.full_sync_interval = full_sync_interval
+        self.page_size = page_size or self.source.config.page_size
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS objects (
+                type TEXT NOT NULL,
+                object_id INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                PRIMARY KEY (type, object_id)
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                type TEXT PRIMARY KEY,
+                full_synced_at REAL,
+                synced_at REAL,
+                watermark TEXT
+            );
+            """
+        )
+
+        self.personnel = MirroredObjects(self, ObjectType.PERSONNEL, PersonnelFilter())
+        self.credential = MirroredObjects(self, ObjectType.CREDENTIAL, CredentialFilter())
+        self.clearance = MirroredObjects(self, ObjectType.CLEARANCE, ClearanceFilter())
+        self.clearance_assignment = MirroredObjects(
+            self,
+            ObjectType.CLEARANCE_ASSIGNMENT,
+            CcureFilter(lookups={"PersonnelID": NFUZZ}, display_properties=[]),
+        )
+        self.clearance_item = MirroredObjects(
+            self, ObjectType.CLEARANCE_ITEM, ClearanceItemFilter()
+        )
+        self.group = MirroredObjects(self, ObjectType.GROUP, GroupFilter())
+        self.group_member = MirroredObjects(self, ObjectType.GROUP_MEMBER, GroupMemberFilter())
+
+    def close(self):
+        self.stop()
+        self._db.close()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self) -> dict[str, int]:
+        return self.sync()
+
+    def sync(self, full: bool = False) -> dict[str, int]:
+        """
+        Bring the mirror up to date with CCure
+
+        :param full: pull every object even if an incremental sync is possible
+        :return: maps each object type to the number of objects added, changed, or removed
+        """
+        return {
+            object_type.value: self._sync_type(object_type, full)
+            for object_type in self.object_types
+        }
+
+    def query(self, sql: str, parameters: Iterable = ()) -> list[tuple]:
+        """Run a read-only SQL query against the mirror's `objects` table"""
+        with self._lock:
+            return self._db.execute(sql, list(parameters)).fetchall()
+
+    def _sync_type(self, object_type: ObjectType, full: bool) -> int:
+        type_name = object_type.complete
+        started = time.time()
+        state = self.query(
+            "SELECT full_synced_at, watermark FROM sync_state WHERE type = ?", [type_name]
+        )
+        full_synced_at, watermark = state[0] if state else (None, None)
+        incremental = (
+            not full
+            and self.modified_property
+            and watermark is not None
+            and started - (full_synced_at or 0) < self.full_sync_interval
+        )
+        where_clause = ""
+        if incremental:
+            # objects modified at the watermark itself may have been missed by the last sync,
+            # so they're pulled again, and left alone if unchanged
+            escaped = watermark.replace("'", "''")
+            where_clause = f"{self.modified_property} >= '{escaped}'"
+        properties = self.properties[object_type]
+        if self.modified_property and self.modified_property not in properties:
+            properties = properties + [self.modified_property]
+
+        changes = 0
+        seen = set()
+        for page in CcureACS.search_pages(
+            self.source,
+            object_type=type_name,
+            search_filter=CcureFilter(display_properties=properties),
+            page_size=self.page_size,
+            where_clause=where_clause,
+        ):
+            rows = []
+            for item in page:
+                data = json.dumps(item, sort_keys=True, default=str)
+                rows.append(
+                    (type_name, item["ObjectID"], data, hashlib.sha1(data.encode()).hexdigest())
+                )
+                seen.add(item["ObjectID"])
+                if self.modified_property and item.get(self.modified_property) is not None:
+                    watermark = _later(watermark, str(item[self.modified_property]))
+            with self._lock:
+                before = self._db.total_changes
+                self._db.execute("BEGIN")
+                try:
+                    self._db.executemany(
+                        "INSERT INTO objects (type, object_id, data, hash) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (type, object_id) DO UPDATE "
+                        "SET data = excluded.data, hash = excluded.hash "
+                        "WHERE hash != excluded.hash",
+                        rows,
+                    )
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                self._db.execute("COMMIT")
+                changes += self._db.total_changes - before
+
+        if not incremental:
+            removed = self._removed(type_name, seen)
+        with self._lock:
+            if not incremental:
+                self._db.executemany(
+                    "DELETE FROM objects WHERE type = ? AND object_id = ?",
+                    [(type_name, object_id) for object_id in removed],
+                )
+                changes += len(removed)
+                full_synced_at = started
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                (type_name, full_synced_at, started, watermark),
+            )
+        self.logger.info(f"Synced {type_name} mirror: {changes} objects changed")
+        return changes
+
+    def _removed(self, type_name: str, seen: set[int]) -> set[int]:
+        """
+        The stored objects of a type that are gone from CCure. Objects a full sync didn't see
+        are looked up by ObjectID before they're removed, since rows added or deleted during
+        the sync shift the pages and can hide objects that still exist.
+        """
+        stored = {
+            object_id
+            for (object_id,) in self.query(
+                "SELECT object_id FROM objects WHERE type = ?", [type_name]
+            )
+        }
+        removed = stored - seen
+        for chunk in chunked(sorted(removed), 500):
+            for page in CcureACS.search_pages(
+                self.source,
+                object_type=type_name,
+                search_filter=CcureFilter(display_properties=["ObjectID"]),
+                page_size=len(chunk),
+                where_clause=in_clause("ObjectID", chunk),
+            ):
+                removed.difference_update(item["ObjectID"] for item in page)
+        return removed
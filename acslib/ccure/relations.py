@@ -0,0 +1,107 @@
+"""Join related CCure objects onto search results"""
+
+from typing import Any, Iterable, NamedTuple
+
+from acslib.base import ACSRequestException
+from acslib.ccure.bulk import chunked
+from acslib.ccure.filters import CcureFilter, in_clause
+from acslib.ccure.types import ObjectType
+
+
+class Relation(NamedTuple):
+    """
+    How search results refer to a related object type
+
+    :param local_key: property of each result holding the key of its related objects
+    :param object_type: the related objects' full type name
+    :param display_properties: properties included for each related object
+    :param remote_key: property of the related objects matched against `local_key`
+    :param many: whether each result has a list of related objects instead of at most one
+    """
+
+    local_key: str
+    object_type: str
+    display_properties: list[str]
+    remote_key: str = "ObjectID"
+    many: bool = False
+
+
+_PERSONNEL = Relation(
+    "PersonnelID",
+    ObjectType.PERSONNEL.complete,
+    ["ObjectID", "FirstName", "MiddleName", "LastName"],
+)
+
+#: Relations that can be included in searches, by the searched object type and relation name
+RELATIONS: dict[str, dict[str, Relation]] = {
+    ObjectType.CLEARANCE_ASSIGNMENT.complete: {
+        "personnel": _PERSONNEL,
+        "clearance": Relation("ClearanceID", ObjectType.CLEARANCE.complete, ["ObjectID", "Name"]),
+    },
+    ObjectType.CREDENTIAL.complete: {
+        "personnel": _PERSONNEL._replace(local_key="PersonnelId"),
+    },
+    ObjectType.PERSONNEL.complete: {
+        "credentials": Relation(
+            "ObjectID",
+            ObjectType.CREDENTIAL.complete,
+            ["ObjectID", "Name", "CHUID", "CardNumber", "FacilityCode"],
+            remote_key="PersonnelId",
+            many=True,
+        ),
+    },
+}
+
+
+def get_relations(object_type: str, include: Iterable[str]) -> dict[str, Relation]:
+    """Look up the named relations of an object type"""
+    relations = RELATIONS.get(object_type, {})
+    unknown = [name for name in include if name not in relations]
+    if unknown:
+        raise ACSRequestException(
+            400, f"Can't include {', '.join(unknown)}. Available: {', '.join(relations)}"
+        )
+    return {name: relations[name] for name in include}
+
+
+def include_related(
+    ccure: Any,
+    object_type: str,
+    results: list[dict],
+    include: Iterable[str],
+    chunk_size: int = 500,
+) -> list[dict]:
+    """
+    Add related objects to search results, in place
+
+    Each relation's objects are fetched with paged `remote_key IN (...)` searches of up to
+    `chunk_size` keys, then joined to the results through a dict keyed by `remote_key`.
+    Each result gets a property named after the relation holding the related object (or
+    None), or a list of related objects for relations with `many`.
+
+    :param ccure: the CcureACS object used to search
+    :param object_type: the type of the search results
+    :param results: search results that include each relation's `local_key`
+    :param include: names of relations in RELATIONS
+    """
+    for name, relation in get_relations(object_type, include).items():
+        keys = {result.get(relation.local_key) for result in results} - {None}
+        related = {}
+        display_properties = list(
+            dict.fromkeys([*relation.display_properties, relation.remote_key])
+        )
+        for chunk in chunked(sorted(keys), chunk_size):
+            for page in ccure.search_pages(
+                object_type=relation.object_type,
+                search_filter=CcureFilter(display_properties=display_properties),
+                where_clause=in_clause(relation.remote_key, chunk),
+            ):
+                for item in page:
+                    if relation.many:
+                        related.setdefault(item[relation.remote_key], []).append(item)
+                    else:
+                        related[item[relation.remote_key]] = item
+        for result in results:
+            key = result.get(relation.local_key)
+            result[name] = related.get(key, [] if relation.many else None)
+    return results
@@ -0,0 +1,108 @@
+"""Spread a connection's requests over several CCure sessions"""
+
+import itertools
+import threading
+from typing import Callable, Optional
+
+from acslib.base import ACSConfigException
+
+STRATEGIES = ("least_busy", "round_robin")
+
+
+class PooledSession:
+    """One session in a SessionPool, logged in the first time it's used"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.session_id: Optional[str] = None
+        #: number of requests using this session right now
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+
+class SessionPool:
+    """
+    A fixed number of CCure sessions that requests are spread across
+
+    Each session logs in when it's first handed out, and a refused session logs in again
+    without affecting the others.
+
+    :param size: number of sessions
+    :param login: opens a new CCure session and returns its ID
+    :param logout: ends the CCure session with the given ID
+    :param strategy: "least_busy" hands out the session with the fewest requests in flight,
+        and "round_robin" hands out each session in turn
+    """
+
+    def __init__(
+        self,
+        size: int,
+        login: Callable[[], str],
+        logout: Callable[[str], None],
+        strategy: str = "least_busy",
+    ):
+        if size < 1 or strategy not in STRATEGIES:
+            raise ACSConfigException(
+                f"A session pool needs at least one session and a strategy in {STRATEGIES}"
+            )
+        self.sessions = [PooledSession(index) for index in range(size)]
+        self.strategy = strategy
+        self._login = login
+        self._logout = logout
+        self._turns = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> tuple[PooledSession, str]:
+        """
+        Pick a session for one request, logging it in if needed. Pass it to `release` after.
+
+        :return: the session, and its ID as of when it was handed out
+        """
+        with self._lock:
+            if self.strategy == "round_robin":
+                session = self.sessions[next(self._turns) % len(self.sessions)]
+            else:
+                session = min(self.sessions, key=lambda session: session.in_flight)
+            session.in_flight += 1
+        try:
+            return session, self.renew(session, None)
+        except Exception:
+            self.release(session)
+            raise
+
+    def renew(self, session: PooledSession, rejected: Optional[str]) -> str:
+        """
+        Return the ID to use for a session, logging it in again if it has no ID or its ID is
+        `rejected`. If another request has already replaced `rejected`, that ID is returned.
+        """
+        with session.lock:
+            if session.session_id is None or session.session_id == rejected:
+                session.session_id = self._login()
+            return session.session_id
+
+    def any_session_id(self) -> str:
+        """The ID of an open session, without counting it as in use"""
+        for session in self.sessions:
+            if (session_id := session.session_id) is not None:
+                return session_id
+        session, session_id = self.acquire()
+        self.release(session)
+        return session_id
+
+    def release(self, session: PooledSession):
+        with self._lock:
+            session.in_flight -= 1
+
+    def invalidate(self, session: PooledSession, rejected: str):
+        """Forget a session CCure refused, so it logs in again when next used"""
+        with session.lock:
+            if session.session_id == rejected:
+                session.session_id = None
+
+    def close(self):
+        """Log out of every open session"""
+        for session in self.sessions:
+            with session.lock:
+                if session.session_id is not None:
+                    self._logout(session.session_id)
+                    session.session_id = None
@@ -0,0 +1,112 @@
+"""Share one CCure session ID between connections in different processes"""
+
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from acslib.base import ACSConfigException
+
+
+class SessionStore(ABC):
+    """
+    Holds the CCure session ID that every connection using the store shares
+
+    Subclasses store the ID somewhere all the connections can reach, such as a file or a
+    cache server, and make sure only one connection logs in at a time.
+    """
+
+    @abstractmethod
+    def get(self) -> Optional[str]:
+        """The shared session ID, or None if there isn't one"""
+
+    @abstractmethod
+    def refresh(self, rejected: Optional[str], login: Callable[[], str]) -> str:
+        """
+        Return a session ID to use in place of `rejected`
+
+        If the stored ID is missing or is `rejected`, call `login` to open a new session and
+        store its ID. If another connection has already replaced `rejected`, return that
+        ID without logging in.
+
+        :param rejected: the session ID CCure refused, or None if the caller has none
+        :param login: opens a new CCure session and returns its ID
+        """
+
+    @abstractmethod
+    def clear(self, session_id: str):
+        """Forget the stored session ID if it is still `session_id`"""
+
+
+class FileSessionStore(SessionStore):
+    """
+    Keeps the shared session ID in a JSON file, for connections in processes on one host
+
+    Refreshes hold an exclusive `flock` on `<path>.lock`, so when a session expires only
+    the first process to notice logs in, and the rest pick up its new session ID.
+
+    :param path: the file holding the session ID. Its directory must exist.
+    :param max_age: seconds after which a stored session isn't reused, even if no request
+        was refused. None keeps sessions until CCure refuses them.
+    """
+
+    def __init__(self, path: str | os.PathLike, max_age: Optional[float] = None):
+        if fcntl is None:
+            raise ACSConfigException("FileSessionStore needs fcntl, which this platform lacks")
+        self.path = os.fspath(path)
+        self.max_age = max_age
+        # flock coordinates processes; this lock coordinates threads sharing this store
+        self._thread_lock = threading.Lock()
+
+    def get(self) -> Optional[str]:
+        try:
+            with open(self.path) as file:
+                stored = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(stored, dict):
+            return None
+        if self.max_age is not None and time.time() - stored.get("created", 0) > self.max_age:
+            return None
+        return stored.get("session_id")
+
+    def refresh(self, rejected: Optional[str], login: Callable[[], str]) -> str:
+        with self._locked():
+            current = self.get()
+            if current and current != rejected:
+                return current
+            session_id = login()
+            self._write({"session_id": session_id, "created": time.time()})
+            return session_id
+
+    def clear(self, session_id: str):
+        with self._locked():
+            if self.get() == session_id:
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+
+    def _write(self, stored: dict):
+        # write a new file and swap it in, so readers never see a partial session ID
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as file:
+            json.dump(stored, file)
+        os.replace(temporary, self.path)
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock, open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
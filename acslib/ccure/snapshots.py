@@ -0,0 +1,324 @@
+"""CCure data refreshed in the background and served from memory"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, NamedTuple, Optional
+
+from acslib.ccure.base import CcureACS
+from acslib.ccure.crud import CcureClearanceItem, CcureCredential, CcurePersonnel
+from acslib.ccure.filters import FUZZ, RFUZZ, CcureFilter, PersonnelFilter
+
+
+class PollingSnapshot(ABC):
+    """
+    Base class for data loaded from CCure, kept in memory, and refreshed every
+    `interval` seconds by a background thread.
+
+    Each refresh builds new data and swaps it in with a single assignment, so readers
+    always see a complete snapshot. If a refresh fails, the previous snapshot is kept
+    and the error is saved in `last_error`.
+
+    :param interval: seconds between refreshes
+    :param logger: defaults to the acslib.ccure.snapshots logger
+    """
+
+    def __init__(self, interval: float, logger: Optional[logging.Logger] = None):
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.data: Any = None
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[Exception] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @abstractmethod
+    def load(self) -> Any:
+        """Build a new snapshot from CCure"""
+
+    def refresh(self):
+        """Load a new snapshot now and swap it in"""
+        data = self.load()
+        self.data = data
+        self.refreshed_at = time.time()
+        self.last_error = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh"""
+        return None if self.refreshed_at is None else time.time() - self.refreshed_at
+
+    def start(self):
+        """Load the first snapshot, then keep refreshing it in a background thread"""
+        if self.refreshed_at is None:
+            self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"ccure-{type(self).__name__}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:  # keep serving the last good snapshot
+                self.last_error = e
+                self.logger.error(f"Error refreshing {type(self).__name__}: {e}")
+
+
+class LockStateSnapshot(PollingSnapshot):
+    """
+    Lock states for many doors, refreshed with batched ModeStatus searches
+
+    :param clearance_item: used to look up lock states
+    :param door_ids: the doors to track. Leave empty to track every door.
+    :param interval: seconds between refreshes
+    """
+
+    def __init__(
+        self,
+        clearance_item: CcureClearanceItem,
+        door_ids: Optional[Iterable[int]] = None,
+        interval: float = 5.0,
+    ):
+        super().__init__(interval, clearance_item.logger)
+        self.clearance_item = clearance_item
+        self.door_ids = None if door_ids is None else list(door_ids)
+        self.data: dict[int, str] = {}
+
+    def load(self) -> dict[int, str]:
+        return self.clearance_item.get_lock_states(self.door_ids)
+
+    def get(self, door_id: int) -> str:
+        """The door's lock state as of the last refresh"""
+        return self.data.get(door_id, "Unknown")
+
+    def __getitem__(self, door_id: int) -> str:
+        return self.get(door_id)
+
+
+class CredentialRecord(NamedTuple):
+    """The fields of a credential kept in a CredentialIndex"""
+
+    object_id: int
+    personnel_id: Optional[int]
+    disabled: bool
+
+
+class CredentialIndex(PollingSnapshot):
+    """
+    Every credential, indexed by CHUID and by (FacilityCode, CardNumber),
+    refreshed with paged searches
+
+    Lookups are dictionary reads, and keep working from the last snapshot while
+    CCure is unavailable.
+
+    :param credential: used to pull credentials
+    :param interval: seconds between refreshes
+    :param page_size: credentials per search page
+    """
+
+    PROPERTIES = ["ObjectID", "PersonnelId", "CHUID", "FacilityCode", "CardNumber", "Disabled"]
+
+    def __init__(self, credential: CcureCredential, interval: float = 300.0, page_size: int = 1000):
+        super().__init__(interval, credential.logger)
+        self.credential = credential
+        self.page_size = page_size
+        self.data: tuple[dict[str, CredentialRecord], dict[tuple, CredentialRecord]] = ({}, {})
+
+    def load(self) -> tuple[dict[str, CredentialRecord], dict[tuple, CredentialRecord]]:
+        by_chuid = {}
+        by_card = {}
+        for page in CcureACS.search_pages(
+            self.credential,
+            object_type=self.credential.type,
+            search_filter=CcureFilter(display_properties=self.PROPERTIES),
+            page_size=self.page_size,
+            where_clause="",
+        ):
+            for credential in page:
+                card = None
+                if credential.get("CardNumber"):
+                    try:
+                        card = (
+                            int(credential.get("FacilityCode") or 0),
+                            int(credential["CardNumber"]),
+                        )
+                    except (TypeError, ValueError):
+                        # one bad row shouldn't stop the refresh, so it's left out
+                        self.logger.warning(
+                            f"Skipping credential {credential['ObjectID']} with card "
+                            f"{credential.get('FacilityCode')!r}/{credential['CardNumber']!r}"
+                        )
+                        continue
+                record = CredentialRecord(
+                    credential["ObjectID"],
+                    credential.get("PersonnelId"),
+                    bool(credential.get("Disabled")),
+                )
+                chuid = self._chuid(credential.get("CHUID"))
+                if chuid:
+                    by_chuid[chuid] = record
+                if card:
+                    by_card[card] = record
+        return by_chuid, by_card
+
+    def by_chuid(self, chuid: str) -> Optional[CredentialRecord]:
+        """The credential with the given CHUID, as of the last refresh"""
+        return self.data[0].get(self._chuid(chuid))
+
+    def by_card(self, facility_code: int, card_number: int) -> Optional[CredentialRecord]:
+        """The credential with the given facility code and card number, as of the last refresh"""
+        return self.data[1].get((int(facility_code or 0), int(card_number)))
+
+    def __len__(self):
+        by_chuid, by_card = self.data
+        return len({record.object_id for record in [*by_chuid.values(), *by_card.values()]})
+
+    @staticmethod
+    def _chuid(chuid: Any) -> Optional[str]:
+        chuid = str(chuid or "").strip().upper()
+        return None if chuid in ("", "0") else chuid
+
+
+def _ngrams(text: str, n: int) -> set[str]:
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+class PersonnelNameIndex(PollingSnapshot):
+    """
+    Personnel first and last names indexed by bigram, trigram, and short prefix,
+    for fuzzy and prefix name searches from memory
+
+    Searches match the way the default PersonnelFilter does: every term must appear
+    in the FirstName or LastName, ignoring case. If the index hasn't loaded, is older
+    than `max_age` seconds, or finds nothing, the search is sent to CCure instead.
+
+    :param personnel: used to pull personnel and to run fallback searches
+    :param interval: seconds between refreshes
+    :param page_size: personnel per search page
+    :param max_age: seconds after the last refresh before the index is considered stale.
+        Defaults to twice `interval`.
+    """
+
+    PROPERTIES = ["ObjectID", "FirstName", "MiddleName", "LastName"]
+
+    def __init__(
+        self,
+        personnel: CcurePersonnel,
+        interval: float = 300.0,
+        page_size: int = 1000,
+        max_age: Optional[float] = None,
+    ):
+        super().__init__(interval, personnel.logger)
+        self.personnel = personnel
+        self.page_size = page_size
+        self.max_age = 2 * interval if max_age is None else max_age
+        self.data: tuple[dict[int, tuple], dict[str, set[int]]] = ({}, {})
+
+    def load(self) -> tuple[dict[int, tuple], dict[str, set[int]]]:
+        people = {}
+        grams = {}  # 1- to 3-character substrings, and 1- and 2-character prefixes marked "^"
+        for page in CcureACS.search_pages(
+            self.personnel,
+            object_type=self.personnel.type,
+            search_filter=CcureFilter(display_properties=self.PROPERTIES),
+            page_size=self.page_size,
+            where_clause="",
+        ):
+            for person in page:
+                object_id = person["ObjectID"]
+                names = tuple(
+                    (person.get(name) or "").lower() for name in ("FirstName", "LastName")
+                )
+                people[object_id] = ({name: person.get(name) for name in self.PROPERTIES}, names)
+                for name in names:
+                    keys = set(name) | _ngrams(name, 2) | _ngrams(name, 3)
+                    keys.update(f"^{name[:length]}" for length in (1, 2) if len(name) >= length)
+                    for key in keys:
+                        grams.setdefault(key, set()).add(object_id)
+        return people, grams
+
+    @property
+    def stale(self) -> bool:
+        return self.refreshed_at is None or self.age > self.max_age
+
+    def search(
+        self,
+        terms: list[str],
+        prefix: bool = False,
+        limit: Optional[int] = None,
+        fallback: bool = True,
+    ) -> list[dict]:
+        """
+        Find personnel whose first or last name contains (or starts with) every term
+
+        :param terms: name fragments
+        :param prefix: match names that start with each term instead of containing it
+        :param limit: maximum number of results
+        :param fallback: search CCure if the index is stale or finds nothing
+        :return: ObjectID, FirstName, MiddleName, and LastName of each match, by ObjectID
+        """
+        if not self.stale:
+            results = self.search_local(terms, prefix, limit)
+            if results or not fallback:
+                return results
+        elif not fallback:
+            return []
+        lookup = RFUZZ if prefix else FUZZ
+        return self.personnel.search(
+            terms,
+            search_filter=PersonnelFilter(lookups={"FirstName": lookup, "LastName": lookup}),
+            page_size=limit,
+        )
+
+    def search_local(
+        self, terms: list[str], prefix: bool = False, limit: Optional[int] = None
+    ) -> list[dict]:
+        """Search only the index, however old it is"""
+        people, grams = self.data
+        matches = None
+        for term in terms:
+            term = str(term).lower()
+            if prefix and len(term) <= 2:
+                candidates, exact = grams.get(f"^{term}", set()), True
+            elif 1 <= len(term) <= 3:
+                candidates, exact = grams.get(term, set()), not prefix
+            elif len(term) > 3:
+                postings = sorted((grams.get(gram, set()) for gram in _ngrams(term, 3)), key=len)
+                candidates, exact = set.intersection(*postings), False
+            else:
+                candidates, exact = people.keys(), False
+            if matches is not None:
+                candidates = matches.intersection(candidates)
+            if exact:
+                matches = set(candidates)
+            elif prefix:
+                matches = {
+                    object_id
+                    for object_id in candidates
+                    if any(name.startswith(term) for name in people[object_id][1])
+                }
+            else:
+                matches = {
+                    object_id
+                    for object_id in candidates
+                    if any(term in name for name in people[object_id][1])
+                }
+        object_ids = sorted(people if matches is None else matches)[:limit]
+        return [people[object_id][0] for object_id in object_ids]
@@ -1,9 +1,11 @@
 import random
 from dataclasses import dataclass, field
+from unittest.mock import patch
 
 import pytest
 from faker import Faker
 
+from acslib.ccure import CcureAPI
 from acslib.ccure.base import CcureConnection
 from acslib.ccure.config import CcureConfigFactory
 
@@ -52,6 +54,23 @@ def ccure_connection(config):
     return CcureConnection(config=config)
 
 
+@pytest.fixture
+def ccure(ccure_connection):
+    """A CcureAPI whose connection is already logged in"""
+    ccure_connection._session_id = "session-test"
+    return CcureAPI(ccure_connection)
+
+
+@pytest.fixture
+def mock_requests():
+    """Patch every CCure request, taking the same arguments as `patch`, such as side_effect"""
+
+    def _mock_requests(**kwargs):
+        return patch("acslib.base.connection.ACSConnection._make_request", **kwargs)
+
+    return _mock_requests
+
+
 @pytest.fixture
 def base_mock_response():
     """."""
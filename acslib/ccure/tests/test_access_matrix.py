@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from acslib.ccure.access_matrix import CLEARANCE_DOOR_TYPE, AccessMatrix
+from acslib.ccure.types import ObjectType
+
+ASSIGNMENTS = [(5001, 10), (5001, 11), (5002, 11), (5003, 12)]
+CLEARANCE_DOORS = [(10, 100), (10, 101), (11, 101), (11, 102), (13, 103)]
+
+
+def test_queries():
+    matrix = AccessMatrix(ASSIGNMENTS, CLEARANCE_DOORS)
+    assert matrix.doors_for(5001) == {100, 101, 102}
+    assert matrix.doors_for(5003) == set()
+    assert matrix.doors_for(6000) == set()
+    assert matrix.people_for(101) == {5001, 5002}
+    assert matrix.people_for(103) == set()
+    assert matrix.clearances_for(5001) == {10, 11}
+    assert matrix.can_open(5002, 102)
+    assert not matrix.can_open(5002, 100)
+    assert not matrix.can_open(6000, 100)
+
+
+def test_diff():
+    old = AccessMatrix(ASSIGNMENTS, CLEARANCE_DOORS)
+    new = AccessMatrix(
+        [(5001, 10), (5002, 11), (5003, 12), (5004, 13)],
+        [(10, 100), (10, 101), (11, 101), (11, 104), (13, 103)],
+    )
+    assert old.diff(new) == {
+        5001: (set(), {102}),
+        5002: ({104}, {102}),
+        5004: ({103}, set()),
+    }
+    assert old.diff(old) == {}
+
+
+def test_load(ccure_connection, base_mock_response):
+    ccure_connection._session_id = "session-test"
+    requests = []
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        requests.append((request_json["TypeFullName"], request_json["pageNumber"]))
+        if request_json["TypeFullName"] == ObjectType.CLEARANCE_ASSIGNMENT.complete:
+            rows = [{"PersonnelID": p, "ClearanceID": c} for p, c in ASSIGNMENTS]
+        else:
+            rows = [{"ClearanceID": c, "DoorID": d} for c, d in CLEARANCE_DOORS]
+        page = request_json["pageNumber"]
+        return base_mock_response(json=rows[(page - 1) * 3 : page * 3])
+
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        matrix = AccessMatrix.load(ccure_connection, page_size=3)
+    assert matrix.doors_for(5001) == {100, 101, 102}
+    assert requests == [
+        (ObjectType.CLEARANCE_ASSIGNMENT.complete, 1),
+        (ObjectType.CLEARANCE_ASSIGNMENT.complete, 2),
+        (CLEARANCE_DOOR_TYPE, 1),
+        (CLEARANCE_DOOR_TYPE, 2),
+    ]
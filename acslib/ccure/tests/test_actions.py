@@ -0,0 +1,261 @@
+from unittest.mock import patch
+
+import pytest
+
+
+def test_bulk_assign_clearances(ccure, base_mock_response, mock_requests):
+    ccure.connection.config.clearance_limit = 2
+    sent = []
+
+    def mock_request(method, request_data_map):
+        sent.append(request_data_map["data"])
+        if "ID=5003" in request_data_map["data"]:
+            return base_mock_response(status_code=400, text="unknown person")
+        return base_mock_response(json=[])
+
+    pairs = [(5001, 1), (5001, 2), (5001, 3), (5002, 1), (5001, 1), (5003, 4)]
+    with mock_requests(side_effect=mock_request):
+        counts = []
+        results = ccure.action.personnel.bulk_assign_clearances(
+            pairs, progress=lambda count, result: counts.append(count)
+        )
+
+    # 5001 needs two requests for three clearances; 5002 and 5003 need one each
+    assert len(sent) == 4
+    assert [result.key for result in results] == [
+        (5001, 1),
+        (5001, 2),
+        (5001, 3),
+        (5002, 1),
+        (5003, 4),
+    ]
+    assert {result.key: result.ok for result in results}[(5003, 4)] is False
+    assert all(result.ok for result in results if result.key[0] != 5003)
+    # progress counts pairs, one update per request
+    assert len(counts) == 4 and counts[-1] == 5
+
+
+def test_bulk_revoke_clearances(ccure, base_mock_response, mock_requests):
+    searches = []
+    removals = []
+
+    def mock_request(method, request_data_map):
+        if "json" in request_data_map:
+            searches.append(request_data_map["json"]["WhereClause"])
+            return base_mock_response(
+                json=[
+                    {"PersonnelID": 5001, "ClearanceID": 1, "ObjectID": 901},
+                    {"PersonnelID": 5001, "ClearanceID": 2, "ObjectID": 902},
+                    {"PersonnelID": 5002, "ClearanceID": 1, "ObjectID": 903},
+                    {"PersonnelID": 5002, "ClearanceID": 2, "ObjectID": 904},
+                ]
+            )
+        removals.append(request_data_map["data"])
+        return base_mock_response(json=[])
+
+    pairs = [(5001, 1), (5001, 2), (5002, 2), (5003, 1)]
+    with mock_requests(side_effect=mock_request):
+        counts = []
+        results = ccure.action.personnel.bulk_revoke_clearances(
+            pairs, progress=lambda count, result: counts.append(count)
+        )
+
+    assert searches == ["PersonnelID IN (5001, 5002, 5003) AND ClearanceID IN (1, 2)"]
+    assert len(removals) == 2
+    assert any("[ID]=901" in data and "[ID]=902" in data for data in removals)
+    # (5002, 1) wasn't requested, so its assignment stays
+    assert not any("[ID]=903" in data for data in removals)
+    assert [result.key for result in results] == pairs
+    assert all(result.ok for result in results)
+    assert results[3].response is None
+    assert counts[-1] == len(pairs)
+
+
+def test_reconcile_clearances(ccure, base_mock_response, mock_requests):
+    ccure.connection.config.page_size = 2
+    current = [
+        {"PersonnelID": 5001, "ClearanceID": 1, "ObjectID": 901},
+        {"PersonnelID": 5001, "ClearanceID": 2, "ObjectID": 902},
+        {"PersonnelID": 5002, "ClearanceID": 3, "ObjectID": 903},
+    ]
+    writes = []
+
+    def mock_request(method, request_data_map):
+        if "json" in request_data_map:
+            page_number = request_data_map["json"]["pageNumber"]
+            return base_mock_response(json=current[(page_number - 1) * 2 : page_number * 2])
+        writes.append(request_data_map["url"].rsplit("/", 1)[-1])
+        return base_mock_response(json=[])
+
+    desired = {5001: [1, 4], 5002: [], 5003: [1]}
+    with mock_requests(side_effect=mock_request):
+        plan = ccure.action.personnel.reconcile_clearances(desired, dry_run=True)
+        assert writes == []
+        assert plan.to_assign == [(5001, 4), (5003, 1)]
+        assert plan.to_revoke == {(5001, 2): 902, (5002, 3): 903}
+        assert plan.unchanged == 1
+        assert plan.lookup_requests == 2
+        assert plan.assign_requests == 2
+        assert plan.revoke_requests == 2
+
+        plan = ccure.action.personnel.reconcile_clearances(desired, managed_clearance_ids=[2])
+    assert plan.to_revoke == {(5001, 2): 902}
+    assert sorted(writes) == ["PersistToContainer", "PersistToContainer", "RemoveFromContainer"]
+    assert len(plan.results) == 3
+    assert not plan.failures
+
+    # with paging turned off, each lookup is one unpaged search
+    ccure.connection.config.page_size = 0
+    with mock_requests(
+        return_value=base_mock_response(json=current),
+    ):
+        plan = ccure.action.personnel.reconcile_clearances(desired, dry_run=True)
+    assert plan.lookup_requests == 1
+    assert plan.to_revoke == {(5001, 2): 902, (5002, 3): 903}
+
+
+def test_lock_many_retries_transient_failures(ccure, base_mock_response, mock_requests):
+    calls = []
+
+    def mock_request(method, request_data_map):
+        door_id = int(request_data_map["data"].split("PropertyValues[]=")[2].split("&")[0])
+        calls.append(door_id)
+        if door_id == 2 and calls.count(2) == 1:
+            return base_mock_response(status_code=503, text="busy")
+        if door_id == 3:
+            return base_mock_response(status_code=404, text="no such door")
+        return base_mock_response(json={})
+
+    with mock_requests(side_effect=mock_request):
+        with patch("acslib.ccure.bulk.time.sleep"):
+            report = ccure.action.door.lock_many([1, 2, 3], priority=10)
+
+    assert [(result.key, result.ok) for result in report] == [(1, True), (2, True), (3, False)]
+    assert calls.count(2) == 2
+    assert calls.count(3) == 1
+    assert [result.key for result in report.failures] == [3]
+    assert report.elapsed >= max(result.elapsed for result in report)
+
+
+def test_export_images(ccure, base_mock_response, tmp_path, mock_requests):
+    import base64
+    import io
+
+    images = {5001: bytes(range(256)) * 1000, 5002: b"portrait two"}
+    portraits_per_response = []
+
+    def mock_request(method, request_data_map):
+        where_clause = request_data_map["json"]["WhereClause"]
+        people = [
+            {"ObjectID": object_id, "PrimaryPortrait": base64.b64encode(image).decode()}
+            for object_id, image in images.items()
+            if str(object_id) in where_clause
+        ] + ([{"ObjectID": 5003, "PrimaryPortrait": "@@"}] if "5003" in where_clause else [])
+        portraits_per_response.append(len(people))
+        return base_mock_response(json=people)
+
+    with mock_requests(side_effect=mock_request):
+        results = ccure.action.personnel.export_images(
+            [5001, 5002, 5003, 5004], str(tmp_path), max_workers=2
+        )
+        sinks = {}
+        ccure.action.personnel.export_images(
+            [5002], lambda personnel_id: sinks.setdefault(personnel_id, io.BytesIO())
+        )
+
+    # each request fetched at most one portrait, so a worker holds one at a time
+    assert len(portraits_per_response) == 5
+    assert max(portraits_per_response) == 1
+    assert [result.key for result in results] == [5001, 5002, 5003, 5004]
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert results[0].response == len(images[5001])
+    assert results[3].response is None
+    assert (tmp_path / "5001.jpg").read_bytes() == images[5001]
+    assert (tmp_path / "5002.jpg").read_bytes() == images[5002]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["5001.jpg", "5002.jpg"]
+    assert sinks[5002].getvalue() == images[5002]
+
+
+def test_add_images(ccure, base_mock_response, tmp_path, mock_requests):
+    import base64
+    import io
+    from urllib.parse import unquote
+
+    image = bytes(range(256)) * 10  # base-64 encodes with "+" and "/"
+    (tmp_path / "5002.jpg").write_bytes(image)
+    uploaded = {}
+
+    def mock_request(method, request_data_map):
+        data = request_data_map["data"]
+        personnel_id = int(data.split("&")[1].removeprefix("ID="))
+        encoded = data.rsplit("][]=", 1)[-1]  # the Image property is the last value
+        assert "+" not in encoded and "/" not in encoded
+        uploaded[personnel_id] = base64.b64decode(unquote(encoded))
+        return base_mock_response(json=[personnel_id])
+
+    images = [
+        (5001, image),
+        (5002, tmp_path / "5002.jpg"),
+        (5003, io.BytesIO(image)),
+        (5004, str(tmp_path / "missing.jpg")),
+    ]
+    with mock_requests(side_effect=mock_request):
+        results = ccure.action.personnel.add_images(iter(images), max_workers=2)
+
+    assert [result.key for result in results] == [5001, 5002, 5003, 5004]
+    assert [result.ok for result in results] == [True, True, True, False]
+    assert isinstance(results[3].error, FileNotFoundError)
+    assert uploaded == {5001: image, 5002: image, 5003: image}
+
+
+def test_include_related(ccure, base_mock_response, mock_requests):
+    import re
+
+    from acslib.base import ACSRequestException
+    from acslib.ccure.types import ObjectType
+
+    requests = []
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        type_name = request_json["TypeFullName"].rsplit(".", 1)[-1]
+        requests.append((type_name, request_json["WhereClause"], request_json["DisplayProperties"]))
+        ids = [int(i) for i in re.findall(r"\d+", request_json["WhereClause"])]
+        if type_name == "PersonnelClearancePair":
+            return base_mock_response(
+                json=[{"PersonnelID": 5001, "ClearanceID": c} for c in (10, 11, 12)]
+            )
+        if type_name == "Clearance":
+            return base_mock_response(json=[{"ObjectID": c, "Name": f"C{c}"} for c in ids[:2]])
+        if type_name == "Personnel" and "IN" in request_json["WhereClause"]:
+            return base_mock_response(json=[{"ObjectID": 5001, "LastName": "Lovelace"}])
+        if type_name == "Personnel":
+            return base_mock_response(json=[{"ObjectID": 5001}, {"ObjectID": 5002}])
+        return base_mock_response(
+            json=[{"ObjectID": 1, "PersonnelId": 5001}, {"ObjectID": 2, "PersonnelId": 5001}]
+        )
+
+    with mock_requests(side_effect=mock_request):
+        pairs = ccure.action.personnel.get_assigned_clearances(
+            5001, include=["clearance", "personnel"]
+        )
+        assert [pair["clearance"] for pair in pairs] == [
+            {"ObjectID": 10, "Name": "C10"},
+            {"ObjectID": 11, "Name": "C11"},
+            None,
+        ]
+        assert pairs[0]["personnel"]["LastName"] == "Lovelace"
+        assert requests[1][:2] == ("Clearance", "ObjectID IN (10, 11, 12)")
+        assert len(requests) == 3
+
+        people = ccure.personnel.search(["Lovelace"], include=["credentials"])
+        assert [len(person["credentials"]) for person in people] == [2, 0]
+        assert requests[-1][1] == "PersonnelId IN (5001, 5002)"
+
+        # the key needed for the join is added to the display properties
+        ccure.credential.search(["x"], include=["personnel"])
+        assert "PersonnelId" in requests[-2][2]
+        assert ccure.credential.search_filter.display_properties == ["Name"]
+
+        with pytest.raises(ACSRequestException):
+            ccure.personnel.search(["Lovelace"], include=["clearance"])
@@ -40,10 +40,24 @@ def test_ccure_personnel_search(env_config, personnel_response, ccure_connection
             timeout=0,
             search_options=None,
             where_clause=None,
+            include=None,
         )
     assert "Searching for personnel" in caplog.text
 
 
+def test_unpaged_search_pages(ccure_connection):
+    ccure = CcureAPI(ccure_connection)
+    search_filter = PersonnelFilter(display_properties=["ObjectID"])
+    with patch("acslib.ccure.base.CcureACS.search", return_value=[{"ObjectID": 1}]) as mock_search:
+        pages = list(
+            ccure.personnel.search_pages(
+                ccure.personnel.type, search_filter=search_filter, page_size=0
+            )
+        )
+    assert pages == [[{"ObjectID": 1}]]
+    assert mock_search.call_count == 1
+
+
 @pytest.mark.skip(reason="ccure search no longer works this way")
 def test_invalid_search_type(env_config):
     class NewTypes(Enum):
@@ -0,0 +1,108 @@
+import threading
+import time
+from unittest.mock import patch
+
+from acslib.base import ACSRequestException
+from acslib.ccure import CcureAPI
+from acslib.ccure.bulk import chunked, get_object_id, run_concurrently
+from acslib.ccure.data_models import PersonnelCreateData
+
+
+def test_run_concurrently_keeps_order_and_errors():
+    def operation(item):
+        time.sleep(0.01 * (5 - item))
+        if item == 2:
+            raise ACSRequestException(400, "bad item")
+        return item * 10
+
+    results = run_concurrently(operation, [(f"k{i}", i) for i in range(5)], max_workers=5)
+    assert [result.key for result in results] == ["k0", "k1", "k2", "k3", "k4"]
+    assert [result.response for result in results] == [0, 10, None, 30, 40]
+    assert not results[2].ok
+    assert results[2].error.message == "bad item"
+
+
+def test_run_concurrently_bounds_in_flight():
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def operation(item):
+        with lock:
+            in_flight.append(item)
+            peak.append(len(in_flight))
+        time.sleep(0.005)
+        with lock:
+            in_flight.remove(item)
+
+    progress = []
+    run_concurrently(
+        operation,
+        ((i, i) for i in range(30)),
+        max_workers=8,
+        max_in_flight=3,
+        progress=lambda count, result: progress.append(count),
+    )
+    assert max(peak) <= 3
+    assert progress == list(range(1, 31))
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_get_object_id(base_mock_response):
+    from acslib.base import ACSRequestResponse
+
+    assert get_object_id(ACSRequestResponse(200, 5001, {})) == 5001
+    assert get_object_id(ACSRequestResponse(200, {"ObjectID": 5002}, {})) == 5002
+    assert get_object_id(ACSRequestResponse(200, "", {})) is None
+    assert get_object_id(None) is None
+
+
+def test_personnel_create_many(ccure_connection, base_mock_response):
+    ccure_connection._session_id = "session-test"
+    ccure = CcureAPI(ccure_connection)
+    next_id = iter(range(5000, 5100))
+
+    def mock_request(method, request_data_map):
+        if "PropertyValues[]=Fail" in request_data_map["data"]:
+            return base_mock_response(status_code=400, text="rejected")
+        return base_mock_response(json={"ObjectID": next(next_id)})
+
+    records = [
+        PersonnelCreateData(LastName="One"),
+        {"FirstName": "No last name"},
+        {"LastName": "Fail"},
+        {"LastName": "Two", "FirstName": "Test"},
+    ]
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        results = ccure.personnel.create_many(records, max_workers=2)
+
+    assert [result.key for result in results] == [0, 1, 2, 3]
+    assert [result.ok for result in results] == [True, False, False, True]
+    assert {results[0].object_id, results[3].object_id} == {5000, 5001}
+    assert results[2].error.status_code == 400
+
+
+def test_update_many_and_delete_many(ccure_connection, base_mock_response):
+    ccure_connection._session_id = "session-test"
+    ccure = CcureAPI(ccure_connection)
+
+    def mock_request(method, request_data_map):
+        if request_data_map["params"]["id"] == 3:
+            return base_mock_response(status_code=404, text="not found")
+        return base_mock_response(json={"ok": True})
+
+    progress = []
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        updated = ccure.credential.update_many(
+            {1: {"CardInt1": 1}, 2: {"CardInt1": 2}, 3: {"CardInt1": 3}},
+            max_in_flight=2,
+            progress=lambda count, result: progress.append(count),
+        )
+        deleted = ccure.personnel.delete_many([3, 4])
+
+    assert [(result.key, result.ok) for result in updated] == [(1, True), (2, True), (3, False)]
+    assert progress == [1, 2, 3]
+    assert [(result.key, result.ok) for result in deleted] == [(3, False), (4, True)]
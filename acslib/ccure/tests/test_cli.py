@@ -0,0 +1,101 @@
+import csv
+import json
+from unittest.mock import patch
+
+import pytest
+
+from acslib import cli
+from acslib.ccure.bulk import RateLimiter
+
+PEOPLE = [{"ObjectID": 5000 + i, "LastName": f"Person {i}"} for i in range(1, 26)]
+
+
+@pytest.fixture
+def requests(ccure_connection, base_mock_response):
+    ccure_connection._session_id = "session-test"
+    sent = []
+
+    def mock_request(method, request_data_map):
+        sent.append(request_data_map)
+        request_json = request_data_map.get("json")
+        if request_json is None:
+            return base_mock_response(json={})
+        if request_json.get("CountOnly"):
+            return base_mock_response(json=len(PEOPLE))
+        page_size, page_number = request_json["pageSize"], request_json["pageNumber"]
+        return base_mock_response(json=PEOPLE[(page_number - 1) * page_size :][:page_size])
+
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request", side_effect=mock_request
+    ), patch("acslib.cli._connect", return_value=ccure_connection):
+        yield sent
+
+
+def test_search(requests, capsys):
+    assert cli.main(["--page-size", "10", "search", "personnel", "person", "--limit", "15"]) == 0
+    out, err = capsys.readouterr()
+    assert [json.loads(line) for line in out.splitlines()] == PEOPLE[:15]
+    assert "15 objects" in err
+    assert requests[0]["json"]["WhereClause"] == (
+        "(FirstName LIKE '%person%' OR LastName LIKE '%person%')"
+    )
+
+
+def test_count(requests, capsys):
+    assert cli.main(["count", "personnel", "--where", "LastName = 'x'"]) == 0
+    assert json.loads(capsys.readouterr().out)["count"] == 25
+    assert requests[0]["json"]["WhereClause"] == "LastName = 'x'"
+
+
+def test_export(requests, capsys, tmp_path):
+    path = tmp_path / "people.csv"
+    assert cli.main(["--quiet", "--page-size", "10", "export", "personnel", str(path)]) == 0
+    with open(path) as file:
+        assert len(list(csv.DictReader(file))) == 25
+    out, err = capsys.readouterr()
+    assert json.loads(out)["objects"] == 25
+    assert err == ""
+
+
+def test_export_subcommand_options(requests, capsys, tmp_path):
+    path = tmp_path / "people.jsonl"
+    argv = ["--quiet", "export", "personnel", str(path), "--page-size", "10", "--concurrency", "2"]
+    assert cli.main(argv) == 0
+    assert json.loads(capsys.readouterr().out)["objects"] == 25
+    assert {request["json"]["pageSize"] for request in requests} == {10}
+
+    args = cli.build_parser().parse_args(["--page-size", "5", "export", "personnel", "-"])
+    assert args.page_size == 5
+
+
+def test_door(requests, capsys):
+    assert cli.main(["--quiet", "door", "lock", "5050", "5051", "--minutes", "10"]) == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["doors"], summary["failed"]) == (2, 0)
+    assert len(requests) == 2
+    # lockdowns use the high default priority unless --priority overrides it
+    assert all("PropertyValues[]=100&" in request["data"] for request in requests)
+
+    requests.clear()
+    cli.main(["--quiet", "door", "lock", "5050", "--priority", "5"])
+    assert "PropertyValues[]=5&" in requests[0]["data"]
+
+
+def test_door_reports_progress_per_door(requests, capsys):
+    with patch.object(
+        cli.Progress, "update", autospec=True, side_effect=cli.Progress.update
+    ) as update:
+        cli.main(["--quiet", "door", "unlock", "5050", "5051", "5052", "--minutes", "10"])
+    assert sorted(call.args[1] for call in update.call_args_list) == [1, 2, 3]
+    assert json.loads(capsys.readouterr().out)["doors"] == 3
+
+
+def test_rate_limiter(monkeypatch):
+    now = [0.0]
+    sleeps = []
+    monkeypatch.setattr("acslib.ccure.bulk.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("acslib.ccure.bulk.time.sleep", sleeps.append)
+    limiter = RateLimiter(rate=4)
+    for _ in range(3):
+        limiter.wait()
+    assert sleeps == [0.25, 0.5]
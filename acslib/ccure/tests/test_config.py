@@ -21,6 +21,7 @@ def test_ccure_config_with_kwargs(config):
     assert config.page_size == 100
     assert config.clearance_limit == 40
     assert config.timeout == 3
+    assert config.max_workers == 8
 
 
 def test_ccure_config_with_env_vars():
@@ -46,6 +47,7 @@ def test_ccure_config_with_env_vars():
     assert config.page_size == 100
     assert config.clearance_limit == 40
     assert config.timeout == 3
+    assert config.max_workers == 8
 
 
 def test_ccure_config_change_page_size():
@@ -63,6 +65,18 @@ def test_ccure_config_change_timeout():
     assert config.timeout == 5
 
 
+def test_ccure_config_change_max_workers():
+    config = CcureConfigFactory(max_workers=16)
+    assert config.max_workers == 16
+
+
+def test_ccure_config_session_max_age():
+    assert CcureConfigFactory().session_max_age is None
+    assert CcureConfigFactory(CCURE_SESSION_MAX_AGE="600").session_max_age == 600.0
+    with pytest.raises(ACSConfigException):
+        CcureConfigFactory(CCURE_SESSION_MAX_AGE="soon")
+
+
 def test_no_ccure_connection_vars():
     """."""
     os.environ = {}
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from acslib.ccure.export import export_objects, object_type_name
+from acslib.ccure.types import ObjectType
+
+PEOPLE = [{"ObjectID": 5000 + i, "LastName": f"Person {i}"} for i in range(1, 26)]
+
+
+@pytest.fixture
+def pages(ccure_connection, base_mock_response):
+    ccure_connection._session_id = "session-test"
+    requested = []
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        page_size, page_number = request_json["pageSize"], request_json["pageNumber"]
+        requested.append(page_number)
+        if page_size == 0:
+            return base_mock_response(json=PEOPLE)
+        return base_mock_response(json=PEOPLE[(page_number - 1) * page_size :][:page_size])
+
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        yield requested
+
+
+def test_object_type_name():
+    assert object_type_name("clearance_assignment") == ObjectType.CLEARANCE_ASSIGNMENT.complete
+    assert object_type_name(ObjectType.PERSONNEL) == ObjectType.PERSONNEL.complete
+    assert object_type_name("SoftwareHouse.Custom.Type") == "SoftwareHouse.Custom.Type"
+
+
+def test_export_jsonl_gzip(ccure_connection, pages, tmp_path):
+    progress = []
+    path = tmp_path / "people.jsonl.gz"
+    written = export_objects(
+        "personnel",
+        path,
+        connection=ccure_connection,
+        page_size=10,
+        max_workers=3,
+        progress=progress.append,
+    )
+    assert written == 25
+    assert progress == [10, 20, 25]
+    with gzip.open(path, "rt") as file:
+        assert [json.loads(line) for line in file] == PEOPLE
+    # the third page was short, so no page past the prefetched ones was requested
+    assert max(pages) <= 5
+    assert [entry.name for entry in tmp_path.iterdir()] == ["people.jsonl.gz"]
+
+
+def test_failed_export_leaves_no_file(ccure_connection, pages, tmp_path):
+    def fail(written):
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        export_objects(
+            "personnel", tmp_path / "people.csv", connection=ccure_connection, progress=fail
+        )
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unpaged_export(ccure_connection, pages):
+    stream = io.BytesIO()
+    assert export_objects("personnel", stream, connection=ccure_connection, page_size=0) == 25
+    assert pages == [1]
+
+
+def test_export_csv_stream(ccure_connection, pages):
+    stream = io.BytesIO()
+    written = export_objects(
+        ObjectType.PERSONNEL,
+        stream,
+        format="csv",
+        properties=["LastName"],
+        connection=ccure_connection,
+        page_size=25,
+    )
+    assert written == 25
+    assert pages == [1, 2]
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue().decode())))
+    assert rows == [{"LastName": person["LastName"]} for person in PEOPLE]
@@ -0,0 +1,84 @@
+import re
+
+import pytest
+
+from acslib.ccure.cache import TTLCache
+from acslib.ccure.types import ObjectType
+
+PERSONNEL = ObjectType.PERSONNEL.complete
+GROUP = ObjectType.GROUP.complete
+
+# group 1 holds two people and group 2, which holds a third person and group 1 again
+MEMBERS = [
+    {"GroupID": 1, "TargetObjectID": 5001, "GroupType": PERSONNEL},
+    {"GroupID": 1, "TargetObjectID": 5002, "GroupType": PERSONNEL},
+    {"GroupID": 1, "TargetObjectID": 2, "GroupType": GROUP},
+    {"GroupID": 2, "TargetObjectID": 5003, "GroupType": PERSONNEL},
+    {"GroupID": 2, "TargetObjectID": 1, "GroupType": GROUP},
+]
+
+
+@pytest.fixture
+def searches(base_mock_response, mock_requests):
+    searches = []
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        ids = [int(i) for i in re.findall(r"\d+", request_json["WhereClause"])]
+        searches.append((request_json["TypeFullName"], ids))
+        if request_json["TypeFullName"] == ObjectType.GROUP_MEMBER.complete:
+            return base_mock_response(json=[row for row in MEMBERS if row["GroupID"] in ids])
+        return base_mock_response(json=[{"ObjectID": i, "LastName": f"P{i}"} for i in ids])
+
+    with mock_requests(side_effect=mock_request):
+        yield searches
+
+
+def test_resolve_members(ccure, searches):
+    assert ccure.group.get_member_ids(1) == {PERSONNEL: {5001, 5002, 5003}}
+    assert searches == [
+        (ObjectType.GROUP_MEMBER.complete, [1]),
+        (ObjectType.GROUP_MEMBER.complete, [2]),
+    ]
+    assert ccure.group.get_member_ids([1], nested=False) == {
+        PERSONNEL: {5001, 5002},
+        GROUP: {2},
+    }
+
+    members = ccure.group.resolve_members([1, 2], display_properties=["LastName"], batch_size=2)
+    assert sorted(member["ObjectID"] for member in members) == [5001, 5002, 5003]
+    # memberships were cached, so only the personnel were searched
+    assert searches[2:] == [(PERSONNEL, [5001, 5002]), (PERSONNEL, [5003])]
+
+    ccure.group.member_cache.clear()
+    ccure.group.get_member_ids(2)
+    assert len(searches) == 6
+
+
+def test_ttl_cache(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("acslib.ccure.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10, max_size=5, size=len)
+    cache.set("a", [1, 2])
+    cache.set("b", [1, 2])
+    assert cache.get("a") == [1, 2]
+    cache.set("c", [1, 2])  # over max_size, so the least recently used ("b") is dropped
+    assert "b" not in cache
+    assert cache.total_size == 4
+    cache.set("huge", list(range(6)))
+    assert "huge" not in cache
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+    # expired entries are dropped when another is stored
+    cache.set("d", [1])
+    assert len(cache) == 1
+    assert cache.total_size == 1
+
+
+def test_empty_groups_fill_the_cache(ccure):
+    ccure.group.member_cache.max_size = 3
+    for group_id in range(10):
+        ccure.group.member_cache.set(group_id, {})
+    assert len(ccure.group.member_cache) == 3
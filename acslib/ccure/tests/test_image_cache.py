@@ -0,0 +1,92 @@
+import base64
+import os
+import re
+
+import pytest
+
+from acslib.ccure.image_cache import PortraitCache
+from acslib.ccure.types import ObjectType
+
+
+@pytest.fixture
+def portraits(base_mock_response, mock_requests):
+    """Fake CCure portraits by personnel ID, as (Images ObjectID, image bytes)"""
+    state = {"portraits": {}, "searches": [], "fetches": []}
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        personnel_id = int(re.search(r"\d+", request_json["WhereClause"]).group())
+        portrait = state["portraits"].get(personnel_id)
+        if request_json["TypeFullName"] == ObjectType.IMAGE.complete:
+            state["searches"].append(personnel_id)
+            return base_mock_response(json=[{"ObjectID": portrait[0]}] if portrait else [])
+        state["fetches"].append(personnel_id)
+        image = base64.b64encode(portrait[1]).decode() if portrait else None
+        return base_mock_response(json=[{"PrimaryPortrait": image}])
+
+    with mock_requests(side_effect=mock_request):
+        yield state
+
+
+def test_portraits_are_only_fetched_when_changed(ccure, portraits, tmp_path):
+    portraits["portraits"][5001] = (1, b"first portrait")
+    with PortraitCache(ccure.action.personnel, str(tmp_path), revalidate_after=60) as cache:
+        assert cache.get(5001) == b"first portrait"
+        assert cache.get(5001) == b"first portrait"
+        assert portraits["searches"] == [5001]
+        assert portraits["fetches"] == [5001]
+
+        cache.revalidate_after = 0
+        assert cache.get(5001) == b"first portrait"
+        assert portraits["searches"] == [5001, 5001]
+        assert portraits["fetches"] == [5001]
+
+        portraits["portraits"][5001] = (2, b"second portrait")
+        assert cache.get(5001) == b"second portrait"
+        assert portraits["fetches"] == [5001, 5001]
+        assert (cache.hits, cache.fetches) == (2, 2)
+
+    # the index survives reopening the cache
+    with PortraitCache(ccure.action.personnel, str(tmp_path)) as cache:
+        assert cache.get(5001) == b"second portrait"
+        assert cache.size == len(b"second portrait")
+
+
+def test_missing_portraits_and_eviction(ccure, portraits, tmp_path):
+    portraits["portraits"] |= {5001: (1, b"a" * 10), 5002: (2, b"b" * 10), 5003: (3, b"a" * 10)}
+    with PortraitCache(ccure.action.personnel, str(tmp_path), max_bytes=15) as cache:
+        assert cache.get(6000) is None
+        path = cache.get_path(5001)
+        # identical images are stored once
+        assert cache.get_path(5003) == path
+        assert cache.size == 10
+
+        assert cache.get(5002) == b"b" * 10
+        assert cache.size == 10
+        assert not os.path.exists(path)
+        assert len(portraits["fetches"]) == 3
+        assert cache.get(5001) == b"a" * 10
+        assert len(portraits["fetches"]) == 4
+
+        del portraits["portraits"][5002]
+        cache.revalidate_after = 0
+        assert cache.get(5002) is None
+
+
+def test_removed_files_are_fetched_again(ccure, portraits, tmp_path):
+    portraits["portraits"] |= {5001: (1, b"shared"), 5002: (2, b"shared")}
+    with PortraitCache(ccure.action.personnel, str(tmp_path)) as cache:
+        path = cache.get_path(5001)
+        assert cache.get_path(5002) == path
+
+        # replacing one person's portrait keeps the file the other still uses
+        portraits["portraits"][5001] = (3, b"new")
+        cache.revalidate_after = 0
+        assert cache.get(5001) == b"new"
+        assert os.path.exists(path)
+        assert cache.size == len(b"shared") + len(b"new")
+
+        os.remove(path)
+        cache.revalidate_after = 60
+        assert cache.get(5002) == b"shared"
+        assert portraits["fetches"] == [5001, 5002, 5001, 5002]
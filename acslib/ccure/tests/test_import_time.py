@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+from acslib.ccure import CcureAPI
+
+HEAVY_MODULES = ["requests", "pydantic"]
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+def test_import_does_not_load_heavy_modules():
+    result = run_python(
+        f"import sys, acslib, acslib.cli; print([m in sys.modules for m in {HEAVY_MODULES}])"
+    )
+    assert result.stdout.strip() == str([False] * len(HEAVY_MODULES))
+
+    cumulative = {}
+    for line in result.stderr.splitlines()[1:]:
+        _, _, total, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        cumulative[name] = int(total)
+    # about 0.5ms here; the limit leaves room for slow machines while catching eager imports
+    assert cumulative["acslib"] < 50_000
+
+
+def test_sub_clients_are_built_on_first_use(ccure_connection):
+    ccure = CcureAPI(ccure_connection)
+    assert "personnel" not in vars(ccure)
+    assert ccure.personnel is ccure.personnel
+    assert ccure.personnel.connection is ccure_connection
+    assert "door" not in vars(ccure.action)
+    assert ccure.action.door.connection is ccure_connection
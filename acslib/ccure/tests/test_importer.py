@@ -0,0 +1,102 @@
+import io
+import json
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import pytest
+
+from acslib.ccure import CcureAPI
+from acslib.ccure.importer import CcureImporter, read_rows
+
+CSV = b"""Text1,FirstName,LastName
+E1,Ada,Lovelace
+E2,Alan,
+E3,Grace,Hopper
+E1,Augusta,Lovelace
+E4,Edsger,Dijkstra
+"""
+
+
+@pytest.fixture
+def requests(ccure_connection, base_mock_response):
+    ccure_connection._session_id = "session-test"
+    sent = []
+
+    def mock_request(method, request_data_map):
+        url = request_data_map["url"]
+        if url.endswith("FindObjsWithCriteriaFilter"):
+            sent.append(("search", request_data_map["json"]["WhereClause"]))
+            # E3 already exists in CCure
+            found = "'E3'" in request_data_map["json"]["WhereClause"]
+            existing = [{"ObjectID": 5003, "Text1": "E3", "CHUID": "E3"}]
+            return base_mock_response(json=existing if found else [])
+        form = parse_qs(request_data_map["data"])
+        if url.endswith("Put"):
+            sent.append(("update", request_data_map["params"]["id"], form["PropertyValues[]"]))
+        else:
+            sent.append(("create", form["PropertyValues[]"]))
+        return base_mock_response(json={"ObjectID": 6000})
+
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        yield sent
+
+
+def test_read_rows():
+    rows = list(read_rows(io.BytesIO(CSV), format="csv"))
+    assert rows[1] == {"Text1": "E2", "FirstName": "Alan"}
+    jsonl = io.BytesIO(b'{"LastName": "Lovelace"}\n\n{"LastName": "Hopper"}\n')
+    assert list(read_rows(jsonl)) == [{"LastName": "Lovelace"}, {"LastName": "Hopper"}]
+
+
+def test_import_personnel(ccure_connection, requests, tmp_path):
+    ccure = CcureAPI(ccure_connection)
+    checkpoint = tmp_path / "import.json"
+    reports = []
+    importer = CcureImporter(
+        ccure.personnel, "Text1", batch_size=4, checkpoint=checkpoint, progress=reports.append
+    )
+    report = importer.run(read_rows(io.BytesIO(CSV), format="csv"))
+
+    assert (report.rows, report.created, report.updated, report.failed) == (5, 2, 1, 1)
+    assert report.merged == 1
+    # row 2 has no LastName
+    assert [failure.key for failure in report.failures] == [2]
+    # rows 1 and 4 share a key, so they were merged into one create
+    assert ("create", ["Lovelace", "E1", "Augusta"]) in requests
+    assert ("update", 5003, ["Hopper", "Grace"]) in requests
+    assert [request[0] for request in requests].count("search") == 2
+    assert len(reports) == 2
+    assert json.loads(checkpoint.read_text()) == report.counts()
+
+    # rerunning with the same checkpoint skips every finished row
+    requests.clear()
+    report = importer.run(read_rows(io.BytesIO(CSV), format="csv"))
+    assert requests == []
+    assert report.created == 2
+
+
+def test_creates_are_not_retried(ccure_connection, base_mock_response):
+    ccure = CcureAPI(ccure_connection)
+    ccure_connection._session_id = "session-test"
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        side_effect=lambda method, request_data_map: (
+            base_mock_response(json=[])
+            if request_data_map["url"].endswith("FindObjsWithCriteriaFilter")
+            else base_mock_response(status_code=504, text="timeout")
+        ),
+    ) as mock_request:
+        report = CcureImporter(ccure.personnel, "Text1").run(
+            iter([{"Text1": "E1", "LastName": "Lovelace"}])
+        )
+    assert report.failed == 1
+    # one search and one create, which may have been applied despite the timeout
+    assert mock_request.call_count == 2
+
+
+def test_updates_send_converted_values(ccure_connection, requests):
+    ccure = CcureAPI(ccure_connection)
+    rows = read_rows(io.BytesIO(b"CHUID,CardNumber,FacilityCode\nE3,0042,007\n"), format="csv")
+    report = CcureImporter(ccure.credential, "CHUID").run(rows)
+    assert report.updated == 1
+    assert ("update", 5003, ["42", "7"]) in requests
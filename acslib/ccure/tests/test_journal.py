@@ -0,0 +1,138 @@
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from acslib.base import ACSRequestException
+from acslib.ccure import CcureAPI
+from acslib.ccure.data_models import PersonnelCreateData
+from acslib.ccure.journal import JournalEntry, WriteJournal
+
+
+@pytest.fixture
+def journal(ccure_connection, tmp_path):
+    ccure_connection._session_id = "session-test"
+    with WriteJournal(str(tmp_path / "journal.db"), CcureAPI(ccure_connection)) as journal:
+        yield journal
+
+
+def test_applied_entries_are_not_sent_again(journal, base_mock_response):
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        return_value=base_mock_response(json={"ObjectID": 5001}),
+    ) as mock_request:
+        entry = journal.execute(
+            "create:1", "personnel.create", create_data=PersonnelCreateData(LastName="One")
+        )
+        assert entry.status == JournalEntry.APPLIED
+        assert entry.object_id == 5001
+        again = journal.execute(
+            "create:1", "personnel.create", create_data=PersonnelCreateData(LastName="One")
+        )
+    assert mock_request.call_count == 1
+    assert again.object_id == 5001
+
+
+def test_resume_replays_unapplied_entries(journal, base_mock_response):
+    journal.record("update:1", "personnel.update", object_id=5001, update_data={"Text1": "a"})
+    journal.record("create:2", "personnel.create", create_data={"LastName": "Two"})
+    journal.record("create:3", "personnel.create", create_data={"LastName": "Three"})
+    # simulate a crash after create:3 was sent but before its outcome was recorded
+    journal._set_status("create:3", JournalEntry.SENT)
+
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        return_value=base_mock_response(status_code=400, text="rejected"),
+    ):
+        results = journal.resume()
+    assert [result.ok for result in results] == [False, False]
+    assert journal.get("create:2").status == JournalEntry.FAILED
+
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        return_value=base_mock_response(json={"ObjectID": 5002}),
+    ) as mock_request:
+        results = journal.resume()
+    assert [result.key for result in results] == ["update:1", "create:2"]
+    assert mock_request.call_count == 2
+    assert journal.get("create:3").status == JournalEntry.SENT
+    assert [entry.key for entry in journal.entries(JournalEntry.APPLIED)] == [
+        "update:1",
+        "create:2",
+    ]
+
+
+def test_unknown_operation(journal):
+    with pytest.raises(ACSRequestException):
+        journal.record("x", "personnel.explode")
+
+
+def test_uncertain_entries_are_not_sent_again(journal, base_mock_response):
+    journal.record("create:1", "personnel.create", create_data={"LastName": "One"})
+    # simulate a crash after create:1 was sent but before its outcome was recorded
+    journal._set_status("create:1", JournalEntry.SENT)
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        return_value=base_mock_response(json={"ObjectID": 5001}),
+    ) as mock_request:
+        with pytest.raises(ACSRequestException) as error:
+            journal.execute("create:1", "personnel.create", create_data={"LastName": "One"})
+        assert error.value.status_code == 409
+        assert mock_request.call_count == 0
+        entry = journal.execute(
+            "create:1", "personnel.create", retry_uncertain=True, create_data={"LastName": "One"}
+        )
+    assert entry.status == JournalEntry.APPLIED
+
+
+def test_one_key_is_sent_once(journal, base_mock_response):
+    def slow_request(method, request_data_map):
+        time.sleep(0.05)
+        return base_mock_response(json={"ObjectID": 5001})
+
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request", side_effect=slow_request
+    ) as mock_request:
+        results = journal.execute_many(
+            [("create:1", "personnel.create", {"create_data": {"LastName": "One"}})] * 4,
+            max_workers=4,
+        )
+    assert mock_request.call_count == 1
+    assert sum(result.ok for result in results) == 1
+
+
+def test_buffered_updates_are_recorded(journal, base_mock_response):
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        return_value=base_mock_response(json={"ok": True}),
+    ), journal.api.buffer_updates(window=0.01):
+        entry = journal.execute(
+            "update:1", "personnel.update", object_id=5001, update_data={"Text1": "a"}
+        )
+    assert entry.status == JournalEntry.APPLIED
+    assert entry.result == {"ok": True}
+
+
+def test_timed_out_creates_are_not_replayed(journal, base_mock_response):
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request", side_effect=requests.ReadTimeout
+    ):
+        with pytest.raises(ACSRequestException):
+            journal.execute("create:1", "personnel.create", create_data={"LastName": "One"})
+        with pytest.raises(ACSRequestException):
+            journal.execute(
+                "update:1", "personnel.update", object_id=5001, update_data={"Text1": "a"}
+            )
+    # the create may have reached CCure, so it's uncertain rather than failed
+    assert journal.get("create:1").status == JournalEntry.SENT
+
+    with patch(
+        "acslib.base.connection.ACSConnection._make_request",
+        return_value=base_mock_response(json={"ObjectID": 5001}),
+    ) as mock_request:
+        results = journal.resume(max_workers=None)
+        assert [result.key for result in results] == ["update:1"]
+        assert mock_request.call_count == 1
+        results = journal.resume(retry_uncertain=True)
+    assert [result.key for result in results] == ["create:1"]
@@ -0,0 +1,133 @@
+import re
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from acslib.ccure.filters import FUZZ, PersonnelFilter
+from acslib.ccure.mirror import CcureMirror, _later, _local_where_clause
+from acslib.ccure.types import ObjectType
+
+
+@pytest.fixture
+def ccure_objects(base_mock_response):
+    """Fake CCure objects by type, and the where clauses of each search"""
+    state = {
+        ObjectType.PERSONNEL.complete: [
+            {"ObjectID": 5001, "FirstName": "Ada", "LastName": "Lovelace", "Modified": "2024-01"},
+            {"ObjectID": 5002, "FirstName": "Alan", "LastName": "Turing", "Modified": "2024-01"},
+            {"ObjectID": 5003, "FirstName": "Grace", "LastName": "O'Hopper", "Modified": "2024-02"},
+        ],
+        "where_clauses": [],
+        # objects that exist in CCure but that paged searches miss, as when pages shift
+        "hidden": [],
+    }
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        where_clause = request_json["WhereClause"]
+        state["where_clauses"].append(where_clause)
+        objects = state.get(request_json["TypeFullName"], [])
+        if where_clause.startswith("ObjectID IN"):
+            ids = set(map(int, re.findall(r"\d+", where_clause)))
+            objects = [item for item in state["hidden"] + objects if item["ObjectID"] in ids]
+        elif where_clause:
+            watermark = where_clause.split("'")[1]
+            objects = [item for item in objects if item["Modified"] >= watermark]
+        page_size, page_number = request_json["pageSize"], request_json["pageNumber"]
+        return base_mock_response(json=objects[(page_number - 1) * page_size :][:page_size])
+
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        yield state
+
+
+@pytest.fixture
+def mirror(ccure_connection, tmp_path):
+    ccure_connection._session_id = "session-test"
+    mirror = CcureMirror(
+        str(tmp_path / "mirror.db"),
+        ccure_connection,
+        object_types=[ObjectType.PERSONNEL, ObjectType.CREDENTIAL],
+        page_size=2,
+    )
+    yield mirror
+    mirror.close()
+
+
+def test_sync_and_search(mirror, ccure_objects):
+    assert mirror.sync() == {"personnel": 3, "credential": 0}
+    assert mirror.sync() == {"personnel": 0, "credential": 0}
+
+    people = ccure_objects[ObjectType.PERSONNEL.complete]
+    people[1] = people[1] | {"FirstName": "Alan M."}
+    del people[0]
+    assert mirror.sync()["personnel"] == 2
+
+    assert mirror.personnel.search(["al"]) == [
+        {"FirstName": "Alan M.", "LastName": "Turing", "ObjectID": 5002}
+    ]
+    assert mirror.personnel.count() == 2
+    assert mirror.personnel.search(page_size=1, page_number=2)[0]["ObjectID"] == 5003
+    assert mirror.personnel.search(
+        search_filter=PersonnelFilter(lookups={"LastName": FUZZ}, display_properties=["ObjectID"]),
+        terms=["hop"],
+    ) == [{"ObjectID": 5003}]
+    assert mirror.personnel.search(where_clause="ObjectID IN (5001, 5002)")[0]["ObjectID"] == 5002
+    assert mirror.personnel.search(where_clause="LastName = 'O''Hopper'")[0]["ObjectID"] == 5003
+    assert mirror.personnel.get_property(5003, "FirstName") == "Grace"
+    assert mirror.personnel.get(5001) is None
+
+
+def test_sync_keeps_objects_missed_by_paging(mirror, ccure_objects):
+    mirror.sync()
+    people = ccure_objects[ObjectType.PERSONNEL.complete]
+    ccure_objects["hidden"].append(people.pop(0))
+    assert mirror.sync()["personnel"] == 0
+    assert mirror.personnel.get(5001) is not None
+    assert "ObjectID IN (5001)" in ccure_objects["where_clauses"]
+
+
+def test_failed_sync_rolls_back(mirror, ccure_objects):
+    people = ccure_objects[ObjectType.PERSONNEL.complete]
+    people.append({"ObjectID": (6000, 6001), "LastName": "Broken"})
+    with pytest.raises(sqlite3.Error):
+        mirror.sync()
+    people.pop()
+    # the first page was committed before the second failed and was rolled back
+    assert mirror.sync()["personnel"] == 1
+    assert mirror.personnel.count() == 3
+
+
+def test_incremental_sync(ccure_connection, ccure_objects, tmp_path):
+    ccure_connection._session_id = "session-test"
+    with CcureMirror(
+        str(tmp_path / "mirror.db"),
+        ccure_connection,
+        object_types=[ObjectType.PERSONNEL],
+        modified_property="Modified",
+    ) as mirror:
+        assert mirror.data == {"personnel": 3}
+        people = ccure_objects[ObjectType.PERSONNEL.complete]
+        people.append({"ObjectID": 5004, "LastName": "Hamilton", "Modified": "2024-03"})
+        assert mirror.sync() == {"personnel": 1}
+        assert ccure_objects["where_clauses"][-1] == "Modified >= '2024-02'"
+        # objects modified at the watermark are pulled again, but aren't changes
+        assert mirror.sync() == {"personnel": 0}
+        assert mirror.sync(full=True) == {"personnel": 0}
+        assert ccure_objects["where_clauses"][-1] == ""
+    # leaving the context closes the database
+    with pytest.raises(sqlite3.ProgrammingError):
+        mirror.query("SELECT 1")
+
+
+def test_watermark_compares_times():
+    assert _later(None, "2024-02-01T10:00:00Z") == "2024-02-01T10:00:00Z"
+    assert _later("2024-02-01T10:00:00Z", "2024-02-01T10:00:00.5Z") == "2024-02-01T10:00:00.5Z"
+    assert _later("2024-02-01T10:00:00+02:00", "2024-02-01T09:00:00Z") == "2024-02-01T09:00:00Z"
+    assert _later("2024-02", "2024-01") == "2024-02"
+
+
+def test_local_where_clause():
+    assert _local_where_clause("Name LIKE 'A%' AND NOT Disabled = 1") == (
+        "json_extract(data, '$.Name') LIKE 'A%' AND NOT json_extract(data, '$.Disabled') = 1"
+    )
@@ -0,0 +1,99 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from acslib.base import ACSConfigException, status
+from acslib.base.connection import ACSRequestData, ACSRequestMethod
+from acslib.ccure.connection import CcureConnection
+
+
+@pytest.fixture
+def server(base_mock_response):
+    """A fake CCure server recording which session each request used"""
+    state = {"logins": 0, "live": set(), "used": [], "logged_out": [], "barrier": None}
+
+    def mock_request(method, request_data_map):
+        url = request_data_map["url"]
+        if url.endswith("Login"):
+            state["logins"] += 1
+            session_id = f"session-{state['logins']}"
+            state["live"].add(session_id)
+            return base_mock_response(headers={"session-id": session_id})
+        session_id = request_data_map["headers"]["session-id"]
+        if url.endswith("Logout"):
+            state["logged_out"].append(session_id)
+            return base_mock_response(json={})
+        if session_id not in state["live"]:
+            return base_mock_response(status_code=status.HTTP_401_UNAUTHORIZED, text="expired")
+        state["used"].append(session_id)
+        if state["barrier"]:
+            state["barrier"].wait(timeout=5)
+        return base_mock_response(json={})
+
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        yield state
+
+
+def ping(connection: CcureConnection):
+    connection.request(
+        ACSRequestMethod.POST,
+        ACSRequestData(url=connection.config.base_url, headers=connection.base_headers),
+    )
+
+
+def test_least_busy(config, server):
+    connection = CcureConnection(config=config, session_pool_size=4)
+    # four requests wait for each other, so each must get its own session
+    server["barrier"] = threading.Barrier(4)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: ping(connection), range(4)))
+    assert len(set(server["used"])) == 4
+    assert server["logins"] == 4
+
+    connection.logout()
+    assert sorted(server["logged_out"]) == sorted(set(server["used"]))
+
+
+def test_round_robin_and_reauthentication(config, server):
+    connection = CcureConnection(
+        config=config, session_pool_size=3, session_selection="round_robin"
+    )
+    for _ in range(4):
+        ping(connection)
+    # session 1 is opened for the first request's headers, then each session is used in turn
+    assert server["used"] == ["session-2", "session-3", "session-1", "session-2"]
+
+    # a refused session logs in again and the request is retried on it
+    server["live"].discard("session-3")
+    ping(connection)
+    assert server["used"][-1] == "session-4"
+    ping(connection)
+    ping(connection)
+    assert server["used"][-2:] == ["session-1", "session-2"]
+    assert server["logins"] == 4
+
+
+def test_keepalive(config, server):
+    connection = CcureConnection(config=config, session_pool_size=2)
+    server["barrier"] = threading.Barrier(2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda _: ping(connection), range(2)))
+    server["barrier"] = None
+    server["used"].clear()
+
+    # only the session that can't be kept alive is dropped
+    server["live"].discard("session-1")
+    connection.keepalive()
+    assert sorted(server["used"]) == ["session-2"]
+    assert [session.session_id for session in connection.session_pool.sessions].count(None) == 1
+    assert server["logins"] == 2
+
+
+def test_pool_options(config, tmp_path):
+    with pytest.raises(ACSConfigException):
+        CcureConnection(config=config, session_pool_size=2, session_selection="random")
+    config.session_file = str(tmp_path / "session.json")
+    with pytest.raises(ACSConfigException):
+        CcureConnection(config=config, session_pool_size=2)
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from acslib.base import status
+from acslib.base.connection import ACSRequestData, ACSRequestMethod
+from acslib.ccure.connection import CcureConnection
+from acslib.ccure.session_store import FileSessionStore
+
+
+def _refresh_in_process(path: str, log_path: str, results):
+    def login():
+        with open(log_path, "a") as log:
+            log.write(f"{os.getpid()}\n")
+        time.sleep(0.2)
+        return f"session-{os.getpid()}"
+
+    results.put(FileSessionStore(path).refresh(None, login))
+
+
+@pytest.mark.skipif(os.name != "posix", reason="FileSessionStore needs fcntl")
+def test_one_process_logs_in(tmp_path):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    log_path = tmp_path / "logins"
+    processes = [
+        context.Process(
+            target=_refresh_in_process, args=(tmp_path / "session.json", log_path, results)
+        )
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    session_ids = {results.get() for _ in processes}
+    assert len(log_path.read_text().split()) == 1
+    assert len(session_ids) == 1
+
+
+@pytest.fixture
+def server(base_mock_response):
+    """A fake CCure server whose live sessions can be expired"""
+    state = {"logins": 0, "live": set()}
+
+    def mock_request(method, request_data_map):
+        if request_data_map["url"].endswith("Login"):
+            state["logins"] += 1
+            session_id = f"session-{state['logins']}"
+            state["live"].add(session_id)
+            return base_mock_response(headers={"session-id": session_id})
+        if request_data_map["headers"]["session-id"] not in state["live"]:
+            return base_mock_response(status_code=status.HTTP_401_UNAUTHORIZED, text="expired")
+        if request_data_map["url"].endswith("Logout"):
+            state["live"].discard(request_data_map["headers"]["session-id"])
+        return base_mock_response(json={})
+
+    with patch("acslib.base.connection.ACSConnection._make_request", side_effect=mock_request):
+        yield state
+
+
+def ping(connection: CcureConnection):
+    connection.request(
+        ACSRequestMethod.POST,
+        ACSRequestData(url=connection.config.base_url, headers=connection.base_headers),
+    )
+
+
+def test_connections_share_a_session(config, server, tmp_path):
+    store = FileSessionStore(tmp_path / "session.json")
+    first = CcureConnection(config=config, session_store=store)
+    second = CcureConnection(config=config, session_store=store)
+    ping(first)
+    ping(second)
+    assert server["logins"] == 1
+    assert first.session_id == second.session_id == "session-1"
+
+    # after the session expires, the first connection to notice logs in for both
+    server["live"].clear()
+    ping(first)
+    ping(second)
+    assert server["logins"] == 2
+    assert second.session_id == "session-2"
+
+    # logging out leaves the shared session open, and revoking ends it for everyone
+    second.logout()
+    assert store.get() == "session-2"
+    first.revoke()
+    assert store.get() is None
+    ping(second)
+    assert server["logins"] == 3
+
+
+def test_session_file_from_config(config, tmp_path):
+    config.session_file = str(tmp_path / "session.json")
+    config.session_max_age = 600.0
+    store = CcureConnection(config=config).session_store
+    assert isinstance(store, FileSessionStore)
+    assert store.path == config.session_file
+    assert store.max_age == 600.0
+
+
+def test_unreadable_session_file(tmp_path):
+    path = tmp_path / "session.json"
+    store = FileSessionStore(path)
+    for contents in ("not json", '["session-1"]', "null"):
+        path.write_text(contents)
+        assert store.get() is None
+    assert store.refresh(None, lambda: "session-2") == "session-2"
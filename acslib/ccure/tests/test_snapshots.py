@@ -0,0 +1,149 @@
+import time
+from unittest.mock import patch
+
+import pytest
+
+from acslib.ccure.snapshots import LockStateSnapshot
+
+
+def test_get_lock_states(ccure, base_mock_response, mock_requests):
+    ccure.connection.config.page_size = 2
+    doors = [
+        {"ObjectID": 1, "ModeStatus": 2},
+        {"ObjectID": 2, "ModeStatus": 1},
+        {"ObjectID": 3, "ModeStatus": 9},
+    ]
+    where_clauses = []
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        where_clauses.append(request_json["WhereClause"])
+        page_number = request_json["pageNumber"]
+        return base_mock_response(json=doors[(page_number - 1) * 2 : page_number * 2])
+
+    with mock_requests(side_effect=mock_request):
+        assert ccure.clearance_item.get_lock_states() == {
+            1: "Locked",
+            2: "Unlocked",
+            3: "Unknown",
+        }
+        assert where_clauses == ["", ""]
+        lock_states = ccure.clearance_item.get_lock_states([1, 2, 3, 4])
+    assert where_clauses[-1] == "ObjectID IN (1, 2, 3, 4)"
+    assert lock_states[4] == "Unknown"
+
+
+def test_lock_state_snapshot(ccure):
+    states = iter([{1: "Locked"}, {1: "Unlocked"}])
+    with patch.object(
+        ccure.clearance_item, "get_lock_states", side_effect=lambda door_ids: next(states)
+    ):
+        with LockStateSnapshot(ccure.clearance_item, [1], interval=0.01) as snapshot:
+            assert snapshot[1] == "Locked" or snapshot[1] == "Unlocked"
+            deadline = time.time() + 1
+            while snapshot[1] != "Unlocked" and time.time() < deadline:
+                time.sleep(0.005)
+            assert snapshot[1] == "Unlocked"
+            # failed refreshes keep the last snapshot
+            time.sleep(0.05)
+            assert snapshot.get(1) == "Unlocked"
+            assert isinstance(snapshot.last_error, StopIteration)
+    assert snapshot.get(2) == "Unknown"
+
+
+def test_credential_index(ccure, base_mock_response, mock_requests):
+    from acslib.ccure.snapshots import CredentialIndex, CredentialRecord
+
+    pages = [
+        [
+            {"ObjectID": 1, "PersonnelId": 5001, "CHUID": "abc123", "CardNumber": 0},
+            {"ObjectID": 2, "PersonnelId": 5002, "CHUID": "0", "FacilityCode": 7, "CardNumber": 42},
+        ],
+        [{"ObjectID": 3, "PersonnelId": 5003, "CHUID": "DEF", "CardNumber": 9, "Disabled": True}],
+    ]
+    calls = []
+
+    def mock_request(method, request_data_map):
+        calls.append(request_data_map["json"]["pageNumber"])
+        if len(calls) > 2:
+            raise ConnectionError("CCure is down")
+        return base_mock_response(json=pages[request_data_map["json"]["pageNumber"] - 1])
+
+    index = CredentialIndex(ccure.credential, interval=0.01, page_size=2)
+    with mock_requests(side_effect=mock_request):
+        with index:
+            time.sleep(0.05)
+    assert calls[:2] == [1, 2]
+    assert isinstance(index.last_error, ConnectionError)
+
+    # lookups keep using the last good snapshot
+    assert index.by_chuid(" ABC123") == CredentialRecord(1, 5001, False)
+    assert index.by_chuid("0") is None
+    assert index.by_card(7, 42).personnel_id == 5002
+    assert index.by_card(None, 9) == CredentialRecord(3, 5003, True)
+    assert index.by_card(1, 42) is None
+    assert len(index) == 3
+
+
+def test_personnel_name_index(ccure, base_mock_response, mock_requests):
+    from acslib.ccure.snapshots import PersonnelNameIndex
+
+    people = [
+        {"ObjectID": 1, "FirstName": "Ada", "LastName": "Lovelace"},
+        {"ObjectID": 2, "FirstName": "Alan", "LastName": "Turing"},
+        {"ObjectID": 3, "FirstName": "Grace", "LastName": "Hopper"},
+        {"ObjectID": 4, "FirstName": "Alana", "LastName": None},
+    ]
+    where_clauses = []
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        where_clauses.append(request_json["WhereClause"])
+        if request_json["WhereClause"]:
+            return base_mock_response(json=[{"ObjectID": 99, "LastName": "Server"}])
+        return base_mock_response(json=people)
+
+    index = PersonnelNameIndex(ccure.personnel)
+    with mock_requests(side_effect=mock_request):
+        # not loaded yet, so the search goes to CCure
+        assert index.search(["al"])[0]["ObjectID"] == 99
+        index.refresh()
+        assert where_clauses[-1] == ""
+        requests = len(where_clauses)
+
+        assert [person["ObjectID"] for person in index.search(["al"], prefix=True)] == [2, 4]
+        assert [person["ObjectID"] for person in index.search(["LAN"])] == [2, 4]
+        assert [person["ObjectID"] for person in index.search(["ace"])] == [1, 3]
+        assert [person["ObjectID"] for person in index.search(["a", "ing"])] == [2]
+        assert index.search(["alan"], limit=1) == [
+            {"ObjectID": 2, "FirstName": "Alan", "MiddleName": None, "LastName": "Turing"}
+        ]
+        assert index.search(["ace"], prefix=True, fallback=False) == []
+        assert len(where_clauses) == requests
+
+        # misses fall back to a prefix search in CCure
+        assert index.search(["zz"], prefix=True)[0]["ObjectID"] == 99
+        assert where_clauses[-1] == "(FirstName LIKE 'zz%' OR LastName LIKE 'zz%')"
+
+        index.refreshed_at -= index.max_age + 1
+        assert index.stale
+        index.search(["al"])
+        assert len(where_clauses) == requests + 2
+
+
+def test_credential_index_skips_unparseable_cards(ccure, base_mock_response, caplog, mock_requests):
+    from acslib.ccure.snapshots import CredentialIndex
+
+    page = [
+        {"ObjectID": 1, "CHUID": "ABC", "FacilityCode": 7, "CardNumber": "12a"},
+        {"ObjectID": 2, "CHUID": "DEF", "FacilityCode": 7, "CardNumber": 42},
+    ]
+    index = CredentialIndex(ccure.credential, page_size=0)
+    with mock_requests(
+        return_value=base_mock_response(json=page),
+    ):
+        index.refresh()
+    assert index.last_error is None
+    assert index.by_chuid("ABC") is None
+    assert index.by_card(7, 42).object_id == 2
+    assert "Skipping credential 1" in caplog.text
@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import CancelledError
+from unittest.mock import patch
+
+import pytest
+
+
+PEOPLE = [
+    {"ObjectID": 1, "FirstName": "Ada", "LastName": "Lovelace"},
+    {"ObjectID": 2, "FirstName": "Adam", "LastName": "Smith"},
+    {"ObjectID": 3, "FirstName": "Alan", "LastName": "Adams"},
+    {"ObjectID": 4, "FirstName": "Grace", "LastName": "Hopper"},
+]
+
+
+@pytest.fixture
+def mock_search(base_mock_response, mock_requests):
+    """Answer personnel searches by evaluating `Field LIKE 'term%'` lookups"""
+    where_clauses = []
+
+    def matches(person, where_clause):
+        terms = [part.split("'")[1].rstrip("%") for part in where_clause.split(" AND ")]
+        return all(
+            any(
+                str(person.get(field) or "").lower().startswith(term.lower())
+                for field in ("FirstName", "LastName")
+            )
+            for term in terms
+        )
+
+    def mock_request(method, request_data_map):
+        request_json = request_data_map["json"]
+        where_clauses.append(request_json["WhereClause"])
+        found = [person for person in PEOPLE if matches(person, request_json["WhereClause"])]
+        return base_mock_response(json=found[: request_json["pageSize"]])
+
+    with mock_requests(side_effect=mock_request):
+        yield where_clauses
+
+
+def test_results_are_narrowed_from_complete_prefixes(ccure, mock_search):
+    with ccure.personnel.typeahead(limit=3) as typeahead:
+        assert [person["ObjectID"] for person in typeahead.search("a")] == [1, 2, 3]
+        # the first result was cut off at the limit, so "ad" is searched in CCure
+        assert [person["ObjectID"] for person in typeahead.search("Ad")] == [1, 2, 3]
+        assert mock_search == [
+            "(FirstName LIKE 'a%' OR LastName LIKE 'a%')",
+            "(FirstName LIKE 'Ad%' OR LastName LIKE 'Ad%')",
+        ]
+        typeahead.limit = 4
+        assert [person["ObjectID"] for person in typeahead.search("ada")] == [1, 2, 3]
+        assert [person["ObjectID"] for person in typeahead.search("adam")] == [2, 3]
+        assert [person["ObjectID"] for person in typeahead.search("adam s")] == [2]
+        assert [person["ObjectID"] for person in typeahead.search(" ADA ")] == [1, 2, 3]
+        assert typeahead.requests == 3
+        assert typeahead.search("  ") == []
+
+
+def test_submit_cancels_superseded_queries(ccure, mock_search):
+    release = threading.Event()
+    search = ccure.personnel.search
+
+    def slow_search(*args, **kwargs):
+        release.wait(1)
+        return search(*args, **kwargs)
+
+    with ccure.personnel.typeahead(debounce=0.05) as typeahead:
+        with patch.object(ccure.personnel, "search", side_effect=slow_search):
+            first = typeahead.submit("g")
+            second = typeahead.submit("gr")
+            third = typeahead.submit("gra")
+            release.set()
+            assert [person["ObjectID"] for person in third.result(timeout=1)] == [4]
+        for future in (first, second):
+            with pytest.raises(CancelledError):
+                future.result()
+    # only the last query reached CCure
+    assert mock_search == ["(FirstName LIKE 'gra%' OR LastName LIKE 'gra%')"]
+
+
+def test_clearance_typeahead(ccure):
+    typeahead = ccure.clearance.typeahead()
+    assert typeahead.fields == ["Name"]
+    assert typeahead.search_filter.filter(["lab"]) == "(Name LIKE 'lab%')"
+    typeahead.close()
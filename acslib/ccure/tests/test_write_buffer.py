@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from acslib.base import ACSRequestException
+
+
+@pytest.fixture
+def mock_put(base_mock_response, mock_requests):
+    sent = []
+
+    def mock_request(method, request_data_map):
+        sent.append((request_data_map["params"]["id"], request_data_map["data"]))
+        if request_data_map["params"]["id"] == 6000:
+            return base_mock_response(status_code=404, text="not found")
+        return base_mock_response(json={"ok": True})
+
+    with mock_requests(side_effect=mock_request):
+        yield sent
+
+
+def test_updates_are_merged(ccure, mock_put):
+    with ccure.buffer_updates(window=60) as buffer:
+        first = ccure.personnel.update(5001, {"FirstName": "A", "Text1": "x"})
+        second = ccure.personnel.update(5001, {"FirstName": "B"})
+        other = ccure.credential.update(5001, {"CardInt1": 1})
+        missing = ccure.personnel.update(6000, {"FirstName": "C"})
+        assert isinstance(first, Future)
+        assert mock_put == []
+        buffer.flush()
+
+    assert len(mock_put) == 3
+    personnel_put = [data for _, data in mock_put if "FirstName" in data and "B" in data]
+    assert personnel_put == [
+        "PropertyNames[]=FirstName&PropertyNames[]=Text1&PropertyValues[]=B&PropertyValues[]=x"
+    ]
+    assert first.result().json == second.result().json == {"ok": True}
+    assert other.result().status_code == 200
+    with pytest.raises(ACSRequestException):
+        missing.result()
+
+    # closing the buffer detaches it
+    assert ccure.personnel.update_buffer is None
+    assert ccure.personnel.update(5001, {"FirstName": "D"}).status_code == 200
+
+
+def test_updates_flush_on_window_and_size(ccure, mock_put):
+    buffer = ccure.buffer_updates(window=0.05, max_pending=2)
+    ccure.personnel.update(5001, {"FirstName": "A"}).result(timeout=1)
+    assert len(mock_put) == 1
+
+    buffer.window = 60
+    first = ccure.personnel.update(5001, {"FirstName": "A"})
+    second = ccure.personnel.update(5002, {"FirstName": "B"})
+    first.result(timeout=1)
+    second.result(timeout=1)
+    assert len(mock_put) == 3
+
+    buffer.close()
+    with pytest.raises(ACSRequestException):
+        buffer.submit(ccure.personnel.type, 5001, {"FirstName": "E"})
+
+
+def test_one_request_per_object_in_flight(ccure, base_mock_response, mock_requests):
+    started = threading.Event()
+    release = threading.Event()
+    sent = []
+
+    def mock_request(method, request_data_map):
+        sent.append(request_data_map["data"])
+        if len(sent) == 1:
+            started.set()
+            release.wait(timeout=5)
+        return base_mock_response(json={"ok": True})
+
+    with mock_requests(side_effect=mock_request), ccure.buffer_updates(window=0) as buffer:
+        first = ccure.personnel.update(5001, {"FirstName": "A"})
+        assert started.wait(timeout=1)
+        second = ccure.personnel.update(5001, {"FirstName": "B"})
+        time.sleep(0.05)
+        # the second update waits for the first request to finish
+        assert len(sent) == 1
+        release.set()
+        second.result(timeout=1)
+        assert first.result().json == {"ok": True}
+        assert sent[-1].endswith("PropertyValues[]=B")
+
+        # an update whose Futures were all cancelled isn't sent
+        buffer.window = 60
+        cancelled = ccure.personnel.update(5002, {"FirstName": "C"})
+        assert cancelled.cancel()
+        buffer.flush()
+        assert len(sent) == 2
+
+        # a cancelled update is left out of the merged request for its object
+        ccure.personnel.update(5003, {"FirstName": "D"})
+        assert ccure.personnel.update(5003, {"LastName": "E"}).cancel()
+        buffer.flush()
+    assert len(sent) == 3
+    assert "LastName" not in sent[-1]
+    assert sent[-1].endswith("PropertyValues[]=D")
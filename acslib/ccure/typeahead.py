@@ -0,0 +1,158 @@
+"""Prefix searches for search-as-you-type pickers"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from typing import Optional
+
+from acslib.ccure.base import CcureACS
+from acslib.ccure.filters import RFUZZ
+
+
+class Typeahead:
+    """
+    Search one CRUD class for objects with a field starting with each word typed so far
+
+    Results for each query are cached. When a query extends a cached query whose results
+    weren't cut off by `limit`, its results are narrowed from the cached ones without
+    contacting CCure.
+
+    `submit` runs searches in the background for UIs that search on every keystroke.
+    Each submission cancels the Future of the one before it, and a search only reaches
+    CCure if no newer query arrives within `debounce` seconds.
+
+    :param crud: the CRUD object to search, such as CcurePersonnel or CcureClearance
+    :param fields: the properties matched against each word
+    :param limit: maximum number of results per query
+    :param debounce: seconds to wait for a newer query before searching CCure
+    :param max_age: seconds cached results are used
+    :param cache_size: maximum number of cached queries
+    """
+
+    def __init__(
+        self,
+        crud: CcureACS,
+        fields: list[str],
+        limit: int = 25,
+        debounce: float = 0.15,
+        max_age: float = 30.0,
+        cache_size: int = 256,
+    ):
+        self.crud = crud
+        self.fields = fields
+        self.limit = limit
+        self.debounce = debounce
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self.requests = 0
+        display_properties = list(
+            dict.fromkeys([*crud.search_filter.display_properties, "ObjectID", *fields])
+        )
+        self.search_filter = type(crud.search_filter)(
+            lookups={field: RFUZZ for field in fields}, display_properties=display_properties
+        )
+        self._cache: OrderedDict[str, tuple[float, list[dict], bool]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: Optional[Future] = None
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ccure-typeahead")
+
+    def close(self):
+        with self._lock:
+            if self._pending:
+                self._pending.cancel()
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def search(self, text: str) -> list[dict]:
+        """Objects with a field starting with each word in `text`, ignoring case"""
+        terms = text.split()
+        if not terms:
+            return []
+        cached = self._cached(terms)
+        if cached is not None:
+            return cached
+        results = self.crud.search(terms, search_filter=self.search_filter, page_size=self.limit)
+        self.requests += 1
+        self._store(terms, results, complete=len(results) < self.limit)
+        return results
+
+    def submit(self, text: str) -> Future:
+        """
+        Search in the background. The returned Future is cancelled if another query
+        is submitted before its results are ready.
+        """
+        future = Future()
+        with self._lock:
+            self._generation += 1
+            if self._pending:
+                self._pending.cancel()
+            self._pending = future
+            generation = self._generation
+        self._executor.submit(self._run, text, generation, future)
+        return future
+
+    def _run(self, text: str, generation: int, future: Future):
+        if self._cached(text.split()) is None and self.debounce:
+            time.sleep(self.debounce)
+        if generation != self._generation:
+            future.cancel()
+            return
+        try:
+            result = self.search(text)
+        except Exception as e:
+            self._resolve(future, exception=e)
+        else:
+            self._resolve(future, result=result)
+
+    @staticmethod
+    def _resolve(future: Future, result=None, exception: Optional[Exception] = None):
+        try:
+            if exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except InvalidStateError:  # superseded and cancelled while searching
+            pass
+
+    def _cached(self, terms: list[str]) -> Optional[list[dict]]:
+        key = " ".join(terms).lower()
+        now = time.time()
+        with self._lock:
+            for length in range(len(key), 0, -1):
+                entry = self._cache.get(key[:length])
+                if entry is None or now - entry[0] > self.max_age:
+                    continue
+                cached_at, results, complete = entry
+                if length == len(key):
+                    self._cache.move_to_end(key)
+                    return results
+                if complete:
+                    break
+            else:
+                return None
+        results = [item for item in results if self._matches(item, terms)]
+        self._store(terms, results, complete=True, cached_at=cached_at)
+        return results
+
+    def _store(
+        self,
+        terms: list[str],
+        results: list[dict],
+        complete: bool,
+        cached_at: Optional[float] = None,
+    ):
+        with self._lock:
+            self._cache[" ".join(terms).lower()] = (cached_at or time.time(), results, complete)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _matches(self, item: dict, terms: list[str]) -> bool:
+        values = [str(item.get(field) or "").lower() for field in self.fields]
+        return all(any(value.startswith(term.lower()) for value in values) for term in terms)
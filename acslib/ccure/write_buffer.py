@@ -0,0 +1,181 @@
+"""Merge repeated updates to the same CCure object into fewer requests"""
+
+import atexit
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from acslib.base import ACSRequestException
+from acslib.ccure.base import CcureACS
+from acslib.ccure.bulk import run_concurrently
+from acslib.ccure.connection import CcureConnection
+
+
+class _PendingUpdate:
+    def __init__(self):
+        self.first_update = time.monotonic()
+        # each submit's changes are kept with its Future, so cancelled changes can be dropped
+        self.updates: list[tuple[Future, dict]] = []
+
+    @property
+    def futures(self) -> list[Future]:
+        return [future for future, _ in self.updates]
+
+    @property
+    def update_data(self) -> dict:
+        """The changes of every submit, merged in order"""
+        merged = {}
+        for _, update_data in self.updates:
+            merged.update(update_data)
+        return merged
+
+
+class UpdateBuffer:
+    """
+    Write-behind buffer for CCure object updates
+
+    Updates to the same object are merged, with later values overriding earlier ones,
+    and sent as one EDIT_OBJECT request `window` seconds after the object's first update.
+    Everything is sent right away when `max_pending` objects are waiting or the buffer
+    is flushed or closed. Each call to `submit` gets a Future that resolves to the
+    response of the request its changes were sent in. Only one request per object is in
+    flight at a time, so updates made while one is being sent are held for the next.
+    Changes whose Future was cancelled before they were sent are left out of the request.
+
+    :param connection: the connection used to send the merged updates
+    :param window: seconds to wait for more updates to an object before sending them
+    :param max_pending: number of waiting objects that triggers an immediate flush
+    :param max_workers: number of concurrent requests. Defaults to `config.max_workers`.
+    """
+
+    def __init__(
+        self,
+        connection: CcureConnection,
+        window: float = 1.0,
+        max_pending: int = 100,
+        max_workers: Optional[int] = None,
+    ):
+        self.window = window
+        self.max_pending = max_pending
+        self.max_workers = max_workers or connection.config.max_workers
+        self._writer = CcureACS(connection)
+        self._attached: list[CcureACS] = []
+        self._pending: dict[tuple[str, int], _PendingUpdate] = {}
+        # objects with a request in flight, whose next updates wait until it finishes
+        self._in_flight: set[tuple[str, int]] = set()
+        self._condition = threading.Condition()
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="ccure-update-buffer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def attach(self, *acs_objects: CcureACS) -> "UpdateBuffer":
+        """Route the `update` calls of these CCure API objects through this buffer"""
+        for acs_object in acs_objects:
+            acs_object.update_buffer = self
+            self._attached.append(acs_object)
+        return self
+
+    def submit(self, object_type: str, object_id: int, update_data: dict) -> Future:
+        """Queue property updates for one object and return a Future for their outcome"""
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise ACSRequestException(400, "Updates can't be submitted to a closed buffer.")
+            pending = self._pending.setdefault((object_type, object_id), _PendingUpdate())
+            pending.updates.append((future, dict(update_data)))
+            if len(self._pending) >= self.max_pending:
+                self._flush_requested = True
+            self._condition.notify()
+        return future
+
+    def flush(self):
+        """Send every waiting update and wait for the requests to finish"""
+        with self._condition:
+            while self._pending.keys() & self._in_flight:
+                self._condition.wait()
+            batch = self._take(list(self._pending))
+        self._send(batch)
+
+    def close(self):
+        """Send every waiting update, stop the background thread and detach from API objects"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+        for acs_object in self._attached:
+            if acs_object.update_buffer is self:
+                acs_object.update_buffer = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _take(self, keys: list[tuple[str, int]]) -> dict[tuple[str, int], _PendingUpdate]:
+        """Remove these objects' updates from the buffer and mark them in flight"""
+        self._in_flight.update(keys)
+        return {key: self._pending.pop(key) for key in keys}
+
+    def _take_due(self) -> dict[tuple[str, int], _PendingUpdate]:
+        """Wait until some updates are due, then remove them from the buffer and return them"""
+        with self._condition:
+            while not self._closed:
+                ready = {
+                    key: pending
+                    for key, pending in self._pending.items()
+                    if key not in self._in_flight
+                }
+                if self._flush_requested:
+                    self._flush_requested = False
+                    return self._take(list(ready))
+                now = time.monotonic()
+                due = [
+                    key
+                    for key, pending in ready.items()
+                    if now - pending.first_update >= self.window
+                ]
+                if due:
+                    return self._take(due)
+                oldest = min((pending.first_update for pending in ready.values()), default=None)
+                self._condition.wait(None if oldest is None else oldest + self.window - now)
+            return {}
+
+    def _run(self):
+        while not self._closed:
+            self._send(self._take_due())
+
+    def _send(self, batch: dict[tuple[str, int], _PendingUpdate]):
+        keys = list(batch)
+        try:
+            for pending in batch.values():
+                pending.updates = [
+                    (future, update_data)
+                    for future, update_data in pending.updates
+                    if future.set_running_or_notify_cancel()
+                ]
+            batch = {key: pending for key, pending in batch.items() if pending.updates}
+            if not batch:
+                return
+            self._writer.logger.debug(f"Sending {len(batch)} buffered updates")
+            for result in run_concurrently(
+                lambda key: self._writer.update(key[0], key[1], batch[key].update_data),
+                ((key, key) for key in batch),
+                self.max_workers,
+            ):
+                for future in batch[result.key].futures:
+                    if result.ok:
+                        future.set_result(result.response)
+                    else:
+                        future.set_exception(result.error)
+        finally:
+            with self._condition:
+                self._in_flight.difference_update(keys)
+                self._condition.notify_all()
@@ -0,0 +1,310 @@
+"""
+The acslib command line
+
+    acslib search personnel smith --properties ObjectID FirstName LastName
+    acslib count clearance_assignment --where "ClearanceID = 5002"
+    acslib export personnel people.jsonl.gz
+    acslib import personnel hr_export.csv --key Text1 --checkpoint hr_import.json
+    acslib bulk-assign pairs.csv
+    acslib --concurrency 32 --rate-limit 50 door lock 5050 5051 5052
+
+The CCure connection is configured from the CCURE_* environment variables.
+Results are written to stdout as JSON: search writes one object per line, and every other
+command writes one summary object. Progress is reported on stderr.
+
+Only the standard library is imported at startup. Each command imports the parts of acslib
+it uses when it runs.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Iterable, Optional
+
+
+class Progress:
+    """
+    Report the number of finished items and the throughput on stderr
+
+    :param unit: what is being counted, such as "rows"
+    :param enabled: whether to write anything
+    :param interval: minimum seconds between updates
+    """
+
+    def __init__(self, unit: str, enabled: bool = True, interval: float = 0.5):
+        self.unit = unit
+        self.enabled = enabled
+        self.interval = interval
+        self.start = time.perf_counter()
+        self._last = 0.0
+        self.done = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def update(self, done: int, *args):
+        self.done = done
+        if self.enabled and self.elapsed - self._last >= self.interval:
+            self._last = self.elapsed
+            sys.stderr.write(f"\r{self._line()}")
+            sys.stderr.flush()
+
+    def finish(self) -> dict:
+        """Write the final count, and return it with the elapsed time for the summary"""
+        if self.enabled:
+            sys.stderr.write(f"\r{self._line()}\n")
+        return {
+            self.unit: self.done,
+            "elapsed": round(self.elapsed, 3),
+            "per_second": round(self.done / self.elapsed, 1) if self.elapsed else None,
+        }
+
+    def _line(self) -> str:
+        rate = self.done / self.elapsed if self.elapsed else 0.0
+        return f"{self.done} {self.unit} in {self.elapsed:.1f}s ({rate:.1f}/s)"
+
+
+def _emit(data: Any):
+    sys.stdout.write(json.dumps(data, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def _failures(results: Iterable) -> list[dict]:
+    return [{"key": result.key, "error": str(result.error)} for result in results if not result.ok]
+
+
+def _connect(args: argparse.Namespace):
+    from acslib.ccure.config import CcureConfigFactory
+    from acslib.ccure.connection import CcureConnection
+
+    options = {
+        "max_workers": args.concurrency,
+        "page_size": args.page_size,
+        "rate_limit": args.rate_limit,
+    }
+    config = CcureConfigFactory(**{name: value for name, value in options.items() if value})
+    return CcureConnection(config=config)
+
+
+def _search_filter(object_type: str, properties: Optional[list[str]]):
+    from acslib.ccure import filters
+    from acslib.ccure.types import ObjectType
+
+    filter_class = {
+        ObjectType.PERSONNEL.complete: filters.PersonnelFilter,
+        ObjectType.CLEARANCE.complete: filters.ClearanceFilter,
+        ObjectType.CREDENTIAL.complete: filters.CredentialFilter,
+    }.get(object_type)
+    if filter_class:
+        return filter_class(display_properties=properties)
+    return filters.CcureFilter(display_properties=properties or [])
+
+
+def _search(args: argparse.Namespace) -> int:
+    from acslib.ccure.base import CcureACS
+    from acslib.ccure.export import iter_pages, object_type_name
+
+    ccure = CcureACS(_connect(args))
+    object_type = object_type_name(args.object_type)
+    search_filter = _search_filter(object_type, args.properties)
+    where_clause = args.where or search_filter.filter(args.terms)
+    progress = Progress("objects", not args.quiet)
+    for page in iter_pages(
+        ccure,
+        object_type,
+        search_filter,
+        args.page_size or ccure.config.page_size,
+        where_clause,
+        args.concurrency or 1,
+    ):
+        if args.limit:
+            page = page[: args.limit - progress.done]
+        sys.stdout.write("".join(json.dumps(item, default=str) + "\n" for item in page))
+        progress.update(progress.done + len(page))
+        if args.limit and progress.done >= args.limit:
+            break
+    sys.stdout.flush()
+    progress.finish()
+    return 0
+
+
+def _count(args: argparse.Namespace) -> int:
+    from acslib.ccure.base import CcureACS
+    from acslib.ccure.export import object_type_name
+
+    ccure = CcureACS(_connect(args))
+    object_type = object_type_name(args.object_type)
+    search_filter = _search_filter(object_type, None)
+    count = CcureACS.search(
+        ccure,
+        object_type=object_type,
+        search_filter=search_filter,
+        where_clause=args.where or search_filter.filter(args.terms),
+        search_options={"CountOnly": True},
+    )
+    _emit({"object_type": object_type, "count": count})
+    return 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    from acslib.ccure.export import export_objects
+
+    progress = Progress("objects", not args.quiet)
+    export_objects(
+        args.object_type,
+        sys.stdout.buffer if args.destination == "-" else args.destination,
+        format=args.format,
+        properties=args.properties,
+        where_clause=args.where,
+        connection=_connect(args),
+        page_size=args.page_size or 1000,
+        max_workers=args.concurrency or 1,
+        compression=args.compression,
+        progress=progress.update,
+    )
+    summary = progress.finish()
+    if args.destination != "-":
+        _emit(summary)
+    return 0
+
+
+def _import(args: argparse.Namespace) -> int:
+    from acslib.ccure import CcureAPI
+    from acslib.ccure.importer import CcureImporter, read_rows
+
+    ccure = CcureAPI(_connect(args))
+    crud = ccure.personnel if args.object_type == "personnel" else ccure.credential
+    progress = Progress("rows", not args.quiet)
+    importer = CcureImporter(
+        crud,
+        args.key,
+        batch_size=args.batch_size,
+        checkpoint=args.checkpoint,
+        progress=lambda report: progress.update(report.rows),
+    )
+    source = sys.stdin.buffer if args.source == "-" else args.source
+    report = importer.run(read_rows(source, args.format))
+    _emit(progress.finish() | report.counts() | {"failures": _failures(report.failures)})
+    return 1 if report.failed else 0
+
+
+def _read_pairs(args: argparse.Namespace) -> list[tuple[int, int]]:
+    from acslib.ccure.importer import read_rows
+
+    source = sys.stdin.buffer if args.source == "-" else args.source
+    return [
+        (int(row["PersonnelID"]), int(row["ClearanceID"])) for row in read_rows(source, args.format)
+    ]
+
+
+def _bulk_clearances(args: argparse.Namespace) -> int:
+    from acslib.ccure.actions import PersonnelAction
+
+    action = PersonnelAction(_connect(args))
+    pairs = _read_pairs(args)
+    progress = Progress("pairs", not args.quiet)
+    if args.command == "bulk-assign":
+        results = action.bulk_assign_clearances(pairs, progress=progress.update)
+    else:
+        results = action.bulk_revoke_clearances(pairs, progress=progress.update)
+    failures = _failures(results)
+    _emit(progress.finish() | {"failed": len(failures), "failures": failures})
+    return 1 if failures else 0
+
+
+def _door(args: argparse.Namespace) -> int:
+    from datetime import datetime, timedelta
+
+    from acslib.ccure.actions import BULK_DOOR_PRIORITY, DoorAction
+
+    door = DoorAction(_connect(args))
+    now = datetime.now()
+    until = now + timedelta(minutes=args.minutes) if args.minutes else None
+    priority = BULK_DOOR_PRIORITY if args.priority is None else args.priority
+    progress = Progress("doors", not args.quiet)
+    if args.action == "lock":
+        report = door.lock_many(args.door_ids, now, until, priority, progress=progress.update)
+    else:
+        report = door.unlock_many(args.door_ids, now, until, priority, progress=progress.update)
+    failures = _failures(report)
+    _emit(progress.finish() | {"failed": len(failures), "failures": failures})
+    return 1 if failures else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="acslib", description="Work with CCure from the shell")
+    parser.add_argument(
+        "--concurrency", type=int, help="concurrent requests. Defaults to config.max_workers."
+    )
+    parser.add_argument("--page-size", type=int, help="objects per search page")
+    parser.add_argument("--rate-limit", type=float, help="maximum requests per second")
+    parser.add_argument("--quiet", action="store_true", help="don't report progress on stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+    type_help = 'an object type such as "personnel" or "clearance_assignment", or a full name'
+
+    search = commands.add_parser("search", help="write matching objects as JSON lines")
+    search.add_argument("object_type", help=type_help)
+    search.add_argument("terms", nargs="*", help="search terms, matched like the CRUD searches")
+    search.add_argument("--where", help="a WHERE clause, used instead of terms")
+    search.add_argument("--properties", nargs="+", metavar="PROPERTY")
+    search.add_argument("--limit", type=int, help="stop after this many objects")
+    search.set_defaults(handler=_search)
+
+    count = commands.add_parser("count", help="count matching objects")
+    count.add_argument("object_type", help=type_help)
+    count.add_argument("terms", nargs="*")
+    count.add_argument("--where", help="a WHERE clause, used instead of terms")
+    count.set_defaults(handler=_count)
+
+    export = commands.add_parser("export", help="stream every object of one type to a file")
+    export.add_argument("object_type", help=type_help)
+    export.add_argument("destination", help='output file, or "-" for stdout')
+    export.add_argument("--format", choices=["jsonl", "csv", "parquet"])
+    export.add_argument("--compression", choices=["gzip", "bz2", "xz"])
+    export.add_argument("--properties", nargs="+", metavar="PROPERTY")
+    export.add_argument("--where", default="", help="only export objects matching this clause")
+    # the export command took these before they were global, so both positions still work.
+    # SUPPRESS leaves the global value in place when they aren't given here.
+    export.add_argument("--page-size", type=int, default=argparse.SUPPRESS)
+    export.add_argument(
+        "--concurrency", type=int, default=argparse.SUPPRESS, help="pages fetched at once"
+    )
+    export.set_defaults(handler=_export)
+
+    import_ = commands.add_parser("import", help="create or update objects from a file")
+    import_.add_argument("object_type", choices=["personnel", "credential"])
+    import_.add_argument("source", help='CSV or JSONL file, or "-" for stdin')
+    import_.add_argument("--key", required=True, help="property matching existing objects")
+    import_.add_argument("--format", choices=["jsonl", "csv"])
+    import_.add_argument("--batch-size", type=int, default=500)
+    import_.add_argument("--checkpoint", help="file recording progress, to resume an import")
+    import_.set_defaults(handler=_import)
+
+    for name, verb in (("bulk-assign", "assign"), ("bulk-revoke", "revoke")):
+        bulk = commands.add_parser(
+            name, help=f"{verb} clearances listed as PersonnelID,ClearanceID rows"
+        )
+        bulk.add_argument("source", help='CSV or JSONL file, or "-" for stdin')
+        bulk.add_argument("--format", choices=["jsonl", "csv"])
+        bulk.set_defaults(handler=_bulk_clearances)
+
+    door = commands.add_parser("door", help="lock or unlock doors")
+    door.add_argument("action", choices=["lock", "unlock"])
+    door.add_argument("door_ids", nargs="+", type=int)
+    door.add_argument("--minutes", type=float, help="how long to keep the doors in this state")
+    door.add_argument(
+        "--priority", type=int, help="schedule priority. Defaults to acslib's lockdown priority."
+    )
+    door.set_defaults(handler=_door)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Build an AccessMatrix for a synthetic campus and time its queries
+
+    python -m benchmarks.bench_access_matrix
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from acslib.ccure.access_matrix import AccessMatrix
+
+
+def campus(people: int, clearances: int, doors: int, seed: int = 0):
+    """(assignments, clearance_doors) for a campus where each person holds 2-8 clearances"""
+    rng = random.Random(seed)
+    assignments = [
+        (personnel_id, clearance_id)
+        for personnel_id in range(1, people + 1)
+        for clearance_id in rng.sample(range(1, clearances + 1), rng.randint(2, 8))
+    ]
+    clearance_doors = [
+        (clearance_id, door_id)
+        for clearance_id in range(1, clearances + 1)
+        for door_id in rng.sample(range(1, doors + 1), rng.randint(1, 40))
+    ]
+    return assignments, clearance_doors
+
+
+def timed(label: str, function, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<12} {elapsed * 1_000_000:14.1f} µs")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=100_000)
+    parser.add_argument("--clearances", type=int, default=2_000)
+    parser.add_argument("--doors", type=int, default=5_000)
+    args = parser.parse_args()
+
+    assignments, clearance_doors = campus(args.people, args.clearances, args.doors)
+    print(f"{len(assignments)} assignments, {len(clearance_doors)} clearance doors")
+    matrix = timed("build", lambda: AccessMatrix(assignments, clearance_doors))
+
+    people = random.Random(1).sample(range(1, args.people + 1), 1000)
+    doors = random.Random(2).sample(range(1, args.doors + 1), 100)
+    people_cycle, doors_cycle = itertools.cycle(people), itertools.cycle(doors)
+    timed("doors_for", lambda: matrix.doors_for(next(people_cycle)), len(people))
+    timed("people_for", lambda: matrix.people_for(next(doors_cycle)), len(doors))
+    timed("can_open", lambda: matrix.can_open(people[0], doors[0]), 10_000)
+
+    # drop about half the clearances of 1% of people, and move one door to another clearance
+    revoked = set(people[: args.people // 100])
+    changed_assignments = [
+        pair for index, pair in enumerate(assignments) if pair[0] not in revoked or index % 2
+    ]
+    changed_doors = clearance_doors[1:] + [(clearance_doors[0][0] % args.clearances + 1, 1)]
+    newer = AccessMatrix(changed_assignments, changed_doors)
+    changes = timed("diff", lambda: matrix.diff(newer))
+    print(f"{len(changes)} people's access changed")
+
+
+if __name__ == "__main__":
+    main()
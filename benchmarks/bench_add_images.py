@@ -0,0 +1,47 @@
+"""
+Compare uploading portraits one at a time with PersonnelAction.add_images
+
+    python -m benchmarks.bench_add_images
+"""
+
+import argparse
+import base64
+import os
+import time
+from urllib.parse import quote
+
+from acslib.ccure import CcureAPI
+from benchmarks.fake_ccure import FakeCcureServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--size", type=int, default=40_000, help="bytes per image")
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    images = [(5000 + i, os.urandom(args.size)) for i in range(args.images)]
+    with FakeCcureServer(latency=args.latency) as server:
+        ccure = CcureAPI(server.connection())
+
+        start = time.perf_counter()
+        for personnel_id, image in images:
+            encoded = quote(base64.b64encode(image).decode(), safe="")
+            ccure.action.personnel.add_image(personnel_id, encoded)
+        elapsed = time.perf_counter() - start
+        print(f"sequential add_image:    {args.images / elapsed:8.1f} images/s")
+
+        for workers in (4, 8, 16):
+            start = time.perf_counter()
+            results = ccure.action.personnel.add_images(iter(images), max_workers=workers)
+            elapsed = time.perf_counter() - start
+            failed = sum(not result.ok for result in results)
+            print(
+                f"add_images workers={workers:<3}  {args.images / elapsed:8.1f} images/s"
+                f"  ({failed} failed)"
+            )
+
+
+if __name__ == "__main__":
+    main()
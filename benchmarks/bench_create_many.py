@@ -0,0 +1,43 @@
+"""
+Compare creating personnel one at a time with CcurePersonnel.create_many
+
+    python -m benchmarks.bench_create_many
+"""
+
+import argparse
+import time
+
+from acslib.ccure import CcureAPI
+from acslib.ccure.data_models import PersonnelCreateData
+from benchmarks.fake_ccure import FakeCcureServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    records = [PersonnelCreateData(LastName=f"Person{i}") for i in range(args.records)]
+    with FakeCcureServer(latency=args.latency) as server:
+        ccure = CcureAPI(server.connection())
+
+        start = time.perf_counter()
+        for record in records:
+            ccure.personnel.create(record)
+        elapsed = time.perf_counter() - start
+        print(f"sequential create:        {args.records / elapsed:8.1f} records/s")
+
+        for workers in (4, 8, 16, 32):
+            start = time.perf_counter()
+            results = ccure.personnel.create_many(records, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            failed = sum(not result.ok for result in results)
+            print(
+                f"create_many workers={workers:<3}  {args.records / elapsed:8.1f} records/s"
+                f"  ({failed} failed)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Time CcureImporter loading a personnel CSV, first creating every row and then updating them
+
+    python -m benchmarks.bench_import
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from acslib.ccure import CcureAPI
+from acslib.ccure.importer import CcureImporter, read_rows
+from benchmarks.fake_ccure import FakeCcureServer
+
+
+def write_csv(path: str, rows: int, run: int):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, ["Text1", "FirstName", "LastName"])
+        writer.writeheader()
+        for i in range(rows):
+            writer.writerow({"Text1": f"E{i:07}", "FirstName": f"Run{run}", "LastName": f"P{i}"})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "people.csv")
+        for workers in (1, 8, 32):
+            with FakeCcureServer(latency=args.latency) as server:
+                ccure = CcureAPI(server.connection())
+                for run, label in enumerate(["create", "update"]):
+                    write_csv(path, args.rows, run)
+                    importer = CcureImporter(
+                        ccure.personnel, "Text1", args.batch_size, max_workers=workers
+                    )
+                    start = time.perf_counter()
+                    report = importer.run(read_rows(path))
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"{label} workers={workers:<3} {args.rows / elapsed:8.1f} rows/s"
+                        f"  (created={report.created} updated={report.updated}"
+                        f" failed={report.failed})"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Measure how long a fresh interpreter takes to import acslib and build a CcureAPI
+
+    python -m benchmarks.bench_import_time
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STEPS = {
+    "import acslib": "import acslib",
+    "import acslib.cli": "import acslib.cli",
+    "CcureAPI(connection)": (
+        "from acslib.ccure import CcureAPI\n"
+        "from benchmarks.fake_ccure import FakeCcureServer\n"
+        "CcureAPI(FakeCcureServer().connection()).personnel"
+    ),
+}
+
+
+def import_time(code: str, module: str) -> float:
+    """Cumulative microseconds `python -X importtime` reports for `module` while running code"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    for line in stderr.splitlines():
+        _, _, cumulative, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        if name == module:
+            return int(cumulative)
+    return 0.0
+
+
+def wall_time(code: str) -> float:
+    """Seconds for a fresh interpreter to run code"""
+    timer = f"import time; start = time.perf_counter()\n{code}\nprint(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, "-c", timer], capture_output=True, text=True)
+    return float(result.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    cumulative = [import_time("import acslib", "acslib") for _ in range(args.runs)]
+    print(f"{'acslib (-X importtime)':<24} {statistics.median(cumulative) / 1000:8.1f} ms")
+    for label, code in STEPS.items():
+        seconds = statistics.median(wall_time(code) for _ in range(args.runs))
+        print(f"{label:<24} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
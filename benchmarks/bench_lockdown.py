@@ -0,0 +1,56 @@
+"""
+Measure time-to-all-locked for an emergency lockdown with DoorAction.lock_many
+
+    python -m benchmarks.bench_lockdown --doors 500 --sla 5
+"""
+
+import argparse
+import sys
+import time
+
+from acslib.ccure import CcureAPI
+from benchmarks.fake_ccure import FakeCcureServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--doors", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--sla", type=float, default=5.0, help="seconds allowed to lock every door")
+    args = parser.parse_args()
+
+    door_ids = list(range(1, args.doors + 1))
+    with FakeCcureServer(latency=args.latency, failure_rate=args.failure_rate) as server:
+        ccure = CcureAPI(server.connection(max_workers=64))
+
+        sample = door_ids[:50]
+        start = time.perf_counter()
+        for door_id in sample:
+            try:
+                ccure.action.door.lock(door_id)
+            except Exception:
+                pass
+        per_door = (time.perf_counter() - start) / len(sample)
+        print(
+            f"sequential lock: {per_door * 1000:.1f} ms/door, ~{per_door * args.doors:.1f} s total"
+        )
+
+        met_sla = True
+        for workers in (16, 32, 64):
+            server.door_modes.clear()
+            report = ccure.action.door.lock_many(door_ids, priority=100, max_workers=workers)
+            locked = sum(mode == 2 for mode in server.door_modes.values())
+            slowest = max(result.elapsed for result in report)
+            print(
+                f"lock_many workers={workers:<3} time-to-all-locked {report.elapsed:6.2f} s, "
+                f"slowest door {slowest:.2f} s, {locked}/{args.doors} locked, "
+                f"{len(report.failures)} failed"
+            )
+            met_sla = met_sla and report.elapsed <= args.sla and not report.failures
+    print("SLA met" if met_sla else "SLA missed")
+    sys.exit(0 if met_sla else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Compare concurrent request throughput for several session pool sizes, against a server
+that handles one request at a time per session
+
+    python -m benchmarks.bench_session_pool
+"""
+
+import argparse
+import time
+
+from acslib.ccure.bulk import run_concurrently
+from acslib.ccure.crud import CcurePersonnel
+from benchmarks.fake_ccure import FakeCcureServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with FakeCcureServer(latency=args.latency, serialize_sessions=True) as server:
+        for strategy in ("least_busy", "round_robin"):
+            for pool_size in (1, 2, 4, 8, 16):
+                connection = server.connection(
+                    session_pool_size=pool_size, session_selection=strategy, max_workers=64
+                )
+                personnel = CcurePersonnel(connection)
+                start = time.perf_counter()
+                results = run_concurrently(
+                    lambda i: personnel.search(["Person"], page_size=1),
+                    ((i, i) for i in range(args.requests)),
+                    args.workers,
+                )
+                elapsed = time.perf_counter() - start
+                connection.logout()
+                failed = sum(not result.ok for result in results)
+                print(
+                    f"{strategy:<12} sessions={pool_size:<3} "
+                    f"{args.requests / elapsed:8.1f} requests/s  ({failed} failed)"
+                )
+
+
+if __name__ == "__main__":
+    main()
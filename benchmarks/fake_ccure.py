@@ -0,0 +1,230 @@
+"""
+A small in-memory stand-in for the CCure victor web service, used by the benchmarks.
+
+Each request sleeps for `latency` seconds to imitate a round trip to a real server.
+"""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qsl, urlparse, parse_qs
+
+from acslib.ccure.config import CcureConfigFactory
+from acslib.ccure.connection import CcureConnection
+from acslib.ccure.endpoints import V2Endpoints
+
+API_PREFIX = "/victorwebservice/api"
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def parse_form(body: str) -> dict:
+    """Turn CcureConnection.encode_data output back into nested dicts and lists"""
+    parsed = {}
+    for raw_key, value in parse_qsl(body, keep_blank_values=True):
+        parts = raw_key.replace("]", "").split("[")
+        node = parsed
+        for part, next_part in zip(parts, parts[1:]):
+            default = [] if next_part == "" or next_part.isdigit() else {}
+            if isinstance(node, list):
+                index = int(part)
+                while len(node) <= index:
+                    node.append(default.copy())
+                node = node[index]
+            else:
+                node = node.setdefault(part, default)
+        last = parts[-1]
+        if last == "":
+            node.append(value)
+        elif isinstance(node, list):
+            node.append(value)
+        else:
+            node[last] = value
+    return parsed
+
+
+class FakeCcureServer:
+    """
+    Serve a fake CCure API on localhost in a background thread
+
+    :param latency: seconds to wait before answering each request
+    :param failure_rate: fraction of door actions that fail with a 503
+    :param serialize_sessions: answer only one request at a time per session, like a server
+        that locks each session while it works
+    """
+
+    def __init__(
+        self, latency: float = 0.005, failure_rate: float = 0.0, serialize_sessions: bool = False
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.serialize_sessions = serialize_sessions
+        self._session_locks = defaultdict(threading.Lock)
+        self.door_modes = {}
+        self.request_counts = Counter()
+        self.objects = defaultdict(dict)
+        self._ids = itertools.count(5000)
+        self._lock = threading.Lock()
+        self._httpd = _Server(("127.0.0.1", 0), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def connection(
+        self, session_pool_size: int = 1, session_selection: str = "least_busy", **config
+    ) -> CcureConnection:
+        """A CcureConnection configured to talk to this server"""
+        config = {
+            "CCURE_USERNAME": "bench",
+            "CCURE_PASSWORD": "bench",
+            "CCURE_BASE_URL": self.base_url,
+            "CCURE_CLIENT_NAME": "bench",
+            "CCURE_CLIENT_VERSION": "bench",
+            "CCURE_CLIENT_ID": "bench",
+        } | config
+        return CcureConnection(
+            config=CcureConfigFactory(**config),
+            session_pool_size=session_pool_size,
+            session_selection=session_selection,
+        )
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def session_lock(self, session_id: Optional[str]):
+        """Held while answering a request, so requests in one session can run one at a time"""
+        if not (self.serialize_sessions and session_id):
+            return nullcontext()
+        with self._lock:
+            return self._session_locks[session_id]
+
+    def new_object(self, object_type: str, properties: dict) -> int:
+        with self._lock:
+            object_id = next(self._ids)
+            self.objects[object_type][object_id] = properties | {"ObjectID": object_id}
+        return object_id
+
+    def handle(self, method: str, path: str, query: dict, body: str, headers) -> tuple:
+        """Return (status code, json body, response headers) for one request"""
+        endpoint = path.removeprefix(API_PREFIX)
+        self.request_counts[endpoint] += 1
+        if endpoint == V2Endpoints.LOGIN.removeprefix(API_PREFIX):
+            return 200, {}, {"session-id": f"session-{next(self._ids)}"}
+        if not headers.get("session-id"):
+            return 401, "no session", {}
+
+        if endpoint == V2Endpoints.PERSIST_TO_CONTAINER.removeprefix(API_PREFIX):
+            form = parse_form(body)
+            if "Children" in form:
+                ids = [
+                    self.new_object(
+                        child["Type"],
+                        dict(zip(child["PropertyNames"], child["Propertyvalues"]))
+                        | {"ParentID": int(form["ID"])},
+                    )
+                    for child in form["Children"]
+                ]
+                return 200, ids, {}
+            properties = dict(zip(form["PropertyNames"], form["PropertyValues"]))
+            if not properties.get("LastName") and form["Type"].endswith("Personnel"):
+                return 400, "LastName is required", {}
+            return 200, {"ObjectID": self.new_object(form["Type"], properties)}, {}
+        if endpoint == V2Endpoints.FIND_OBJS_W_CRITERIA.removeprefix(API_PREFIX):
+            return 200, self.search(json.loads(body)), {}
+        if endpoint == V2Endpoints.EDIT_OBJECT.removeprefix(API_PREFIX):
+            form = parse_form(body)
+            with self._lock:
+                item = self.objects[query["type"][0]].get(int(query["id"][0]))
+                if item is None:
+                    return 404, "not found", {}
+                item.update(zip(form["PropertyNames"], form["PropertyValues"]))
+            return 200, {}, {}
+        if endpoint == V2Endpoints.ACTION.removeprefix(API_PREFIX):
+            if random.random() < self.failure_rate:
+                return 503, "service unavailable", {}
+            form = parse_form(body)
+            door_id = int(form["PropertyValues"][1])
+            locked = query["actionTypeFullName"][0].endswith(".LockDoor")
+            self.door_modes[door_id] = 2 if locked else 1
+            return 200, {}, {}
+        return 200, {}, {}
+
+    def search(self, request_json: dict) -> list | int:
+        """
+        Answer a search. Only empty where clauses and `Property IN (...)` are understood;
+        anything else matches every object.
+        """
+        with self._lock:
+            objects = list(self.objects[request_json["TypeFullName"]].values())
+        match = re.fullmatch(r"\(?(\w+) IN \((.*)\)\)?", request_json.get("WhereClause") or "")
+        if match:
+            name, values = match[1], match[2]
+            wanted = {value.strip().strip("'").replace("''", "'") for value in values.split(",")}
+            objects = [item for item in objects if str(item.get(name)) in wanted]
+        if request_json.get("CountOnly"):
+            return len(objects)
+        page_size, page_number = request_json["pageSize"], request_json["pageNumber"]
+        if page_size:
+            objects = objects[(page_number - 1) * page_size :][:page_size]
+        properties = request_json.get("DisplayProperties")
+        if properties:
+            objects = [{name: item.get(name) for name in properties} for item in objects]
+        return objects
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def _respond(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode() if length else ""
+                with server.session_lock(self.headers.get("session-id")):
+                    time.sleep(server.latency)
+                    status, payload, headers = server.handle(
+                        self.command, url.path, parse_qs(url.query), body, self.headers
+                    )
+                content = payload if isinstance(payload, str) else json.dumps(payload)
+                content = content.encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+            def log_message(self, *args):
+                pass
+
+        return Handler